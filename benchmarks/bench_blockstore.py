@@ -0,0 +1,182 @@
+"""Disk use and load time of the block archive against the JSON slot store.
+
+Builds synthetic multi-year day records for several profiles (random-walk
+kWh values with 3 decimals, a few estimated and missing slots, DST days)
+and stores them both ways:
+
+- JSON: the `.storage` layout of the slot store (`DayRecord.as_dict`),
+  loaded with `json.loads` and `DayRecord.from_dict`,
+- blocks: one `BlockArchive` file per profile, opened (header scan) and
+  decoded either fully or only for the last days (lazy load).
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.bench_blockstore --years 3 --profiles 2
+    python -m benchmarks.bench_blockstore --years 10 --profiles 4 --json blockstore.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any
+
+from custom_components.egd_openapi.blockstore import BlockArchive
+from custom_components.egd_openapi.const import SLOT_ESTIMATED, SLOT_MISSING, SLOT_VALID
+from custom_components.egd_openapi.storage import DayRecord
+
+FIRST_DAY = date(2020, 1, 1)
+
+
+def make_records(days: int, seed: int) -> list[DayRecord]:
+    rng = random.Random(seed)
+    level = 0.2
+    records: list[DayRecord] = []
+    for offset in range(days):
+        record = DayRecord.empty(FIRST_DAY + timedelta(days=offset))
+        states: list[str] = []
+        for slot in range(record.slot_count):
+            level = min(3.0, max(0.0, level + rng.gauss(0, 0.05)))
+            roll = rng.random()
+            if roll < 0.005:
+                states.append(SLOT_MISSING)
+            elif roll < 0.01:
+                states.append(SLOT_ESTIMATED)
+            else:
+                states.append(SLOT_VALID)
+                record.values[slot] = round(level, 3)
+        record.states = "".join(states)
+        records.append(record)
+    return records
+
+
+def _best(func: Any, repeat: int) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    days = args.years * 365
+    profiles = {f"P{index}": make_records(days, seed=index) for index in range(args.profiles)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "store.json")
+        with open(json_path, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "profiles": {
+                        code: {record.day.isoformat(): record.as_dict() for record in records}
+                        for code, records in profiles.items()
+                    }
+                },
+                handle,
+                separators=(",", ":"),
+            )
+
+        def _load_json() -> dict[str, dict[date, DayRecord]]:
+            with open(json_path, encoding="utf-8") as handle:
+                raw = json.load(handle)
+            return {
+                code: {
+                    date.fromisoformat(day_iso): DayRecord.from_dict(date.fromisoformat(day_iso), item)
+                    for day_iso, item in stored.items()
+                }
+                for code, stored in raw["profiles"].items()
+            }
+
+        block_paths = {code: os.path.join(directory, f"{code}.blocks") for code in profiles}
+        started = time.perf_counter()
+        for code, records in profiles.items():
+            archive = BlockArchive(block_paths[code])
+            archive.open()
+            for offset in range(0, len(records), 31):
+                archive.write(records[offset : offset + 31])
+            archive.close()
+        write_seconds = time.perf_counter() - started
+
+        def _open_blocks() -> dict[str, BlockArchive]:
+            archives = {code: BlockArchive(path) for code, path in block_paths.items()}
+            for archive in archives.values():
+                archive.open()
+            return archives
+
+        def _load_blocks(last_days: int | None) -> dict[str, dict[date, DayRecord]]:
+            archives = _open_blocks()
+            loaded = {}
+            for code, archive in archives.items():
+                wanted = archive.days() if last_days is None else archive.days()[-last_days:]
+                loaded[code] = archive.read(wanted)
+                archive.close()
+            return loaded
+
+        json_seconds, from_json = _best(_load_json, args.repeat)
+        open_seconds, archives = _best(_open_blocks, args.repeat)
+        for archive in archives.values():
+            archive.close()
+        full_seconds, from_blocks = _best(lambda: _load_blocks(None), args.repeat)
+        lazy_seconds, _ = _best(lambda: _load_blocks(args.lazy_days), args.repeat)
+
+        mismatches = sum(
+            1
+            for code, records in profiles.items()
+            for record in records
+            if (from_blocks[code][record.day].states, from_blocks[code][record.day].values)
+            != (record.states, record.values)
+            or (from_json[code][record.day].values != record.values)
+        )
+        report = {
+            "years": args.years,
+            "profiles": args.profiles,
+            "days": days * args.profiles,
+            "json_bytes": os.path.getsize(json_path),
+            "block_bytes": sum(os.path.getsize(path) for path in block_paths.values()),
+            "json_load_s": round(json_seconds, 4),
+            "block_write_s": round(write_seconds, 4),
+            "block_open_s": round(open_seconds, 4),
+            "block_full_load_s": round(full_seconds, 4),
+            f"block_lazy_{args.lazy_days}d_load_s": round(lazy_seconds, 4),
+            "mismatched_days": mismatches,
+        }
+
+    print(f"{report['days']} profile days ({args.years} years x {args.profiles} profiles)")
+    print(f"  JSON   {report['json_bytes'] / 2**20:9.2f} MiB  load {json_seconds * 1e3:9.1f} ms")
+    print(
+        f"  blocks {report['block_bytes'] / 2**20:9.2f} MiB  open {open_seconds * 1e3:9.1f} ms"
+        f"  full {full_seconds * 1e3:9.1f} ms  last {args.lazy_days} days {lazy_seconds * 1e3:7.1f} ms"
+    )
+    print(
+        f"  size {report['json_bytes'] / report['block_bytes']:.1f}x smaller,"
+        f" lazy load {json_seconds / max(lazy_seconds, 1e-9):.0f}x faster, {mismatches} mismatched days"
+    )
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--profiles", type=int, default=2)
+    parser.add_argument("--lazy-days", type=int, default=7, help="days decoded by the lazy load case")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", metavar="PATH", help="also write the report to a JSON file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 1 if report["mismatched_days"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Microbenchmarks of the row parsing and aggregation hot paths.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python -m benchmarks.bench_parsers --save benchmarks/baseline.json
+    python -m benchmarks.bench_parsers --compare benchmarks/baseline.json
+
+Timings are the best of several repeats, in seconds per call. With
+`--compare` the run exits non-zero when a case is slower than the baseline
+by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+from datetime import date, timedelta
+import json
+import platform
+import sys
+import timeit
+from typing import Any
+
+from custom_components.egd_openapi.api import EGDOpenAPIClient
+from custom_components.egd_openapi.batch import numpy_available
+from custom_components.egd_openapi.const import CONF_DAYS_TO_KEEP_SERIES, MEASUREMENT_AB, MEASUREMENT_C1
+from custom_components.egd_openapi.coordinator import EGDOpenAPICoordinator
+from custom_components.egd_openapi.storage import DayRecord, EGDDataStore
+
+from .payloads import ROW_SHAPES, SIZES, WRAPPERS, make_rows, wrap_rows
+
+FIRST_DAY = date(2026, 3, 1)
+DEFAULT_TOLERANCE = 0.25
+
+
+def _coordinator(days: int) -> EGDOpenAPICoordinator:
+    """Return a coordinator shell that only carries what the benchmarked methods read."""
+    coordinator = object.__new__(EGDOpenAPICoordinator)
+    coordinator.entry_data = {"options": {CONF_DAYS_TO_KEEP_SERIES: days}}
+    coordinator.series_history = {}
+    coordinator.store = object.__new__(EGDDataStore)
+    coordinator.store.records = {}
+    return coordinator
+
+
+def _raw_value(row: dict[str, Any]) -> Any:
+    value = row["hodnota"]
+    return value["value"] if isinstance(value, dict) else value
+
+
+def _day_records(days: int) -> list[DayRecord]:
+    return [DayRecord.empty(FIRST_DAY + timedelta(days=offset)) for offset in range(days)]
+
+
+def build_cases(size_names: list[str]) -> dict[str, tuple[Callable[[], Any], int]]:
+    """Return benchmark name -> (callable, rows processed per call)."""
+    cases: dict[str, tuple[Callable[[], Any], int]] = {}
+    extract_rows = EGDOpenAPIClient._extract_rows
+    parse_timestamp = EGDOpenAPICoordinator._parse_timestamp
+    parse_decimal = EGDOpenAPICoordinator._parse_decimal
+
+    for size in size_names:
+        days = SIZES[size]
+        coordinator = _coordinator(days)
+
+        for wrapper in WRAPPERS:
+            wrapped_rows = make_rows("cas_iso", days, first_day=FIRST_DAY)
+            payload = wrap_rows(wrapper, wrapped_rows)
+            cases[f"extract_rows/{wrapper}/{size}"] = (
+                lambda payload=payload: extract_rows(payload),
+                len(wrapped_rows),
+            )
+
+        for shape in ROW_SHAPES:
+            rows = make_rows(shape, days, first_day=FIRST_DAY)
+            values = [_raw_value(row) for row in rows]
+            records = _day_records(days)
+            # Only the nested shape uses the C1 status code `W`.
+            measurement_type = MEASUREMENT_C1 if shape == "nested_value" else MEASUREMENT_AB
+            window_start = records[0].slot_start(0)
+            window_end = records[-1].slot_start(records[-1].slot_count)
+
+            cases[f"parse_timestamp/{shape}/{size}"] = (
+                lambda rows=rows: [parse_timestamp(row) for row in rows],
+                len(rows),
+            )
+            cases[f"parse_decimal/{shape}/{size}"] = (
+                lambda values=values: [parse_decimal(value) for value in values],
+                len(values),
+            )
+            cases[f"compute_profile_day/{shape}/{size}"] = (
+                lambda rows=rows, mtype=measurement_type, start=window_start, end=window_end: (
+                    coordinator._compute_profile_day(
+                        rows=rows,
+                        measurement_type=mtype,
+                        window_start=start,
+                        window_end=end,
+                    )
+                ),
+                len(rows),
+            )
+            if days > 1:
+                cases[f"compute_days/{shape}/{size}"] = (
+                    lambda rows=rows, mtype=measurement_type, records=records: coordinator._compute_days(
+                        rows, mtype, records
+                    ),
+                    len(rows),
+                )
+
+        # Series maintenance: merging fetched points into day records and
+        # rebuilding the attribute series from them.
+        day_points = [
+            (
+                record,
+                coordinator._compute_profile_day(
+                    rows=make_rows("cas_iso", 1, first_day=record.day, seed=offset),
+                    measurement_type=MEASUREMENT_AB,
+                    window_start=record.slot_start(0),
+                    window_end=record.slot_start(record.slot_count),
+                ).series_points,
+            )
+            for offset, record in enumerate(_day_records(days))
+        ]
+
+        def _merge(day_points: list[tuple[DayRecord, list[list[int | float | None]]]] = day_points) -> None:
+            for record, points in day_points:
+                record.merge_points(points, slot_from=0, slot_to=record.slot_count)
+
+        coordinator.store.records["ICQ2"] = {record.day: record for record, _ in day_points}
+        _merge()
+        point_count = sum(len(points) for _, points in day_points)
+        cases[f"merge_points/{size}"] = (_merge, point_count)
+        cases[f"rebuild_series/{size}"] = (
+            lambda coordinator=coordinator: coordinator._rebuild_series("ICQ2"),
+            point_count,
+        )
+
+    return cases
+
+
+def run(cases: dict[str, tuple[Callable[[], Any], int]], repeat: int) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    for name, (func, rows) in cases.items():
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = {"seconds": best, "rows": rows, "us_per_row": best / max(rows, 1) * 1e6}
+        print(f"{name:48} {best * 1e3:10.3f} ms  {results[name]['us_per_row']:8.3f} us/row")
+    return results
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return names of cases slower than baseline beyond tolerance."""
+    regressions: list[str] = []
+    print(f"\nComparison against baseline (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:48} new case")
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:48} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--filter", default="", help="only run cases containing this substring")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cases = {name: case for name, case in build_cases(args.sizes).items() if args.filter in name}
+    print(f"Python {platform.python_version()}, NumPy engine: {numpy_available()}, {len(cases)} cases\n")
+    results = run(cases, args.repeat)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "numpy": numpy_available(),
+                    "results": results,
+                },
+                handle,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"\nBaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""End-to-end refresh benchmark against the local Distribuce24 stand-in.
+
+Runs the real coordinator, client and day store in a bare Home Assistant
+core and reports wall time, request count and peak traced memory of each
+refresh. Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.bench_refresh --days-back 30 --refreshes 3
+    python -m benchmarks.bench_refresh --now 2026-03-30T08:00 --latency 0.05 --errors 503:0.1
+    python -m benchmarks.bench_refresh --days-back 30 --latency 0.02 --spike-ratio 0.03 --hedge
+
+The first refresh backfills an empty store; later ones show the steady
+state where only missing or non-final slots are requested.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from aiohttp import ClientSession
+
+from custom_components.egd_openapi.const import MEASUREMENT_AB, MEASUREMENT_C1
+
+from .harness import SimulatedClock, async_create_coordinator, async_create_hass, parse_start
+from .mock_server import MockConfig, MockDistribuce24, add_server_arguments, parse_error_spec
+
+
+async def async_run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    start = parse_start(args.now)
+    clock = SimulatedClock(start) if start else None
+    server = MockDistribuce24(
+        MockConfig(
+            profiles=tuple(args.profiles),
+            shape=args.shape,
+            wrapper=args.wrapper,
+            latency=args.latency,
+            jitter=args.jitter,
+            spike_ratio=args.spike_ratio,
+            spike_seconds=args.spike_seconds,
+            batching=args.batching,
+            errors=parse_error_spec(args.errors),
+        ),
+        clock=clock,
+    )
+    await server.start()
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        try:
+            async with ClientSession() as session:
+                coordinator = await async_create_coordinator(
+                    hass,
+                    session,
+                    server,
+                    entry_id="bench",
+                    ean="859182400000000000",
+                    measurement_type=MEASUREMENT_C1 if args.c1 else MEASUREMENT_AB,
+                    profiles=args.profiles,
+                    days_back=args.days_back,
+                    intraday=args.intraday,
+                    hedge=args.hedge,
+                )
+                tracemalloc.start()
+                for index in range(args.refreshes):
+                    requests_before = server.stats.total()
+                    tracemalloc.reset_peak()
+                    started = time.perf_counter()
+                    if clock is not None:
+                        with clock.patch():
+                            await coordinator.async_refresh()
+                    else:
+                        await coordinator.async_refresh()
+                    wall = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    results.append(
+                        {
+                            "refresh": index + 1,
+                            "success": coordinator.last_update_success,
+                            "wall_s": round(wall, 4),
+                            "requests": server.stats.total() - requests_before,
+                            "peak_memory_kib": round(peak / 1024, 1),
+                            "stages_s": coordinator.last_stage_timings,
+                        }
+                    )
+                tracemalloc.stop()
+                hedging = coordinator.client.metrics.summary()["hedging"]
+        finally:
+            await hass.async_stop(force=True)
+            await server.stop()
+
+    for result in results:
+        print(
+            f"refresh {result['refresh']:>3}  {'ok  ' if result['success'] else 'FAIL'}"
+            f"  {result['wall_s'] * 1000:9.1f} ms  {result['requests']:5} requests"
+            f"  {result['peak_memory_kib']:10.1f} KiB peak"
+        )
+    print(f"\nServer: {json.dumps(server.stats.as_dict())}")
+    if args.hedge:
+        print(f"Hedging: {json.dumps(hedging)}")
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument("--c1", action="store_true", help="use C1 measurement endpoints")
+    parser.add_argument("--days-back", type=int, default=1)
+    parser.add_argument("--intraday", action="store_true")
+    parser.add_argument("--refreshes", type=int, default=3)
+    parser.add_argument("--hedge", action="store_true", help="hedge slow data requests")
+    parser.add_argument("--now", help="simulated local time, e.g. 2026-03-30T08:00 to cover a DST day")
+    parser.add_argument("--json", metavar="PATH", help="also write results to a JSON file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(async_run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Run real coordinators inside a bare Home Assistant core for benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta, tzinfo
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.egd_openapi.api import EGDOpenAPIClient
+from custom_components.egd_openapi.const import (
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_DAYS_BACK_FETCH,
+    CONF_EAN,
+    CONF_ENVIRONMENT,
+    CONF_HEDGE_REQUESTS,
+    CONF_INTRADAY_FETCH,
+    CONF_MEASUREMENT_TYPE,
+    CONF_SELECTED_PROFILES,
+    CONF_ZDROJ_DAT,
+    ENV_PRODUCTION,
+    MEASUREMENT_C1,
+    ZDROJ_ELEKTROMER,
+)
+from custom_components.egd_openapi.coordinator import EGDOpenAPICoordinator
+from custom_components.egd_openapi.storage import EGDDataStore
+
+from .mock_server import MockDistribuce24
+
+
+class SimulatedClock:
+    """Wall clock seen by Home Assistant time helpers and the stand-in server."""
+
+    def __init__(self, start: datetime) -> None:
+        self.now = start.astimezone(UTC)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, delta: timedelta) -> None:
+        self.now += delta
+
+    @contextmanager
+    def patch(self) -> Iterator[None]:
+        """Route `dt_util.utcnow` and `dt_util.now` through this clock."""
+
+        def _now(time_zone: tzinfo | None = None) -> datetime:
+            return self.now.astimezone(time_zone or dt_util.get_default_time_zone())
+
+        with patch.object(dt_util, "utcnow", lambda: self.now), patch.object(dt_util, "now", _now):
+            yield
+
+
+def parse_start(value: str | None) -> datetime | None:
+    """Parse an ISO `--now` argument, local Prague time when no offset is given."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.get_time_zone("Europe/Prague"))
+    return parsed
+
+
+async def async_create_hass(config_dir: str) -> HomeAssistant:
+    """Return a Home Assistant core that is enough for coordinators and stores."""
+    hass = HomeAssistant(config_dir)
+    await hass.config.async_set_time_zone("Europe/Prague")
+    return hass
+
+
+async def async_create_coordinator(
+    hass: HomeAssistant,
+    session: ClientSession,
+    server: MockDistribuce24,
+    *,
+    entry_id: str,
+    ean: str,
+    measurement_type: str,
+    profiles: list[str],
+    days_back: int = 1,
+    intraday: bool = False,
+    options: dict[str, Any] | None = None,
+    hedge: bool = False,
+) -> EGDOpenAPICoordinator:
+    """Build client, store and coordinator of one entry against the stand-in server."""
+    client = EGDOpenAPIClient(
+        session=session,
+        environment=ENV_PRODUCTION,
+        client_id=f"bench-{entry_id}",
+        client_secret="secret",
+        executor_job=hass.async_add_executor_job,
+        token_url=server.token_url,
+        data_base=server.data_base,
+        hedge_requests=hedge,
+    )
+    entry_data: dict[str, Any] = {
+        CONF_ENVIRONMENT: ENV_PRODUCTION,
+        CONF_CLIENT_ID: f"bench-{entry_id}",
+        CONF_CLIENT_SECRET: "secret",
+        CONF_EAN: ean,
+        CONF_MEASUREMENT_TYPE: measurement_type,
+        CONF_ZDROJ_DAT: ZDROJ_ELEKTROMER if measurement_type == MEASUREMENT_C1 else None,
+        CONF_SELECTED_PROFILES: list(profiles),
+        "options": {
+            CONF_DAYS_BACK_FETCH: days_back,
+            CONF_HEDGE_REQUESTS: hedge,
+            CONF_INTRADAY_FETCH: intraday,
+            **(options or {}),
+        },
+    }
+    store = EGDDataStore(hass, entry_id)
+    await store.async_load()
+    return EGDOpenAPICoordinator(hass, client, entry_data, store)
@@ -0,0 +1,315 @@
+"""Local stand-in for the Distribuce24 token and data endpoints.
+
+Serves the URL layout of the production hosts under one base URL:
+
+    POST /oauth/token
+    GET  /rest/profily, /rest/c/profily
+    GET  /rest/spotreby (PageStart/PageSize), /rest/c/spotreby
+
+Rows are generated on the fly for every 15-minute slot in the requested
+window, so DST days come out with 92 or 100 slots like the real API. Values
+are a deterministic function of EAN, profile and slot, which keeps repeated
+responses byte-identical. Rows are only served up to the server clock, so
+intraday and backfill behaviour can be driven by a simulated clock.
+
+Run standalone with `python -m benchmarks.mock_server --port 8099`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+import json
+import random
+import secrets
+import zlib
+from typing import Any
+
+from aiohttp import web
+
+from .payloads import PRAGUE, ROW_SHAPES, WRAPPERS, make_row, wrap_rows
+
+SLOT = timedelta(minutes=15)
+
+
+@dataclass(slots=True)
+class MockConfig:
+    """Behaviour of the stand-in server."""
+
+    profiles: tuple[str, ...] = ("ICQ2", "ISQ2")
+    shape: str = "cas_iso"
+    wrapper: str = "items"
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of responses delayed by `spike_seconds` on top, to model latency tails.
+    spike_ratio: float = 0.0
+    spike_seconds: float = 0.0
+    # Probability of answering a data request with the given status code.
+    errors: dict[int, float] = field(default_factory=dict)
+    # How several profiles in one call are accepted: "none", "repeated" or "comma".
+    batching: str = "none"
+    estimated_ratio: float = 0.01
+    max_page_size: int | None = None
+    seed: int = 24
+
+
+@dataclass(slots=True)
+class MockStats:
+    """Counters of served requests."""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    statuses: Counter[int] = field(default_factory=Counter)
+    rows: int = 0
+    bytes: int = 0
+    tokens: int = 0
+
+    def total(self) -> int:
+        return sum(self.requests.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "tokens": self.tokens,
+        }
+
+
+def parse_error_spec(spec: str) -> dict[int, float]:
+    """Parse `429:0.05,503:0.01` into a status -> probability map."""
+    errors: dict[int, float] = {}
+    for part in filter(None, (item.strip() for item in spec.split(","))):
+        status, _, probability = part.partition(":")
+        errors[int(status)] = float(probability or 1.0)
+    return errors
+
+
+class MockDistribuce24:
+    """aiohttp application emulating the Distribuce24 OpenAPI."""
+
+    def __init__(
+        self,
+        config: MockConfig | None = None,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._clock = clock or (lambda: datetime.now(tz=UTC))
+        self._rng = random.Random(self.config.seed)
+        self._tokens: set[str] = set()
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+        self.app = web.Application()
+        self.app.router.add_post("/oauth/token", self._token)
+        self.app.router.add_get("/rest/profily", self._profiles)
+        self.app.router.add_get("/rest/c/profily", self._profiles)
+        self.app.router.add_get("/rest/spotreby", self._consumption)
+        self.app.router.add_get("/rest/c/spotreby", self._consumption)
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.base_url}/oauth/token"
+
+    @property
+    def data_base(self) -> str:
+        return f"{self.base_url}/rest"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.base_url = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _delay(self) -> None:
+        delay = self.config.latency + self._rng.uniform(0, self.config.jitter)
+        if self.config.spike_ratio and self._rng.random() < self.config.spike_ratio:
+            delay += self.config.spike_seconds
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _count(self, endpoint: str, response: web.Response) -> web.Response:
+        self.stats.requests[endpoint] += 1
+        self.stats.statuses[response.status] += 1
+        self.stats.bytes += len(response.body or b"")
+        return response
+
+    def _injected_error(self) -> web.Response | None:
+        for status, probability in self.config.errors.items():
+            if self._rng.random() >= probability:
+                continue
+            if status == 401:
+                # Revoke everything so the client has to exercise re-authentication.
+                self._tokens.clear()
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return web.Response(status=status, text=f"injected {status}", headers=headers)
+        return None
+
+    def _authorized(self, request: web.Request) -> bool:
+        header = request.headers.get("Authorization", "")
+        return header.startswith("Bearer ") and header[7:] in self._tokens
+
+    async def _token(self, request: web.Request) -> web.Response:
+        await self._delay()
+        payload = await request.json()
+        if not payload.get("client_id") or not payload.get("client_secret"):
+            return self._count("token", web.json_response({"error": "invalid_client"}, status=401))
+        token = secrets.token_hex(16)
+        self._tokens.add(token)
+        self.stats.tokens += 1
+        return self._count(
+            "token",
+            web.json_response({"access_token": token, "token_type": "Bearer", "expires_in": 86400}),
+        )
+
+    async def _profiles(self, request: web.Request) -> web.Response:
+        endpoint = request.path.removeprefix("/rest/")
+        await self._delay()
+        if not self._authorized(request):
+            return self._count(endpoint, web.Response(status=401, text="unauthorized"))
+        items = [{"kod": code, "nazev": f"Profil {code}"} for code in self.config.profiles]
+        return self._count(endpoint, web.json_response({"items": items}))
+
+    async def _consumption(self, request: web.Request) -> web.Response:
+        endpoint = request.path.removeprefix("/rest/")
+        await self._delay()
+        if not self._authorized(request):
+            return self._count(endpoint, web.Response(status=401, text="unauthorized"))
+        if (injected := self._injected_error()) is not None:
+            return self._count(endpoint, injected)
+
+        query = request.query
+        if self.config.batching == "repeated":
+            profiles = query.getall("profile", [])
+        elif self.config.batching == "comma":
+            profiles = query.get("profile", "").split(",")
+        else:
+            # Like many APIs, silently use the first of repeated parameters.
+            profiles = [query.get("profile", "")]
+        for profile in profiles:
+            if profile not in self.config.profiles:
+                return self._count(endpoint, web.Response(status=400, text=f"unknown profile {profile}"))
+        try:
+            time_from = _parse_time(query["from"])
+            time_to = _parse_time(query["to"])
+        except (KeyError, ValueError):
+            return self._count(endpoint, web.Response(status=400, text="invalid from/to"))
+
+        rows: list[dict[str, Any]] = []
+        for profile in profiles:
+            profile_rows = self._rows(query.get("ean", ""), profile, time_from, time_to, c1=endpoint.startswith("c/"))
+            if self.config.batching != "none":
+                for row in profile_rows:
+                    row["profil"] = profile
+            rows.extend(profile_rows)
+        if endpoint == "spotreby":
+            page_start = int(query.get("PageStart", 0))
+            page_size = int(query.get("PageSize", len(rows) or 1))
+            if self.config.max_page_size is not None:
+                page_size = min(page_size, self.config.max_page_size)
+            rows = rows[page_start : page_start + page_size]
+
+        self.stats.rows += len(rows)
+        body = json.dumps(wrap_rows(self.config.wrapper, rows))
+        return self._count(endpoint, web.Response(text=body, content_type="application/json"))
+
+    def _rows(
+        self,
+        ean: str,
+        profile: str,
+        time_from: datetime,
+        time_to: datetime,
+        *,
+        c1: bool,
+    ) -> list[dict[str, Any]]:
+        """Build rows for slots starting in [time_from, time_to] that already ended."""
+        now = self._clock()
+        seed = zlib.crc32(f"{ean}:{profile}".encode())
+        slot_ms = int(SLOT.total_seconds() * 1000)
+        first_ms = -(-int(time_from.timestamp() * 1000) // slot_ms) * slot_ms
+        slot = datetime.fromtimestamp(first_ms / 1000, tz=UTC)
+
+        rows: list[dict[str, Any]] = []
+        while slot <= time_to and slot + SLOT <= now:
+            key = (seed ^ int(slot.timestamp()) // 900) * 2654435761 & 0xFFFFFFFF
+            value = (key % 2500) / 1000
+            valid = (key % 10000) / 10000 >= self.config.estimated_ratio
+            rows.append(make_row(self.config.shape, slot.astimezone(PRAGUE), value, valid, c1=c1))
+            slot += SLOT
+        return rows
+
+
+def _parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=PRAGUE)
+    return parsed.astimezone(UTC)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = MockDistribuce24(
+        MockConfig(
+            profiles=tuple(args.profiles),
+            shape=args.shape,
+            wrapper=args.wrapper,
+            latency=args.latency,
+            jitter=args.jitter,
+            spike_ratio=args.spike_ratio,
+            spike_seconds=args.spike_seconds,
+            batching=args.batching,
+            errors=parse_error_spec(args.errors),
+        )
+    )
+    base_url = await server.start(args.host, args.port)
+    print(f"Token URL: {server.token_url}\nData base: {server.data_base}")
+    print(f"Serving on {base_url}, Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        print(json.dumps(server.stats.as_dict(), indent=2))
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add stand-in server options shared by the harness scripts."""
+    parser.add_argument("--profiles", nargs="+", default=["ICQ2", "ISQ2"])
+    parser.add_argument("--shape", choices=ROW_SHAPES, default="cas_iso")
+    parser.add_argument("--wrapper", choices=WRAPPERS, default="items")
+    parser.add_argument("--latency", type=float, default=0.0, help="base response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this many seconds")
+    parser.add_argument("--spike-ratio", type=float, default=0.0, help="share of responses delayed by --spike-seconds")
+    parser.add_argument("--spike-seconds", type=float, default=2.0)
+    parser.add_argument(
+        "--batching",
+        choices=("none", "repeated", "comma"),
+        default="none",
+        help="how the server accepts several profiles in one call",
+    )
+    parser.add_argument("--errors", default="", help="status:probability list, e.g. 429:0.05,503:0.01")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Distribuce24 stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Synthetic Distribuce24 payload generators for benchmarks."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+import random
+from typing import Any
+from zoneinfo import ZoneInfo
+
+PRAGUE = ZoneInfo("Europe/Prague")
+
+ROW_SHAPES = (
+    "cas_iso",
+    "datum_interval",
+    "nested_value",
+    "status_object",
+    "wh_units",
+    "kw_units",
+)
+WRAPPERS = ("list", "items", "data", "deep")
+SIZES = {"1d": 1, "1m": 31, "1y": 365}
+
+
+def slot_starts(first_day: date, days: int) -> list[datetime]:
+    """Return local 15-minute slot starts, honouring DST transitions."""
+    start = datetime.combine(first_day, datetime.min.time(), tzinfo=PRAGUE).astimezone(UTC)
+    end = datetime.combine(first_day + timedelta(days=days), datetime.min.time(), tzinfo=PRAGUE).astimezone(UTC)
+    slots: list[datetime] = []
+    current = start
+    while current < end:
+        slots.append(current.astimezone(PRAGUE))
+        current += timedelta(minutes=15)
+    return slots
+
+
+def make_row(shape: str, slot: datetime, value: float, valid: bool, *, c1: bool = False) -> dict[str, Any]:
+    """Build one row in the given shape; `c1` uses the C1 status codes."""
+    if c1:
+        status = "W" if valid else "E"
+    else:
+        status = "IU012" if valid else "IU020"
+    if shape == "cas_iso":
+        return {"cas": slot.isoformat(), "hodnota": f"{value:.3f}", "status": status, "jednotka": "kWh"}
+    if shape == "datum_interval":
+        end = slot + timedelta(minutes=14)
+        return {
+            "datum": f"{slot.day}.{slot.month}.{slot.year}",
+            "interval": f"{slot:%H:%M}-{end:%H:%M}",
+            "hodnota": f"{value:.3f}".replace(".", ","),
+            "status": status,
+        }
+    if shape == "nested_value":
+        return {
+            "cas": slot.isoformat(),
+            "hodnota": {"value": f"{value:.3f}", "jednotka": {"kod": "kWh"}},
+            "status": "W" if valid else "E",
+        }
+    if shape == "status_object":
+        return {
+            "cas": slot.astimezone(UTC).isoformat().replace("+00:00", "Z"),
+            "hodnota": value,
+            "status": {"kod": status, "nazev": "Platná" if valid else "Neplatná"},
+        }
+    if shape == "wh_units":
+        return {"cas": slot.isoformat(), "hodnota": int(value * 1000), "status": status, "jednotka": "Wh"}
+    if shape == "kw_units":
+        return {"cas": slot.isoformat(), "hodnota": f"{value * 4:.3f}", "status": status, "jednotka": "kW"}
+    raise ValueError(f"Unknown row shape: {shape}")
+
+
+def make_rows(
+    shape: str,
+    days: int,
+    *,
+    first_day: date = date(2026, 3, 1),
+    invalid_ratio: float = 0.02,
+    seed: int = 24,
+) -> list[dict[str, Any]]:
+    """Build rows for consecutive days; March covers the spring DST change."""
+    rng = random.Random(seed)
+    return [
+        make_row(shape, slot, round(rng.uniform(0, 2.5), 3), rng.random() >= invalid_ratio)
+        for slot in slot_starts(first_day, days)
+    ]
+
+
+def wrap_rows(wrapper: str, rows: list[dict[str, Any]]) -> Any:
+    """Wrap rows the way different API variants return them."""
+    if wrapper == "list":
+        return rows
+    if wrapper in ("items", "data"):
+        return {wrapper: rows, "total": len(rows)}
+    if wrapper == "deep":
+        return {
+            "result": {
+                "ean": "859182400000000000",
+                "meta": [{"key": "profil", "value": "ICQ2"}],
+                "profiles": [{"profil": "ICQ2", "mereni": {"body": rows}}],
+            }
+        }
+    raise ValueError(f"Unknown wrapper: {wrapper}")
@@ -0,0 +1,280 @@
+"""Fleet soak test: many config entries refreshing over simulated days.
+
+Every entry gets its own real coordinator, client, day store and sensor
+entities, all against one local Distribuce24 stand-in. Entries get random
+fetch minutes like the config flow assigns; the simulated clock steps
+through each hour and fires refreshes at the offsets the domain-wide
+scheduler plans, under its concurrency cap. `--legacy-timers` fires every
+entry at its own minute without a cap instead, as independent per-entry
+timers would. Reports per simulated day:
+
+- event-loop lag (max and p99 of a 50 ms heartbeat),
+- traced memory and its growth per entry since the end of day one,
+- requests per simulated hour,
+- state writes and their serialized size,
+- series attribute points per entry, which must plateau at the retention.
+
+Run from the repository root with Home Assistant installed:
+
+    python -m benchmarks.soak --entries 200 --days 7
+    python -m benchmarks.soak --entries 500 --days 3 --legacy-timers --latency 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from aiohttp import ClientSession, TCPConnector
+from homeassistant.util import dt as dt_util
+
+from custom_components.egd_openapi.const import (
+    CONF_DAYS_TO_KEEP_SERIES,
+    MEASUREMENT_AB,
+    MEASUREMENT_C1,
+    SCHEDULER_MAX_CONCURRENT,
+)
+from custom_components.egd_openapi.coordinator import EGDOpenAPICoordinator
+from custom_components.egd_openapi.scheduler import plan_offsets
+from custom_components.egd_openapi.sensor import build_entities
+
+from .harness import SimulatedClock, async_create_coordinator, async_create_hass, parse_start
+from .mock_server import MockConfig, MockDistribuce24, add_server_arguments, parse_error_spec
+
+HEARTBEAT_SECONDS = 0.05
+
+
+class LoopLagMonitor:
+    """Measure how late a periodic heartbeat wakes up."""
+
+    def __init__(self, interval: float = HEARTBEAT_SECONDS) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def drain(self) -> dict[str, float]:
+        samples, self.samples = self.samples, []
+        if not samples:
+            return {"max_ms": 0.0, "p99_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "max_ms": round(ordered[-1] * 1000, 1),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1),
+        }
+
+
+class WriteCounter:
+    """Count state writes of real sensor entities without a state machine."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+        self.bytes = 0
+
+    def attach(self, coordinator: EGDOpenAPICoordinator, ean: str) -> list[Any]:
+        entities = build_entities(coordinator, ean)
+        for index, entity in enumerate(entities):
+            entity.hass = coordinator.hass
+            entity.entity_id = f"sensor.soak_{ean}_{index}"
+            entity.async_write_ha_state = self._writer(entity)
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+        return entities
+
+    def _writer(self, entity: Any) -> Any:
+        def _write() -> None:
+            self.writes += 1
+            state = {"state": entity.native_value, **(entity.extra_state_attributes or {})}
+            self.bytes += len(json.dumps(state, default=str))
+
+        return _write
+
+    def drain(self) -> tuple[int, int]:
+        counts = (self.writes, self.bytes)
+        self.writes = self.bytes = 0
+        return counts
+
+
+async def async_run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    local_tz = dt_util.get_time_zone("Europe/Prague")
+    start = parse_start(args.start) or datetime(2026, 3, 1, tzinfo=local_tz)
+    clock = SimulatedClock(start.replace(minute=0, second=0, microsecond=0))
+    server = MockDistribuce24(
+        MockConfig(
+            profiles=tuple(args.profiles),
+            shape=args.shape,
+            wrapper=args.wrapper,
+            latency=args.latency,
+            jitter=args.jitter,
+            spike_ratio=args.spike_ratio,
+            spike_seconds=args.spike_seconds,
+            batching=args.batching,
+            errors=parse_error_spec(args.errors),
+        ),
+        clock=clock,
+    )
+    await server.start()
+    monitor = LoopLagMonitor()
+    writes = WriteCounter()
+    report: list[dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_create_hass(config_dir)
+        tracemalloc.start()
+        try:
+            async with ClientSession(connector=TCPConnector(limit=args.connections)) as session:
+                rng = random.Random(args.seed)
+                coordinators: dict[str, EGDOpenAPICoordinator] = {}
+                preferred: dict[str, int] = {}
+                entities: list[Any] = []
+                for index in range(args.entries):
+                    ean = f"8591824{index:011d}"
+                    coordinator = await async_create_coordinator(
+                        hass,
+                        session,
+                        server,
+                        entry_id=f"soak{index}",
+                        ean=ean,
+                        measurement_type=MEASUREMENT_C1 if args.c1 else MEASUREMENT_AB,
+                        profiles=args.profiles,
+                        days_back=args.days_back,
+                        intraday=args.intraday,
+                        options={CONF_DAYS_TO_KEEP_SERIES: args.keep_days},
+                    )
+                    entities.extend(writes.attach(coordinator, ean))
+                    coordinators[f"soak{index}"] = coordinator
+                    preferred[f"soak{index}"] = rng.randint(1, 59)
+
+                if args.legacy_timers:
+                    offsets = {entry_id: minute * 60.0 for entry_id, minute in preferred.items()}
+                    semaphore = asyncio.Semaphore(args.entries)
+                else:
+                    offsets = plan_offsets(preferred)
+                    semaphore = asyncio.Semaphore(args.max_concurrent)
+                by_offset: defaultdict[float, list[EGDOpenAPICoordinator]] = defaultdict(list)
+                for entry_id, offset in offsets.items():
+                    by_offset[offset].append(coordinators[entry_id])
+
+                async def _refresh(coordinator: EGDOpenAPICoordinator) -> None:
+                    async with semaphore:
+                        await coordinator.async_refresh()
+
+                monitor.start()
+                baseline_memory: int | None = None
+                for day in range(args.days):
+                    requests_before = server.stats.total()
+                    failures = 0
+                    started = time.perf_counter()
+                    for _ in range(24):
+                        hour_start = clock.now
+                        for offset in sorted(by_offset):
+                            group = by_offset[offset]
+                            clock.now = hour_start + timedelta(seconds=offset)
+                            with clock.patch():
+                                await asyncio.gather(*(_refresh(c) for c in group))
+                            failures += sum(1 for c in group if not c.last_update_success)
+                        clock.now = hour_start + timedelta(hours=1)
+
+                    memory, _ = tracemalloc.get_traced_memory()
+                    if baseline_memory is None:
+                        baseline_memory = memory
+                    write_count, write_bytes = writes.drain()
+                    series_points = [
+                        sum(len(points) for points in c.series_history.values()) for c in coordinators.values()
+                    ]
+                    report.append(
+                        {
+                            "day": day + 1,
+                            "simulated_date": (clock.now - timedelta(hours=1)).astimezone(local_tz).date().isoformat(),
+                            "wall_s": round(time.perf_counter() - started, 2),
+                            "failed_refreshes": failures,
+                            "requests_per_hour": round((server.stats.total() - requests_before) / 24, 1),
+                            "state_writes": write_count,
+                            "state_write_kib": round(write_bytes / 1024, 1),
+                            "loop_lag": monitor.drain(),
+                            "traced_memory_mib": round(memory / 2**20, 2),
+                            "growth_per_entry_kib": round((memory - baseline_memory) / args.entries / 1024, 2),
+                            "series_points_per_entry": {
+                                "mean": round(statistics.fmean(series_points), 1),
+                                "max": max(series_points),
+                            },
+                        }
+                    )
+                    _print_day(report[-1])
+                await monitor.stop()
+        finally:
+            tracemalloc.stop()
+            await hass.async_stop(force=True)
+            await server.stop()
+
+    print(f"\nServer: {json.dumps(server.stats.as_dict())}")
+    return report
+
+
+def _print_day(day: dict[str, Any]) -> None:
+    print(
+        f"day {day['day']:>3} {day['simulated_date']}  wall {day['wall_s']:7.1f}s"
+        f"  {day['requests_per_hour']:8.1f} req/h  {day['failed_refreshes']:5} failed"
+        f"  {day['state_writes']:7} writes ({day['state_write_kib']:9.1f} KiB)"
+        f"  lag max {day['loop_lag']['max_ms']:7.1f} ms p99 {day['loop_lag']['p99_ms']:6.1f} ms"
+        f"  mem {day['traced_memory_mib']:8.2f} MiB ({day['growth_per_entry_kib']:+.2f} KiB/entry)"
+        f"  series {day['series_points_per_entry']['max']} pts"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_server_arguments(parser)
+    parser.add_argument("--entries", type=int, default=50)
+    parser.add_argument("--days", type=int, default=3, help="simulated days")
+    parser.add_argument("--start", help="simulated local start, e.g. 2026-03-25T00:00")
+    parser.add_argument("--c1", action="store_true", help="use C1 measurement endpoints")
+    parser.add_argument("--days-back", type=int, default=1)
+    parser.add_argument("--keep-days", type=int, default=7)
+    parser.add_argument("--intraday", action="store_true")
+    parser.add_argument(
+        "--legacy-timers",
+        action="store_true",
+        help="fire each entry at its own fetch minute without a concurrency cap",
+    )
+    parser.add_argument("--max-concurrent", type=int, default=SCHEDULER_MAX_CONCURRENT)
+    parser.add_argument("--seed", type=int, default=24, help="seed of the random fetch minutes")
+    parser.add_argument("--connections", type=int, default=100, help="client connection pool limit")
+    parser.add_argument("--json", metavar="PATH", help="also write the daily report to a JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(async_run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,103 +2,250 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from collections.abc import Mapping
 import logging
 from typing import Any
 
+from aiohttp import ClientSession
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_point_in_time
-from homeassistant.util import dt as dt_util
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.typing import ConfigType
 
-from .api import EGDOpenAPIClient
+from .api import CircuitBreaker, EGDOpenAPIClient, EGDTokenCache, ProfileBatching
+from .blockstore import EntryArchive
+from .catalog import async_get_catalog, catalog_key
 from .const import (
     CONF_CLIENT_ID,
     CONF_CLIENT_SECRET,
+    CONF_DAYS_BACK_FETCH,
+    CONF_DEDICATED_SESSION,
+    CONF_EAN,
     CONF_FETCH_MINUTE,
+    CONF_HEDGE_REQUESTS,
+    CONF_INTRADAY_FETCH,
+    CONF_MEASUREMENT_TYPE,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PROFILE_MAP,
+    DATA_CIRCUIT_BREAKERS,
+    DATA_PROFILE_BATCHING,
+    DATA_SCHEDULER,
+    DATA_TOKEN_CACHES,
+    DEFAULT_DEDICATED_SESSION,
+    DEFAULT_HEDGE_REQUESTS,
+    DEFAULT_OFFLOAD_THRESHOLD,
     DOMAIN,
     PLATFORMS,
-    UNSUB_SCHEDULE,
+    SIGNAL_PROFILES_UPDATED,
 )
 from .coordinator import EGDOpenAPICoordinator
+from .scheduler import EGDRefreshScheduler
+from .sensor import build_entities
+from .services import async_setup_services
+from .session import async_acquire_session, async_release_session
+from .storage import EGDDataStore
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up integration-wide services, refresh scheduler and per-environment API state."""
+    async_setup_services(hass)
+    scheduler = hass.data[DATA_SCHEDULER] = EGDRefreshScheduler(hass)
+
+    @callback
+    def _async_stop_scheduler(_: Event) -> None:
+        scheduler.async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop_scheduler)
+    hass.data[DATA_TOKEN_CACHES] = {}
+    hass.data[DATA_CIRCUIT_BREAKERS] = {}
+    hass.data[DATA_PROFILE_BATCHING] = {}
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from config entry."""
-    session = async_get_clientsession(hass)
+    dedicated_session = entry.options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION)
+    if dedicated_session:
+        session = async_acquire_session(hass, entry.data["environment"], entry.entry_id)
+    else:
+        session = async_get_clientsession(hass)
+
+    try:
+        await _async_setup_runtime(hass, entry, session)
+    except Exception:
+        # Also covers ConfigEntryNotReady; a retried setup acquires everything again.
+        hass.data[DATA_SCHEDULER].async_remove(entry.entry_id)
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        if dedicated_session:
+            await async_release_session(hass, entry.data["environment"], entry.entry_id)
+        raise
+    return True
+
 
+async def _async_setup_runtime(hass: HomeAssistant, entry: ConfigEntry, session: ClientSession) -> None:
+    """Create the client and coordinator of an entry and set up its platforms."""
     client = EGDOpenAPIClient(
         session=session,
         environment=entry.data["environment"],
         client_id=entry.data[CONF_CLIENT_ID],
         client_secret=entry.data[CONF_CLIENT_SECRET],
+        executor_job=hass.async_add_executor_job,
+        offload_threshold=int(entry.options.get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD)),
+        token_cache=hass.data[DATA_TOKEN_CACHES].setdefault(_credentials_key(entry.data), EGDTokenCache()),
+        # All entries of an environment talk to the same hosts and share one breaker.
+        circuit_breaker=hass.data[DATA_CIRCUIT_BREAKERS].setdefault(entry.data["environment"], CircuitBreaker()),
+        hedge_requests=bool(entry.options.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS)),
+        profile_batching=hass.data[DATA_PROFILE_BATCHING].setdefault(entry.data["environment"], ProfileBatching()),
     )
 
     entry_payload: dict[str, Any] = dict(entry.data)
     entry_payload["options"] = dict(entry.options)
 
-    coordinator = EGDOpenAPICoordinator(hass, client, entry_payload)
-    await coordinator.async_config_entry_first_refresh()
+    store = EGDDataStore(hass, entry.entry_id)
+    await store.async_load()
+
+    coordinator = EGDOpenAPICoordinator(hass, client, entry_payload, store)
+    restored = coordinator.restore_payload()
+    if restored is not None:
+        coordinator.async_set_updated_data(restored)
+    else:
+        # Nothing stored to show yet; a failed first refresh retries setup with backoff.
+        await hass.data[DATA_SCHEDULER].async_run_now(entry.entry_id, coordinator.async_config_entry_first_refresh)
+    coordinator.async_track_prices()
+    entry.async_on_unload(coordinator.async_untrack_prices)
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
 
-    _schedule_hourly_refresh(hass, entry, coordinator)
+    hass.data[DATA_SCHEDULER].async_add(entry, coordinator, _fetch_minute(entry))
+
+    # Keeps the options flow's profile list current without blocking it.
+    catalog = await async_get_catalog(hass)
+    catalog.async_revalidate_if_stale(
+        client,
+        entry.data[CONF_MEASUREMENT_TYPE],
+        catalog_key(
+            entry.data["environment"],
+            entry.data[CONF_CLIENT_ID],
+            entry.data[CONF_CLIENT_SECRET],
+            entry.data[CONF_MEASUREMENT_TYPE],
+        ),
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
-    return True
-
-
-def _schedule_hourly_refresh(
-    hass: HomeAssistant,
-    entry: ConfigEntry,
-    coordinator: EGDOpenAPICoordinator,
-) -> None:
-    """Schedule refresh once per hour at configured minute in Europe/Prague."""
-    minute = int(entry.options.get(CONF_FETCH_MINUTE, entry.data.get(CONF_FETCH_MINUTE, 1)))
-    prague_tz = dt_util.get_time_zone("Europe/Prague")
-
-    def _next_run(now_local: datetime) -> datetime:
-        run_local = now_local.replace(minute=minute, second=0, microsecond=0)
-        if run_local <= now_local:
-            run_local = run_local + timedelta(hours=1)
-        return run_local.astimezone(dt_util.UTC)
-
-    async def _schedule_next(now_utc: datetime | None = None) -> None:
-        local_now = (now_utc or dt_util.now()).astimezone(prague_tz)
-        run_at_utc = _next_run(local_now)
-        _LOGGER.debug(
-            "Scheduling EG.D next hourly refresh for %s local (%s UTC)",
-            run_at_utc.astimezone(prague_tz).isoformat(),
-            run_at_utc.isoformat(),
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    if restored is not None:
+        # Entities start from restored data; the network refresh must not block setup.
+        entry.async_create_background_task(
+            hass,
+            hass.data[DATA_SCHEDULER].async_run_now(entry.entry_id, coordinator.async_refresh),
+            f"{DOMAIN} first refresh {entry.entry_id}",
         )
 
-        async def _run_scheduled(_: datetime) -> None:
-            _LOGGER.debug("Scheduled EG.D hourly refresh triggered")
-            await coordinator.async_request_refresh()
-            await _schedule_next()
 
-        unsub = async_track_point_in_time(hass, _run_scheduled, run_at_utc)
-        hass.data[DOMAIN][entry.entry_id][UNSUB_SCHEDULE] = unsub
+def _fetch_minute(entry: ConfigEntry) -> int:
+    """Return preferred minute of the hourly refresh in Europe/Prague."""
+    return int(entry.options.get(CONF_FETCH_MINUTE, entry.data.get(CONF_FETCH_MINUTE, 1)))
 
-    hass.async_create_task(_schedule_next())
+
+def _credentials_key(data: Mapping[str, Any]) -> tuple[str, str, str]:
+    """Return key of the token cache shared by entries with equal credentials."""
+    return (data["environment"], data[CONF_CLIENT_ID], data[CONF_CLIENT_SECRET])
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
+        hass.data[DATA_SCHEDULER].async_remove(entry.entry_id)
         runtime = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
-        if runtime and (unsub := runtime.get(UNSUB_SCHEDULE)):
-            unsub()
+        if not hass.data.get(DOMAIN):
+            hass.data[DATA_SCHEDULER].async_shutdown()
+        key = _credentials_key(entry.data)
+        if not any(
+            _credentials_key(other["coordinator"].entry_data) == key
+            for other in hass.data.get(DOMAIN, {}).values()
+        ):
+            hass.data[DATA_TOKEN_CACHES].pop(key, None)
+        if runtime:
+            await runtime["coordinator"].store.async_save()
+            await hass.async_add_executor_job(runtime["coordinator"].archive.close)
+        await async_release_session(hass, entry.data["environment"], entry.entry_id)
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload entry after updates."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored interval data of a deleted entry."""
+    await EGDDataStore(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(EntryArchive(hass.config.path(STORAGE_DIR), entry.entry_id).remove)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply option changes in place; reload only when entry data changed."""
+    runtime = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if runtime is None:
+        return
+    coordinator: EGDOpenAPICoordinator = runtime["coordinator"]
+    # Profile names refreshed by the options flow are applied in place.
+    previous_data = {
+        key: value for key, value in coordinator.entry_data.items() if key not in ("options", CONF_PROFILE_MAP)
+    }
+    if previous_data != {key: value for key, value in entry.data.items() if key != CONF_PROFILE_MAP}:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.entry_data[CONF_PROFILE_MAP] = entry.data.get(CONF_PROFILE_MAP, {})
+
+    previous_options = dict(coordinator.entry_data.get("options", {}))
+    if previous_options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION) != entry.options.get(
+        CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION
+    ):
+        # The client is bound to its session; switching pools needs a new client.
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    added_profiles = coordinator.async_apply_options(dict(entry.options))
+    changed = {
+        key
+        for key in set(previous_options) | set(entry.options)
+        if previous_options.get(key) != entry.options.get(key)
+    }
+    _LOGGER.debug("Applying EG.D option changes in place: %s", sorted(changed))
+
+    _async_remove_stale_entities(hass, entry, coordinator)
+    async_dispatcher_send(hass, SIGNAL_PROFILES_UPDATED.format(entry.entry_id))
+
+    if CONF_FETCH_MINUTE in changed:
+        hass.data[DATA_SCHEDULER].async_add(entry, coordinator, _fetch_minute(entry))
+
+    if added_profiles or CONF_DAYS_BACK_FETCH in changed or CONF_INTRADAY_FETCH in changed:
+        # The planner requests only days and profiles missing from the store.
+        entry.async_create_background_task(
+            hass,
+            hass.data[DATA_SCHEDULER].async_run_now(entry.entry_id, coordinator.async_refresh),
+            f"{DOMAIN} options refresh {entry.entry_id}",
+        )
+    else:
+        coordinator.async_update_listeners()
+
+
+def _async_remove_stale_entities(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: EGDOpenAPICoordinator,
+) -> None:
+    """Remove registry entries of deselected profiles and disabled modes."""
+    expected = {entity.unique_id for entity in build_entities(coordinator, entry.data[CONF_EAN])}
+
+    registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(registry, entry.entry_id):
+        if entity_entry.unique_id not in expected:
+            registry.async_remove(entity_entry.entity_id)
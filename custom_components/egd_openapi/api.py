@@ -2,22 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from functools import partial
+import json
 import logging
+import time
 from typing import Any
 
-from aiohttp import ClientResponseError, ClientSession
+from aiohttp import ClientResponse, ClientResponseError, ClientSession
 
 from .const import (
+    BATCH_COMMA,
+    BATCH_PROBE_ATTEMPTS,
+    BATCH_REPEATED,
+    CIRCUIT_CLOSED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_MAX_OPEN_SECONDS,
+    CIRCUIT_OPEN,
+    CIRCUIT_OPEN_SECONDS,
+    DEFAULT_OFFLOAD_THRESHOLD,
     ENV_PRODUCTION,
+    HEDGE_BUDGET,
+    HEDGE_MIN_DELAY_SECONDS,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
     MEASUREMENT_C1,
+    OFFLOAD_BYTES_PER_ROW,
     PROD_DATA_BASE,
     PROD_TOKEN_URL,
     TEST_DATA_BASE,
     TEST_TOKEN_URL,
     TOKEN_SCOPE,
 )
+from . import tracing
+from .metrics import ERROR_CANCELLED, RequestMetric, RequestMetrics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +53,137 @@ class EGDAPIAuthError(EGDAPIError):
     """Authentication error."""
 
 
+class EGDAPICircuitOpenError(EGDAPIError):
+    """Request refused because the API is failing and the circuit is open."""
+
+
+class EGDAPINoProfilesError(EGDAPIError):
+    """The API lists no profiles for the supply point."""
+
+
+class EGDTokenCache:
+    """Access token shared by clients that use the same credentials."""
+
+    def __init__(self) -> None:
+        self.token: str | None = None
+        self.token_day: str | None = None
+        self.lock = asyncio.Lock()
+
+
+class CircuitBreaker:
+    """Stop calling the data API after consecutive server-side failures.
+
+    After `failure_threshold` failures in a row the circuit opens and
+    requests fail fast. Once the open period elapses a single probe is let
+    through (half-open); success closes the circuit, failure reopens it for
+    twice as long, up to `max_open_seconds`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        max_open_seconds: float = CIRCUIT_MAX_OPEN_SECONDS,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.open_for = open_seconds
+        self.opened_at: float | None = None
+        self.opened_count = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_request(self) -> None:
+        """Raise EGDAPICircuitOpenError unless a request may be sent now."""
+        if self.state == CIRCUIT_CLOSED:
+            return
+        if self.state == CIRCUIT_OPEN and self.opened_at is not None:
+            remaining = self.opened_at + self.open_for - time.monotonic()
+            if remaining <= 0:
+                self.state = CIRCUIT_HALF_OPEN
+        if self.state == CIRCUIT_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.rejected += 1
+        raise EGDAPICircuitOpenError("Distribuce24 API is failing, requests are paused.")
+
+    def record_success(self) -> None:
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("Distribuce24 API responds again, closing circuit")
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.open_for = self.open_seconds
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CIRCUIT_HALF_OPEN:
+            self.open_for = min(self.max_open_seconds, self.open_for * 2)
+            self._open()
+        elif self.state == CIRCUIT_CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def release_probe(self) -> None:
+        """Let another probe through when the current one ended without a verdict."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = CIRCUIT_OPEN
+        self.opened_at = time.monotonic()
+        self.opened_count += 1
+        self._probe_in_flight = False
+        _LOGGER.warning(
+            "Distribuce24 API failed %s times in a row, pausing requests for %s seconds",
+            self.failures,
+            round(self.open_for),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "open_for_seconds": round(self.open_for),
+            "reopens_in_seconds": (
+                max(0, round(self.opened_at + self.open_for - time.monotonic()))
+                if self.state == CIRCUIT_OPEN and self.opened_at is not None
+                else None
+            ),
+            "opened_count": self.opened_count,
+            "rejected_requests": self.rejected,
+        }
+
+
+class ProfileBatching:
+    """Whether data endpoints accept several profiles in one call.
+
+    Shared by all clients of an environment. Each endpoint is probed first
+    with repeated `profile` parameters and then with one comma-separated
+    value; the first form whose answer can be split back by profile code is
+    used from then on, or None when neither works. A form whose answer
+    leaves some profiles out stays pending and is the only one tried again,
+    until it names them all or has answered BATCH_PROBE_ATTEMPTS times.
+    """
+
+    def __init__(self) -> None:
+        self.styles: dict[str, str | None] = {}
+        self.pending: dict[str, tuple[str, int]] = {}
+        self.lock = asyncio.Lock()
+
+    def possible(self, endpoint: str) -> bool:
+        """Return False once the endpoint is known not to accept several profiles."""
+        return endpoint not in self.styles or self.styles[endpoint] is not None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **{endpoint: f"probing {style}" for endpoint, (style, _) in self.pending.items()},
+            **{endpoint: style or "unsupported" for endpoint, style in self.styles.items()},
+        }
+
+
 @dataclass(slots=True)
 class Profile:
     """Represents one profile option."""
@@ -47,92 +201,299 @@ class EGDOpenAPIClient:
         environment: str,
         client_id: str,
         client_secret: str,
+        executor_job: Callable[[Callable[[], Any]], Awaitable[Any]] | None = None,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        token_url: str | None = None,
+        data_base: str | None = None,
+        token_cache: EGDTokenCache | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedge_requests: bool = False,
+        profile_batching: ProfileBatching | None = None,
     ) -> None:
         self._session = session
         self._environment = environment
         self._client_id = client_id
         self._client_secret = client_secret
+        self._executor_job = executor_job or self._run_in_default_executor
+        # Overrides point the client at a stand-in server for offline benchmarks.
+        self._token_url_override = token_url
+        self._data_base_override = data_base
+
+        self._token_cache = token_cache or EGDTokenCache()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.profile_batching = profile_batching or ProfileBatching()
+
+        # Bodies above this size are decoded and scanned for rows in an executor.
+        self.offload_bytes = offload_threshold * OFFLOAD_BYTES_PER_ROW
+        self.stage_timings: defaultdict[str, float] = defaultdict(float)
+        self.metrics = RequestMetrics()
+        # Send one duplicate of a GET that is slower than usual for its endpoint.
+        self.hedge_requests = hedge_requests
 
-        self._token: str | None = None
-        self._token_day: str | None = None
+    @staticmethod
+    async def _run_in_default_executor(job: Callable[[], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, job)
 
     @property
     def _token_url(self) -> str:
+        if self._token_url_override:
+            return self._token_url_override
         return PROD_TOKEN_URL if self._environment == ENV_PRODUCTION else TEST_TOKEN_URL
 
     @property
     def _data_base(self) -> str:
+        if self._data_base_override:
+            return self._data_base_override
         return PROD_DATA_BASE if self._environment == ENV_PRODUCTION else TEST_DATA_BASE
 
-    async def async_get_token(self, force_refresh: bool = False) -> str:
-        """Return cached token for current day or fetch new one."""
-        utc_today = datetime.now(tz=UTC).date().isoformat()
-        if not force_refresh and self._token and self._token_day == utc_today:
-            return self._token
-
+    async def async_get_token(self, force_refresh: bool = False, rejected: str | None = None) -> str:
+        """Return cached token for current day or fetch new one.
+
+        Clients sharing a token cache fetch at most one token at a time. A
+        forced refresh is skipped when another client already replaced the
+        `rejected` token.
+        """
+        cache = self._token_cache
+        async with cache.lock:
+            utc_today = datetime.now(tz=UTC).date().isoformat()
+            fresh = cache.token is not None and cache.token_day == utc_today
+            if fresh and (not force_refresh or (rejected is not None and cache.token != rejected)):
+                return cache.token
+            token = await self._async_fetch_token()
+            cache.token = token
+            cache.token_day = utc_today
+            return token
+
+    async def _async_fetch_token(self) -> str:
         payload = {
             "grant_type": "client_credentials",
             "client_id": self._client_id,
             "client_secret": self._client_secret,
             "scope": TOKEN_SCOPE,
         }
-        async with self._session.post(self._token_url, json=payload) as resp:
-            if resp.status in (401, 403):
-                raise EGDAPIAuthError("Authentication failed. Verify client_id/client_secret.")
-            if resp.status >= 400:
-                body = await resp.text()
-                raise EGDAPIError(f"Token endpoint error ({resp.status}): {body}")
-            data = await resp.json()
+        metric = RequestMetric(endpoint="token")
+        started = time.perf_counter()
+        try:
+            async with self._session.post(self._token_url, json=payload) as resp:
+                metric.status = resp.status
+                if resp.status in (401, 403):
+                    raise EGDAPIAuthError("Authentication failed. Verify client_id/client_secret.")
+                if resp.status >= 400:
+                    body = await resp.text()
+                    raise EGDAPIError(f"Token endpoint error ({resp.status}): {body}")
+                data = await resp.json()
+        except Exception as err:
+            metric.error = type(err).__name__
+            raise
+        finally:
+            metric.latency = time.perf_counter() - started
+            self.metrics.record(metric)
+            tracing.record_span("token", started, metric.latency, status=metric.status)
 
         token = data.get("access_token")
         if not token:
             raise EGDAPIError("Token endpoint did not return access_token.")
-
-        self._token = token
-        self._token_day = utc_today
         return token
 
     async def _request(
         self,
         method: str,
         path: str,
-        params: dict[str, Any] | None = None,
+        params: Mapping[str, Any] | Sequence[tuple[str, Any]] | None = None,
+        parse: Callable[[Any], Any] | None = None,
+        page: int = 1,
     ) -> Any:
-        token = await self.async_get_token()
+        delay = self._hedge_delay(path) if self.hedge_requests and method == "GET" else None
+        if delay is None:
+            return await self._async_request_once(method, path, params, parse, page)
+        return await self._async_hedged_request(delay, method, path, params, parse, page)
+
+    def _hedge_delay(self, path: str) -> float | None:
+        """Return how long to wait before hedging a call, or None to never hedge it."""
+        histogram = self.metrics.histograms.get(path)
+        if histogram is None or histogram.requests < HEDGE_MIN_SAMPLES:
+            return None
+        # A duplicate must not become a second probe of a failing API.
+        if self.circuit_breaker.state != CIRCUIT_CLOSED:
+            return None
+        percentile = self.metrics.latency_percentile(HEDGE_PERCENTILE, path, successful_only=True)
+        if percentile is None:
+            return None
+        return max(HEDGE_MIN_DELAY_SECONDS, percentile)
+
+    async def _async_hedged_request(
+        self,
+        delay: float,
+        method: str,
+        path: str,
+        params: Mapping[str, Any] | Sequence[tuple[str, Any]] | None,
+        parse: Callable[[Any], Any] | None,
+        page: int,
+    ) -> Any:
+        """Send one duplicate when the call has not answered within `delay`.
+
+        The first successful answer wins. A losing hedge is cancelled; a
+        losing primary is left to finish so the latency gained is measured.
+        """
+        loop = asyncio.get_running_loop()
+        primary = loop.create_task(self._async_request_once(method, path, params, parse, page))
+        pending: set[asyncio.Task[Any]] = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done or not self.metrics.hedge_allowed(HEDGE_BUDGET):
+                return await primary
+
+            self.metrics.record_hedge_sent()
+            hedge = loop.create_task(self._async_request_once(method, path, params, parse, page, hedge=True))
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next(
+                    (task for task in (primary, hedge) if task in done and task.exception() is None),
+                    None,
+                )
+                if winner is None:
+                    continue
+                if winner is hedge:
+                    won_at = loop.time()
+                    if primary.done():
+                        self.metrics.record_hedge_won(None)
+                    else:
+                        primary.add_done_callback(
+                            lambda task: self._record_hedge_gain(task, loop.time() - won_at)
+                        )
+                        pending.discard(primary)
+                for task in pending:
+                    task.cancel()
+                return winner.result()
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        # Both calls failed; report the primary's error.
+        return primary.result()
+
+    def _record_hedge_gain(self, task: asyncio.Task[Any], gained: float) -> None:
+        """Record the latency a hedge saved once the primary it beat has finished."""
+        if task.cancelled():
+            self.metrics.record_hedge_won(None)
+            return
+        task.exception()  # Retrieved so a failed losing primary is not logged as unhandled.
+        self.metrics.record_hedge_won(gained)
+
+    async def _async_request_once(
+        self,
+        method: str,
+        path: str,
+        params: Mapping[str, Any] | Sequence[tuple[str, Any]] | None,
+        parse: Callable[[Any], Any] | None,
+        page: int,
+        hedge: bool = False,
+    ) -> Any:
+        self.circuit_breaker.before_request()
+        try:
+            token = await self.async_get_token()
+        except EGDAPIAuthError:
+            self.circuit_breaker.release_probe()
+            raise
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
         url = f"{self._data_base}/{path.lstrip('/')}"
 
         headers = {"Authorization": f"Bearer {token}"}
+        metric = RequestMetric(endpoint=path, page=page, hedge=hedge)
+        started = time.perf_counter()
 
         try:
             async with self._session.request(method, url, params=params, headers=headers) as resp:
+                metric.status = resp.status
                 if resp.status == 401:
-                    token = await self.async_get_token(force_refresh=True)
+                    token = await self.async_get_token(force_refresh=True, rejected=token)
                     headers["Authorization"] = f"Bearer {token}"
+                    metric.retries += 1
                     async with self._session.request(
                         method,
                         url,
                         params=params,
                         headers=headers,
                     ) as retry_resp:
+                        metric.status = retry_resp.status
                         if retry_resp.status >= 400:
                             body = (await retry_resp.text()).strip()
                             raise EGDAPIError(
                                 f"Distribuce24 API request failed: {retry_resp.status} ({body})"
                             )
-                        return await retry_resp.json()
+                        return await self._async_decode(retry_resp, parse, metric)
 
                 if resp.status >= 400:
                     body = (await resp.text()).strip()
                     raise EGDAPIError(f"Distribuce24 API request failed: {resp.status} ({body})")
-                return await resp.json()
+                return await self._async_decode(resp, parse, metric)
         except ClientResponseError as err:
+            metric.error = type(err).__name__
             if err.status in (401, 403):
                 raise EGDAPIAuthError("Unauthorized request to Distribuce24 API.") from err
             raise EGDAPIError(f"Distribuce24 API request failed: {err.status}") from err
-        except EGDAPIError:
+        except EGDAPIError as err:
+            metric.error = type(err).__name__
+            raise
+        except asyncio.CancelledError:
+            metric.error = ERROR_CANCELLED
             raise
         except Exception as err:  # noqa: BLE001
+            metric.error = type(err).__name__
             raise EGDAPIError("Unexpected API error.") from err
+        finally:
+            metric.latency = time.perf_counter() - started
+            self.metrics.record(metric)
+            if metric.cancelled:
+                # A cancelled call (lost hedge, unload) says nothing about the API.
+                self.circuit_breaker.release_probe()
+            # Any answer below 500 other than 429 proves the API is reachable.
+            elif metric.status is not None and metric.status < 500 and metric.status != 429:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+            tracing.record_span(
+                "request",
+                started,
+                metric.latency,
+                endpoint=path,
+                status=metric.status,
+                bytes=metric.bytes,
+                page=page,
+                hedge=hedge,
+            )
+
+    async def _async_decode(
+        self,
+        resp: ClientResponse,
+        parse: Callable[[Any], Any] | None,
+        metric: RequestMetric,
+    ) -> Any:
+        """Read response body and decode it, off the event loop when it is large."""
+        started = time.perf_counter()
+        body = await resp.read()
+        self.stage_timings["transfer"] += time.perf_counter() - started
+        metric.bytes = len(body)
+
+        def _decode() -> Any:
+            raw = json.loads(body) if body else None
+            return parse(raw) if parse else raw
+
+        started = time.perf_counter()
+        stage = "decode"
+        if len(body) >= self.offload_bytes:
+            result = await self._executor_job(_decode)
+            stage = "decode_offloaded"
+        else:
+            result = _decode()
+        metric.parse_seconds = time.perf_counter() - started
+        self.stage_timings[stage] += metric.parse_seconds
+        tracing.record_span(stage, started, metric.parse_seconds, bytes=len(body))
+        return result
 
     async def async_get_profiles(self, measurement_type: str) -> list[Profile]:
         """Fetch available profiles for measurement type."""
@@ -161,7 +522,7 @@ class EGDOpenAPIClient:
                 profiles.append(Profile(code=code, name=name))
 
         if not profiles:
-            raise EGDAPIError("No profiles returned by API.")
+            raise EGDAPINoProfilesError("No profiles returned by API.")
         return profiles
 
     async def async_get_consumption(
@@ -173,8 +534,13 @@ class EGDOpenAPIClient:
         time_from: str,
         time_to: str,
         zdroj_dat: str | None,
+        source_fallback: bool = True,
     ) -> list[dict[str, Any]]:
-        """Fetch consumption rows for one profile within interval."""
+        """Fetch consumption rows for one profile within interval.
+
+        A C1 request rejected with `zdrojDat` is retried without it unless
+        `source_fallback` is False, as when the data source itself is probed.
+        """
         if measurement_type == MEASUREMENT_C1:
             params: dict[str, Any] = {
                 "ean": ean,
@@ -186,9 +552,9 @@ class EGDOpenAPIClient:
                 params["zdrojDat"] = zdroj_dat
 
             try:
-                raw = await self._request("GET", "c/spotreby", params=params)
+                return await self._request("GET", "c/spotreby", params=params, parse=self._extract_rows)
             except EGDAPIError as err:
-                if "failed: 400" not in str(err):
+                if "failed: 400" not in str(err) or not source_fallback:
                     raise
 
                 fallback_params = {
@@ -201,12 +567,13 @@ class EGDOpenAPIClient:
                     "Retrying c/spotreby without zdrojDat and normalized timestamps for profile %s",
                     profile,
                 )
-                raw = await self._request("GET", "c/spotreby", params=fallback_params)
-
-            return self._extract_rows(raw)
+                return await self._request(
+                    "GET", "c/spotreby", params=fallback_params, parse=self._extract_rows
+                )
 
         page_start = 0
         page_size = 3000
+        page = 1
         all_rows: list[dict[str, Any]] = []
 
         while True:
@@ -218,8 +585,7 @@ class EGDOpenAPIClient:
                 "PageStart": page_start,
                 "PageSize": page_size,
             }
-            raw = await self._request("GET", "spotreby", params=params)
-            rows = self._extract_rows(raw)
+            rows = await self._request("GET", "spotreby", params=params, parse=self._extract_rows, page=page)
             if not rows:
                 break
 
@@ -227,9 +593,191 @@ class EGDOpenAPIClient:
             if len(rows) < page_size:
                 break
             page_start += len(rows)
+            page += 1
 
         return all_rows
 
+    @staticmethod
+    def consumption_endpoint(measurement_type: str) -> str:
+        return "c/spotreby" if measurement_type == MEASUREMENT_C1 else "spotreby"
+
+    async def async_get_consumption_batch(
+        self,
+        *,
+        ean: str,
+        measurement_type: str,
+        profiles: list[str],
+        time_from: str,
+        time_to: str,
+        zdroj_dat: str | None,
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """Fetch rows of several profiles within interval in one call per page.
+
+        Returns rows keyed by profile code, or None when the endpoint does not
+        accept several profiles and the caller has to request them one by one.
+        Profiles absent from the result were not attributed any rows and have
+        to be requested on their own as well.
+        """
+        endpoint = self.consumption_endpoint(measurement_type)
+        batching = self.profile_batching
+        if endpoint not in batching.styles:
+            async with batching.lock:
+                if endpoint not in batching.styles:
+                    return await self._async_probe_batching(
+                        endpoint, ean, profiles, time_from, time_to, zdroj_dat
+                    )
+
+        style = batching.styles[endpoint]
+        if style is None:
+            return None
+        try:
+            return await self._async_fetch_batch(endpoint, style, ean, profiles, time_from, time_to, zdroj_dat)
+        except EGDAPIError as err:
+            if "failed: 400" not in str(err):
+                raise
+            # Per-profile calls carry their own fallbacks for rejected parameters.
+            _LOGGER.debug("Batched %s request rejected, requesting profiles one by one: %s", endpoint, err)
+            return None
+
+    async def _async_probe_batching(
+        self,
+        endpoint: str,
+        ean: str,
+        profiles: list[str],
+        time_from: str,
+        time_to: str,
+        zdroj_dat: str | None,
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """Find the multi-profile form the endpoint accepts, answering the probe call itself."""
+        batching = self.profile_batching
+        pending = batching.pending.get(endpoint)
+        for style in (pending[0],) if pending else (BATCH_REPEATED, BATCH_COMMA):
+            try:
+                rows = await self._async_fetch_batch(endpoint, style, ean, profiles, time_from, time_to, zdroj_dat)
+            except EGDAPIError as err:
+                # Only a rejected request says the form is unsupported; rate limits and outages are probed again.
+                if "failed: 400" not in str(err):
+                    raise
+                continue
+            if rows is None:
+                continue
+            # An empty group still names its profile; a profile without data may have none.
+            if all(code in rows for code in profiles):
+                _LOGGER.info("Distribuce24 %s accepts several profiles per call (%s)", endpoint, style)
+                batching.pending.pop(endpoint, None)
+                batching.styles[endpoint] = style
+                return rows
+            if rows:
+                # Some profiles answered; the rest may just have no data yet.
+                attempts = (pending[1] if pending else 0) + 1
+                if attempts < BATCH_PROBE_ATTEMPTS:
+                    _LOGGER.debug("Batching probe of %s inconclusive, missing %s", endpoint, set(profiles) - set(rows))
+                    batching.pending[endpoint] = (style, attempts)
+                    return rows
+                # The form keeps answering with attributable rows; missing profiles are fetched on their own.
+                _LOGGER.info("Distribuce24 %s accepts several profiles per call (%s)", endpoint, style)
+                batching.pending.pop(endpoint, None)
+                batching.styles[endpoint] = style
+                return rows
+
+        _LOGGER.info("Distribuce24 %s does not accept several profiles per call", endpoint)
+        batching.pending.pop(endpoint, None)
+        batching.styles[endpoint] = None
+        return None
+
+    async def _async_fetch_batch(
+        self,
+        endpoint: str,
+        style: str,
+        ean: str,
+        profiles: list[str],
+        time_from: str,
+        time_to: str,
+        zdroj_dat: str | None,
+    ) -> dict[str, list[dict[str, Any]]] | None:
+        """Request several profiles in the given form; None when rows cannot be attributed."""
+        if style == BATCH_REPEATED:
+            profile_params = [("profile", code) for code in profiles]
+        else:
+            profile_params = [("profile", ",".join(profiles))]
+        params: list[tuple[str, Any]] = [("ean", ean), *profile_params, ("from", time_from), ("to", time_to)]
+        parse = partial(self._split_rows_by_profile, profiles=frozenset(profiles))
+
+        if endpoint == "c/spotreby":
+            if zdroj_dat:
+                try:
+                    split, _ = await self._request(
+                        "GET", endpoint, params=[*params, ("zdrojDat", zdroj_dat)], parse=parse
+                    )
+                    return split
+                except EGDAPIError as err:
+                    if "failed: 400" not in str(err):
+                        raise
+                # As for one profile, a rejected data source is retried without it before the form is blamed.
+                params = [
+                    ("ean", ean),
+                    *profile_params,
+                    ("from", self._normalize_iso_for_api(time_from)),
+                    ("to", self._normalize_iso_for_api(time_to)),
+                ]
+            split, _ = await self._request("GET", endpoint, params=params, parse=parse)
+            return split
+
+        page_start = 0
+        page_size = 3000
+        page = 1
+        rows_by_profile: dict[str, list[dict[str, Any]]] = {}
+
+        while True:
+            page_params = [*params, ("PageStart", page_start), ("PageSize", page_size)]
+            split, count = await self._request("GET", endpoint, params=page_params, parse=parse, page=page)
+            if split is None:
+                return None
+            for code, rows in split.items():
+                rows_by_profile.setdefault(code, []).extend(rows)
+
+            if count < page_size:
+                break
+            page_start += count
+            page += 1
+
+        return rows_by_profile
+
+    @staticmethod
+    def _split_rows_by_profile(
+        raw: Any,
+        profiles: frozenset[str],
+    ) -> tuple[dict[str, list[dict[str, Any]]] | None, int]:
+        """Group rows of a multi-profile response by profile code.
+
+        Accepts rows carrying their profile code as well as per-profile
+        groups holding their own rows. Returns the groups, or None when a row
+        or group does not name its profile, and the number of rows the
+        response held, requested profiles or not, for paging.
+        """
+        split: dict[str, list[dict[str, Any]]] = {}
+        count = 0
+        for item in EGDOpenAPIClient._extract_rows(raw):
+            nested = next(
+                (
+                    value
+                    for key in ("items", "data", "spotreby", "rows", "hodnoty", "values", "mereni")
+                    if isinstance(value := item.get(key), list)
+                ),
+                None,
+            )
+            rows = [item] if nested is None else [row for row in nested if isinstance(row, dict)]
+            count += len(rows)
+            code = item.get("profil") or item.get("profile") or item.get("kodProfilu")
+            if isinstance(code, dict):
+                code = code.get("kod") or code.get("code")
+            if not code:
+                return None, count
+            code = str(code).strip()
+            if code in profiles:
+                split.setdefault(code, []).extend(rows)
+        return split, count
+
     @staticmethod
     def _normalize_iso_for_api(value: str) -> str:
         """Normalize date/time value to strict ISO-8601 UTC format for fallback requests."""
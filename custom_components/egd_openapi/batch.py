@@ -0,0 +1,141 @@
+"""Columnar NumPy computation of multi-day consumption rows."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy ships with Home Assistant
+    np = None
+
+# Raw values are held as integers scaled by 10**VALUE_SCALE and unit factors
+# by 10**3, so kWh sums are exact integers scaled by 10**9.
+VALUE_SCALE = 6
+KWH_SCALE = 9
+UNIT_FACTORS = {"wh": 1, "kw": 250}
+DEFAULT_UNIT_FACTOR = 1000
+MAX_EXACT_FLOAT_INT = 2**53
+
+
+@dataclass(slots=True)
+class RowColumns:
+    """Columnar view of a row set."""
+
+    timestamps_ms: Any
+    has_timestamp: Any
+    values: Any
+    valid: Any
+    unit_factors: Any
+
+
+@dataclass(slots=True)
+class DayAggregate:
+    """Aggregates of one day computed from columns."""
+
+    total_kwh: float
+    valid_points: int
+    invalid_points: int
+    rows_total: int
+    series_points: list[list[int | float | None]]
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def build_columns(
+    rows: list[dict[str, Any]],
+    *,
+    parse_timestamp: Callable[[dict[str, Any]], datetime | None],
+    extract_value: Callable[[dict[str, Any]], Decimal | None],
+    extract_status: Callable[[dict[str, Any]], str],
+    extract_unit: Callable[[dict[str, Any]], str],
+    is_valid_status: Callable[[str], bool],
+) -> RowColumns | None:
+    """Parse rows once into arrays; return None when values cannot be held exactly."""
+    count = len(rows)
+    timestamps_ms = np.zeros(count, dtype=np.int64)
+    has_timestamp = np.zeros(count, dtype=bool)
+    values = np.zeros(count, dtype=np.int64)
+    valid = np.zeros(count, dtype=bool)
+    unit_factors = np.full(count, DEFAULT_UNIT_FACTOR, dtype=np.int64)
+
+    for index, row in enumerate(rows):
+        ts = parse_timestamp(row)
+        if ts is not None:
+            timestamps_ms[index] = int(ts.astimezone(UTC).timestamp() * 1000)
+            has_timestamp[index] = True
+
+        value = extract_value(row)
+        if value is None or not is_valid_status(extract_status(row)):
+            continue
+
+        if not value.is_finite():
+            return None
+        scaled = value.scaleb(VALUE_SCALE)
+        if scaled != scaled.to_integral_value():
+            return None
+        factor = UNIT_FACTORS.get(extract_unit(row).lower(), DEFAULT_UNIT_FACTOR)
+        if abs(int(scaled) * factor) >= MAX_EXACT_FLOAT_INT:
+            return None
+        values[index] = int(scaled)
+        unit_factors[index] = factor
+        valid[index] = True
+
+    return RowColumns(
+        timestamps_ms=timestamps_ms,
+        has_timestamp=has_timestamp,
+        values=values,
+        valid=valid,
+        unit_factors=unit_factors,
+    )
+
+
+def aggregate_days(columns: RowColumns, bounds_ms: list[int], *, end_aligned: bool = False) -> list[DayAggregate]:
+    """Split columns into days by `bounds_ms` (N+1 boundaries) and aggregate.
+
+    Rows keep their original order inside each day. With `end_aligned` a
+    timestamp equal to a boundary belongs to the day that ends there.
+    """
+    day_count = len(bounds_ms) - 1
+    bounds = np.asarray(bounds_ms, dtype=np.int64)
+    side = "left" if end_aligned else "right"
+    day_index = np.searchsorted(bounds, columns.timestamps_ms, side=side) - 1
+    placed = columns.has_timestamp & (day_index >= 0) & (day_index < day_count)
+
+    kwh_scaled = columns.values * columns.unit_factors
+    valid_placed = placed & columns.valid
+
+    totals = np.zeros(day_count, dtype=np.int64)
+    np.add.at(totals, day_index[valid_placed], kwh_scaled[valid_placed])
+    valid_counts = np.bincount(day_index[valid_placed], minlength=day_count)
+    row_counts = np.bincount(day_index[placed], minlength=day_count)
+
+    order = np.flatnonzero(placed)
+    order = order[np.argsort(day_index[order], kind="stable")]
+    splits = np.cumsum(row_counts)[:-1]
+
+    kwh_values = kwh_scaled / float(10**KWH_SCALE)
+    aggregates: list[DayAggregate] = []
+    for day, indexes in enumerate(np.split(order, splits)):
+        timestamps = columns.timestamps_ms[indexes].tolist()
+        day_values = kwh_values[indexes].tolist()
+        day_valid = columns.valid[indexes].tolist()
+        aggregates.append(
+            DayAggregate(
+                total_kwh=float(Decimal(int(totals[day])).scaleb(-KWH_SCALE)),
+                valid_points=int(valid_counts[day]),
+                invalid_points=int(row_counts[day] - valid_counts[day]),
+                rows_total=int(row_counts[day]),
+                series_points=[
+                    [ts, value if is_valid else None]
+                    for ts, value, is_valid in zip(timestamps, day_values, day_valid)
+                ],
+            )
+        )
+    return aggregates
@@ -0,0 +1,298 @@
+"""Compact binary archive of day records past the slot store's retention.
+
+Each profile has one append-only file: a magic header followed by one
+block per day. A block header carries the day, the UTC start, the slot
+count, flags, the value scale, the delta width and the payload size; the
+payload holds a validity bitmap, an estimated bitmap and the valid values.
+Values are integers scaled by 10**scale, stored as deltas packed at the
+narrowest signed width that fits, or raw float64 when no scale up to
+MAX_SCALE is exact. Reads memory-map the file and decode only the
+requested days. Rewriting a day appends a new block that wins over the old
+one; the file is compacted once dead blocks outweigh live ones.
+
+All methods block and are meant for the executor.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from itertools import accumulate, compress
+import mmap
+import os
+import re
+import struct
+import threading
+
+from .const import ARCHIVE_FAILURE_LIMIT, DOMAIN, SLOT_ESTIMATED, SLOT_MISSING, SLOT_VALID
+from .storage import DayRecord
+
+FILE_MAGIC = b"EGDB\x01"
+BLOCK_HEADER = struct.Struct("<IqHBbBI")
+FLAG_END_ALIGNED = 1
+MAX_SCALE = 6
+RAW_SCALE = -1
+DELTA_FORMATS = {1: "b", 2: "h", 4: "i", 8: "q"}
+# Bitmap byte -> one 0/1 byte per slot, least significant bit first.
+_BIT_BYTES = [bytes(byte >> bit & 1 for bit in range(8)) for byte in range(256)]
+# Per-slot 2 * valid + estimated -> state character.
+_STATE_CHARS = bytes.maketrans(
+    bytes(range(4)), (SLOT_MISSING + SLOT_ESTIMATED + SLOT_VALID + SLOT_VALID).encode()
+)
+
+
+def encode_day(record: DayRecord) -> bytes:
+    """Return the block of one day record, header included."""
+    valid_bits = estimated_bits = 0
+    values: list[float] = []
+    for slot, state in enumerate(record.states):
+        if state == SLOT_VALID and record.values[slot] is not None:
+            valid_bits |= 1 << slot
+            values.append(record.values[slot])
+        elif state == SLOT_ESTIMATED:
+            estimated_bits |= 1 << slot
+    bitmap_size = (record.slot_count + 7) // 8
+    payload = valid_bits.to_bytes(bitmap_size, "little") + estimated_bits.to_bytes(bitmap_size, "little")
+
+    scale = next((scale for scale in range(MAX_SCALE + 1) if all(round(v, scale) == v for v in values)), RAW_SCALE)
+    width = 8
+    if scale == RAW_SCALE:
+        payload += struct.pack(f"<{len(values)}d", *values)
+    else:
+        factor = 10**scale
+        scaled = [round(value * factor) for value in values]
+        deltas = [current - previous for previous, current in zip([0, *scaled], scaled)]
+        widest = max((abs(delta) for delta in deltas), default=0)
+        width = next((width for width in DELTA_FORMATS if widest < 1 << (8 * width - 1)), 0)
+        if width == 0:
+            scale, width = RAW_SCALE, 8
+            payload += struct.pack(f"<{len(values)}d", *values)
+        else:
+            payload += struct.pack(f"<{len(deltas)}{DELTA_FORMATS[width]}", *deltas)
+
+    header = BLOCK_HEADER.pack(
+        record.day.toordinal(),
+        record.start_ms,
+        record.slot_count,
+        FLAG_END_ALIGNED if record.end_aligned else 0,
+        scale,
+        width,
+        len(payload),
+    )
+    return header + payload
+
+
+def decode_day(buffer: bytes | mmap.mmap, offset: int) -> DayRecord:
+    """Decode the block starting at `offset`."""
+    ordinal, start_ms, slot_count, flags, scale, width, _ = BLOCK_HEADER.unpack_from(buffer, offset)
+    position = offset + BLOCK_HEADER.size
+    bitmap_size = (slot_count + 7) // 8
+    valid = b"".join(_BIT_BYTES[byte] for byte in buffer[position : position + bitmap_size])[:slot_count]
+    estimated = b"".join(
+        _BIT_BYTES[byte] for byte in buffer[position + bitmap_size : position + 2 * bitmap_size]
+    )[:slot_count]
+    position += 2 * bitmap_size
+
+    valid_slots = list(compress(range(slot_count), valid))
+    if scale == RAW_SCALE:
+        decoded = struct.unpack_from(f"<{len(valid_slots)}d", buffer, position)
+    else:
+        factor = 10**scale
+        deltas = struct.unpack_from(f"<{len(valid_slots)}{DELTA_FORMATS[width]}", buffer, position)
+        decoded = [scaled / factor for scaled in accumulate(deltas)]
+
+    values: list[float | None] = [None] * slot_count
+    for slot, value in zip(valid_slots, decoded):
+        values[slot] = value
+    # 0/1 bytes never carry, so 2 * valid + estimated adds up slot by slot.
+    codes = (int.from_bytes(valid, "big") * 2 + int.from_bytes(estimated, "big")).to_bytes(slot_count, "big")
+    return DayRecord(
+        day=date.fromordinal(ordinal),
+        start_ms=start_ms,
+        slot_count=slot_count,
+        states=codes.translate(_STATE_CHARS).decode(),
+        values=values,
+        end_aligned=bool(flags & FLAG_END_ALIGNED),
+    )
+
+
+class BlockArchive:
+    """Day blocks of one profile in one memory-mapped, append-only file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._index: dict[date, tuple[int, int]] = {}
+        self._dead_bytes = 0
+        self._size = 0
+        self._handle = None
+        self._mmap: mmap.mmap | None = None
+
+    def open(self) -> None:
+        """Index the blocks by scanning their headers; a torn last block is cut off."""
+        self._index = {}
+        self._dead_bytes = 0
+        self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._map()
+        if self._mmap is None:
+            return
+        if self._mmap[: len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an EG.D block archive")
+        offset = len(FILE_MAGIC)
+        while offset + BLOCK_HEADER.size <= self._size:
+            ordinal, *_, payload_size = BLOCK_HEADER.unpack_from(self._mmap, offset)
+            end = offset + BLOCK_HEADER.size + payload_size
+            if end > self._size:
+                break
+            self._set(date.fromordinal(ordinal), offset, end - offset)
+            offset = end
+        if offset < self._size:
+            self.close()
+            with open(self.path, "r+b") as handle:
+                handle.truncate(offset)
+            self._size = offset
+            self._map()
+
+    def days(self) -> list[date]:
+        return sorted(self._index)
+
+    def read(self, days: list[date]) -> dict[date, DayRecord]:
+        """Decode the requested days that are archived."""
+        if self._mmap is None:
+            return {}
+        return {day: decode_day(self._mmap, self._index[day][0]) for day in days if day in self._index}
+
+    def write(self, records: list[DayRecord]) -> None:
+        """Append one block per record, replacing earlier blocks of the same days."""
+        blocks = [(record.day, encode_day(record)) for record in records]
+        if not blocks:
+            return
+        self.close()
+        with open(self.path, "ab") as handle:
+            if self._size == 0:
+                handle.write(FILE_MAGIC)
+                self._size = len(FILE_MAGIC)
+            for day, block in blocks:
+                handle.write(block)
+                self._set(day, self._size, len(block))
+                self._size += len(block)
+        if self._dead_bytes > self._size // 2:
+            self.compact()
+        else:
+            self._map()
+
+    def compact(self) -> None:
+        """Rewrite the file with only the live block of each day, in day order."""
+        self._map()
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(FILE_MAGIC)
+            for day in sorted(self._index):
+                offset, size = self._index[day]
+                handle.write(self._mmap[offset : offset + size])
+        self.close()
+        os.replace(temp_path, self.path)
+        self.open()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _set(self, day: date, offset: int, size: int) -> None:
+        previous = self._index.get(day)
+        if previous is not None:
+            self._dead_bytes += previous[1]
+        self._index[day] = (offset, size)
+
+    def _map(self) -> None:
+        self.close()
+        if self._size == 0:
+            return
+        self._handle = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class EntryArchive:
+    """Block archives of all profiles of one config entry, opened on first use.
+
+    Profiles are written independently. A profile whose archive fails
+    ARCHIVE_FAILURE_LIMIT writes in a row has its file renamed to
+    `<path>.corrupt` and starts a new one.
+    """
+
+    def __init__(self, directory: str, entry_id: str) -> None:
+        self.directory = directory
+        self.entry_id = entry_id
+        self._archives: dict[str, BlockArchive] = {}
+        self._failures: dict[str, int] = {}
+        # Refresh writes and export reads run on different executor threads.
+        self._lock = threading.Lock()
+
+    def path(self, profile_code: str) -> str:
+        safe_code = re.sub(r"[^A-Za-z0-9_-]", "_", profile_code)
+        return os.path.join(self.directory, f"{DOMAIN}.{self.entry_id}.{safe_code}.blocks")
+
+    def write(self, expired: dict[str, list[DayRecord]]) -> dict[str, Exception]:
+        """Archive the records of each profile; return the errors of profiles that failed."""
+        errors: dict[str, Exception] = {}
+        with self._lock:
+            for profile_code, records in expired.items():
+                try:
+                    self._write(profile_code, records)
+                except (OSError, ValueError) as err:
+                    errors[profile_code] = err
+        return errors
+
+    def days(self, profile_code: str) -> list[date]:
+        with self._lock:
+            return self._archive(profile_code).days()
+
+    def read(self, profile_code: str, days: list[date]) -> dict[date, DayRecord]:
+        with self._lock:
+            return self._archive(profile_code).read(days)
+
+    def close(self) -> None:
+        with self._lock:
+            for archive in self._archives.values():
+                archive.close()
+            self._archives = {}
+
+    def remove(self) -> None:
+        """Delete the archive files of the entry."""
+        self.close()
+        if not os.path.isdir(self.directory):
+            return
+        prefix = f"{DOMAIN}.{self.entry_id}."
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith((".blocks", ".blocks.corrupt")):
+                os.remove(os.path.join(self.directory, name))
+
+    def _write(self, profile_code: str, records: list[DayRecord]) -> None:
+        try:
+            self._archive(profile_code).write(records)
+        except (OSError, ValueError):
+            failures = self._failures.get(profile_code, 0) + 1
+            path = self.path(profile_code)
+            if failures < ARCHIVE_FAILURE_LIMIT or not os.path.exists(path):
+                self._failures[profile_code] = failures
+                raise
+            # The file keeps failing; set it aside so the records land in a new one.
+            self._failures.pop(profile_code, None)
+            if archive := self._archives.pop(profile_code, None):
+                archive.close()
+            os.replace(path, f"{path}.corrupt")
+            self._archive(profile_code).write(records)
+        else:
+            self._failures.pop(profile_code, None)
+
+    def _archive(self, profile_code: str) -> BlockArchive:
+        archive = self._archives.get(profile_code)
+        if archive is None:
+            archive = BlockArchive(self.path(profile_code))
+            archive.open()
+            # Cached only once open, so a failed open is retried on next use.
+            self._archives[profile_code] = archive
+        return archive
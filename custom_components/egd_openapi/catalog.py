@@ -0,0 +1,141 @@
+"""Cached catalog of profiles offered by the Distribuce24 API."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import hashlib
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import EGDAPIError, EGDOpenAPIClient, Profile
+from .const import (
+    DATA_PROFILE_CATALOG,
+    DOMAIN,
+    PROFILE_CATALOG_TTL_HOURS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def catalog_key(environment: str, client_id: str, client_secret: str, measurement_type: str) -> str:
+    """Return catalog key; credentials are hashed so they never reach the file."""
+    digest = hashlib.sha256(f"{client_id}:{client_secret}".encode()).hexdigest()[:16]
+    return f"{environment}:{measurement_type}:{digest}"
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    """Profiles of one key and when they were fetched."""
+
+    profiles: list[Profile]
+    fetched_at: datetime
+
+
+class ProfileCatalog:
+    """Profiles per environment, credentials and measurement type, persisted in `.storage`.
+
+    Cached profiles are returned at once; entries older than the TTL are
+    refetched in the background (stale-while-revalidate). Only a key that
+    was never fetched blocks on the API.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.profile_catalog")
+        self._entries: dict[str, CatalogEntry] = {}
+        self._revalidating: dict[str, asyncio.Task[None]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        async with self._load_lock:
+            if self._loaded:
+                return
+            raw = await self._store.async_load() or {}
+            for key, item in raw.get("entries", {}).items():
+                fetched_at = dt_util.parse_datetime(item.get("fetched_at", ""))
+                if fetched_at is None:
+                    continue
+                self._entries[key] = CatalogEntry(
+                    profiles=[Profile(code=code, name=name) for code, name in item.get("profiles", [])],
+                    fetched_at=fetched_at,
+                )
+            self._loaded = True
+
+    def get(self, key: str) -> CatalogEntry | None:
+        return self._entries.get(key)
+
+    async def async_get_profiles(
+        self,
+        client: EGDOpenAPIClient,
+        measurement_type: str,
+        key: str,
+    ) -> list[Profile]:
+        """Return cached profiles, fetching only when the key was never fetched."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return await self._async_fetch(client, measurement_type, key)
+        self.async_revalidate_if_stale(client, measurement_type, key)
+        return entry.profiles
+
+    @callback
+    def async_revalidate_if_stale(self, client: EGDOpenAPIClient, measurement_type: str, key: str) -> None:
+        """Refetch the key in the background when it is missing or older than the TTL."""
+        entry = self._entries.get(key)
+        if entry is not None and dt_util.utcnow() - entry.fetched_at < timedelta(hours=PROFILE_CATALOG_TTL_HOURS):
+            return
+        if key in self._revalidating:
+            return
+        self._revalidating[key] = self.hass.async_create_background_task(
+            self._async_revalidate(client, measurement_type, key),
+            f"{DOMAIN} profile catalog {measurement_type}",
+        )
+
+    async def _async_revalidate(self, client: EGDOpenAPIClient, measurement_type: str, key: str) -> None:
+        try:
+            await self._async_fetch(client, measurement_type, key)
+        except EGDAPIError as err:
+            _LOGGER.debug("Refreshing %s profile catalog failed, keeping cached list: %s", measurement_type, err)
+        finally:
+            self._revalidating.pop(key, None)
+
+    async def _async_fetch(self, client: EGDOpenAPIClient, measurement_type: str, key: str) -> list[Profile]:
+        profiles = await client.async_get_profiles(measurement_type)
+        previous = self._entries.get(key)
+        if previous is not None and previous.profiles != profiles:
+            _LOGGER.info(
+                "Distribuce24 %s profiles changed: %s",
+                measurement_type,
+                ", ".join(profile.code for profile in profiles),
+            )
+        self._entries[key] = CatalogEntry(profiles=profiles, fetched_at=dt_util.utcnow())
+        self._store.async_delay_save(self._as_dict, STORAGE_SAVE_DELAY)
+        return profiles
+
+    def _as_dict(self) -> dict[str, Any]:
+        return {
+            "entries": {
+                key: {
+                    "profiles": [[profile.code, profile.name] for profile in entry.profiles],
+                    "fetched_at": entry.fetched_at.isoformat(),
+                }
+                for key, entry in self._entries.items()
+            }
+        }
+
+
+async def async_get_catalog(hass: HomeAssistant) -> ProfileCatalog:
+    """Return the loaded integration-wide profile catalog."""
+    catalog: ProfileCatalog | None = hass.data.get(DATA_PROFILE_CATALOG)
+    if catalog is None:
+        catalog = hass.data[DATA_PROFILE_CATALOG] = ProfileCatalog(hass)
+    await catalog.async_load()
+    return catalog
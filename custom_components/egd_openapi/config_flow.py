@@ -2,7 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import logging
 from random import randint
 from typing import Any
 
@@ -10,33 +14,69 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 
-from .api import EGDAPIAuthError, EGDAPIError, EGDOpenAPIClient, Profile
+from .api import EGDAPIAuthError, EGDAPIError, EGDAPINoProfilesError, EGDOpenAPIClient, Profile
+from .catalog import async_get_catalog, catalog_key
+from .coordinator import EGDOpenAPICoordinator
 from .const import (
     CONF_DAYS_BACK_FETCH,
     CONF_DAYS_TO_KEEP_SERIES,
+    CONF_DEDICATED_SESSION,
+    CONF_DIAGNOSTIC_SENSORS,
     CONF_EAN,
     CONF_ENVIRONMENT,
     CONF_FETCH_MINUTE,
+    CONF_HEDGE_REQUESTS,
     CONF_INCLUDE_SERIES_ATTRIBUTE,
+    CONF_INTRADAY_FETCH,
+    CONF_OFFLOAD_THRESHOLD,
     CONF_MEASUREMENT_TYPE,
+    CONF_PRICE_ENTITY,
+    CONF_PRICE_HIGH,
+    CONF_PRICE_LOW,
     CONF_PROFILE_MAP,
     CONF_SELECTED_PROFILES,
+    CONF_TARIFF_LOW_WINDOWS,
     CONF_ZDROJ_DAT,
     DEFAULT_DAYS_BACK_FETCH,
     DEFAULT_DAYS_TO_KEEP_SERIES,
+    DEFAULT_DEDICATED_SESSION,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_HEDGE_REQUESTS,
     DEFAULT_INCLUDE_SERIES_ATTRIBUTE,
+    DEFAULT_INTRADAY_FETCH,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_PRICE_HIGH,
+    DEFAULT_PRICE_LOW,
+    DEFAULT_TARIFF_LOW_WINDOWS,
+    DETECTION_WINDOW_MINUTES,
     DOMAIN,
     ENV_PRODUCTION,
     ENV_TEST,
     MEASUREMENT_AB,
+    MEASUREMENT_AUTO,
     MEASUREMENT_C1,
     ZDROJ_ELEKTROMER,
     ZDROJ_ODBERNE_MISTO,
 )
+from .derived import import_export_profiles
+from .tariff import parse_windows
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class DetectedMeter:
+    """Measurement type and data source that returned data for an EAN."""
+
+    measurement_type: str
+    zdroj_dat: str | None
+    profiles: list[Profile]
+    rows: int
 
 
 class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -57,10 +97,21 @@ class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._abort_if_unique_id_configured()
 
             try:
-                self._profiles = await self._async_fetch_profiles(user_input)
+                if user_input[CONF_MEASUREMENT_TYPE] == MEASUREMENT_AUTO:
+                    detected = await _async_detect_meter(self.hass, user_input)
+                    self._user_input = {
+                        **user_input,
+                        CONF_MEASUREMENT_TYPE: detected.measurement_type,
+                        CONF_ZDROJ_DAT: detected.zdroj_dat or user_input.get(CONF_ZDROJ_DAT),
+                    }
+                    self._profiles = detected.profiles
+                else:
+                    self._profiles = await self._async_fetch_profiles(user_input)
                 return await self.async_step_profiles()
             except EGDAPIAuthError:
                 errors["base"] = "auth"
+            except EGDAPINoProfilesError:
+                errors["base"] = "no_profiles"
             except EGDAPIError:
                 errors["base"] = "cannot_connect"
 
@@ -76,9 +127,13 @@ class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_CLIENT_ID): str,
                 vol.Required(CONF_CLIENT_SECRET): str,
                 vol.Required(CONF_EAN): str,
-                vol.Required(CONF_MEASUREMENT_TYPE, default=MEASUREMENT_AB): selector.SelectSelector(
+                vol.Required(CONF_MEASUREMENT_TYPE, default=MEASUREMENT_AUTO): selector.SelectSelector(
                     selector.SelectSelectorConfig(
-                        options=[MEASUREMENT_AB, MEASUREMENT_C1],
+                        options=[
+                            selector.SelectOptionDict(value=MEASUREMENT_AUTO, label="Auto-detect"),
+                            selector.SelectOptionDict(value=MEASUREMENT_AB, label=MEASUREMENT_AB),
+                            selector.SelectOptionDict(value=MEASUREMENT_C1, label=MEASUREMENT_C1),
+                        ],
                         mode=selector.SelectSelectorMode.DROPDOWN,
                     )
                 ),
@@ -99,7 +154,7 @@ class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             selector.SelectOptionDict(value=profile.code, label=f"{profile.code} - {profile.name}")
             for profile in self._profiles
         ]
-        default_selection = self._default_profiles(self._profiles)
+        default_selection = self.default_profiles(self._profiles)
 
         if user_input is not None:
             selected = user_input.get(CONF_SELECTED_PROFILES, [])
@@ -131,42 +186,18 @@ class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_show_form(step_id="profiles", data_schema=schema, errors=errors)
 
     async def _async_fetch_profiles(self, user_input: Mapping[str, Any]) -> list[Profile]:
-        session = async_get_clientsession(self.hass)
-        client = EGDOpenAPIClient(
-            session=session,
-            environment=user_input[CONF_ENVIRONMENT],
-            client_id=user_input[CONF_CLIENT_ID],
-            client_secret=user_input[CONF_CLIENT_SECRET],
-        )
-        return await client.async_get_profiles(user_input[CONF_MEASUREMENT_TYPE])
+        return await _async_catalog_profiles(self.hass, user_input, _build_client(self.hass, user_input))
 
     @staticmethod
-    def _default_profiles(profiles: list[Profile]) -> list[str]:
+    def default_profiles(profiles: list[Profile]) -> list[str]:
         if not profiles:
             return []
 
-        def _contains(code: str, keys: tuple[str, ...]) -> bool:
-            code_up = code.upper()
-            return any(key in code_up for key in keys)
-
-        import_candidates = [p.code for p in profiles if _contains(p.code, ("IC", "ICQ"))]
-        export_candidates = [p.code for p in profiles if _contains(p.code, ("IS", "ISQ"))]
-
-        selected: list[str] = []
-
-        if import_candidates:
-            preferred = next((c for c in import_candidates if "ICQ2" in c.upper()), import_candidates[0])
-            selected.append(preferred)
-
-        if export_candidates:
-            preferred = next((c for c in export_candidates if "ISQ2" in c.upper()), export_candidates[0])
-            if preferred not in selected:
-                selected.append(preferred)
-
-        if not selected:
-            selected = [profiles[0].code]
-
-        return selected
+        import_code, export_code = import_export_profiles(p.code for p in profiles)
+        selected = [import_code] if import_code else []
+        if export_code and export_code not in selected:
+            selected.append(export_code)
+        return selected or [profiles[0].code]
 
     @staticmethod
     @callback
@@ -174,6 +205,113 @@ class EGDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return EGDOptionsFlow(config_entry)
 
 
+def _build_client(hass: HomeAssistant, data: Mapping[str, Any]) -> EGDOpenAPIClient:
+    return EGDOpenAPIClient(
+        session=async_get_clientsession(hass),
+        environment=data[CONF_ENVIRONMENT],
+        client_id=data[CONF_CLIENT_ID],
+        client_secret=data[CONF_CLIENT_SECRET],
+    )
+
+
+async def _async_catalog_profiles(
+    hass: HomeAssistant,
+    data: Mapping[str, Any],
+    client: EGDOpenAPIClient,
+) -> list[Profile]:
+    """Return profiles from the cached catalog, revalidating it in the background."""
+    catalog = await async_get_catalog(hass)
+    key = catalog_key(
+        data[CONF_ENVIRONMENT],
+        data[CONF_CLIENT_ID],
+        data[CONF_CLIENT_SECRET],
+        data[CONF_MEASUREMENT_TYPE],
+    )
+    return await catalog.async_get_profiles(client, data[CONF_MEASUREMENT_TYPE], key)
+
+
+async def _async_detect_meter(hass: HomeAssistant, user_input: Mapping[str, Any]) -> DetectedMeter:
+    """Probe A/B and both C1 data sources concurrently and pick the one returning data.
+
+    Profiles of both measurement types are requested together, then one
+    short window of yesterday is requested for every candidate. A/B wins
+    over C1 and the meter over the supply point when several return data;
+    when none does, the first type offering profiles is used.
+    """
+    client = _build_client(hass, user_input)
+    profile_results = await asyncio.gather(
+        *(
+            _async_catalog_profiles(hass, {**user_input, CONF_MEASUREMENT_TYPE: measurement_type}, client)
+            for measurement_type in (MEASUREMENT_AB, MEASUREMENT_C1)
+        ),
+        return_exceptions=True,
+    )
+    errors = [result for result in profile_results if isinstance(result, BaseException)]
+    if len(errors) == len(profile_results):
+        raise next((err for err in errors if isinstance(err, EGDAPIAuthError)), errors[0])
+    for err in errors:
+        if not isinstance(err, EGDAPIError):
+            raise err
+
+    ab_profiles, c1_profiles = (result if isinstance(result, list) else [] for result in profile_results)
+    candidates = [
+        DetectedMeter(measurement_type, zdroj_dat, profiles, 0)
+        for measurement_type, zdroj_dat, profiles in (
+            (MEASUREMENT_AB, None, ab_profiles),
+            (MEASUREMENT_C1, ZDROJ_ELEKTROMER, c1_profiles),
+            (MEASUREMENT_C1, ZDROJ_ODBERNE_MISTO, c1_profiles),
+        )
+        if profiles
+    ]
+    if not candidates:
+        raise EGDAPINoProfilesError("No profiles returned by API.")
+
+    local_tz = dt_util.get_time_zone("Europe/Prague")
+    yesterday = dt_util.now(local_tz).date() - timedelta(days=1)
+    window_start = datetime.combine(yesterday, time.min, tzinfo=local_tz)
+    window_end = window_start + timedelta(minutes=DETECTION_WINDOW_MINUTES, seconds=-1)
+
+    async def _async_probe(candidate: DetectedMeter) -> int:
+        time_from, time_to = EGDOpenAPICoordinator.format_window(
+            window_start, window_end, candidate.measurement_type
+        )
+        rows = await client.async_get_consumption(
+            ean=user_input[CONF_EAN],
+            measurement_type=candidate.measurement_type,
+            profile=EGDConfigFlow.default_profiles(candidate.profiles)[0],
+            time_from=time_from,
+            time_to=time_to,
+            zdroj_dat=candidate.zdroj_dat,
+            source_fallback=False,
+        )
+        return len(rows)
+
+    row_counts = await asyncio.gather(
+        *(_async_probe(candidate) for candidate in candidates),
+        return_exceptions=True,
+    )
+    for candidate, rows in zip(candidates, row_counts):
+        if isinstance(rows, EGDAPIError) and not isinstance(rows, EGDAPIAuthError):
+            # A rejected probe only rules the candidate out.
+            continue
+        if isinstance(rows, BaseException):
+            raise rows
+        candidate.rows = rows
+
+    detected = next((candidate for candidate in candidates if candidate.rows), candidates[0])
+    _LOGGER.info(
+        "Detected %s%s for EAN %s (rows per candidate: %s)",
+        detected.measurement_type,
+        f" / {detected.zdroj_dat}" if detected.zdroj_dat else "",
+        user_input[CONF_EAN],
+        {
+            " ".join(filter(None, (candidate.measurement_type, candidate.zdroj_dat))): candidate.rows
+            for candidate in candidates
+        },
+    )
+    return detected
+
+
 class EGDOptionsFlow(config_entries.OptionsFlow):
     """Handle integration options."""
 
@@ -181,18 +319,26 @@ class EGDOptionsFlow(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
-        if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
-
-        profile_map: dict[str, str] = self.config_entry.data.get(CONF_PROFILE_MAP, {})
         selected_profiles = self.config_entry.options.get(
             CONF_SELECTED_PROFILES,
             self.config_entry.data.get(CONF_SELECTED_PROFILES, []),
         )
+        profile_map = await self._async_profile_map(selected_profiles)
+        errors: dict[str, str] = {}
 
-        if not profile_map:
-            # Backward compatibility for entries created before profile map existed.
-            profile_map = {code: code for code in selected_profiles}
+        if user_input is not None:
+            try:
+                parse_windows(user_input.get(CONF_TARIFF_LOW_WINDOWS, DEFAULT_TARIFF_LOW_WINDOWS))
+            except ValueError:
+                errors[CONF_TARIFF_LOW_WINDOWS] = "invalid_tariff_windows"
+
+        if user_input is not None and not errors:
+            if profile_map != self.config_entry.data.get(CONF_PROFILE_MAP):
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data={**self.config_entry.data, CONF_PROFILE_MAP: profile_map},
+                )
+            return self.async_create_entry(title="", data=user_input)
 
         profile_options = [
             selector.SelectOptionDict(value=code, label=f"{code} - {name}")
@@ -230,7 +376,61 @@ class EGDOptionsFlow(config_entries.OptionsFlow):
                     CONF_DAYS_BACK_FETCH,
                     default=self.config_entry.options.get(CONF_DAYS_BACK_FETCH, DEFAULT_DAYS_BACK_FETCH),
                 ): vol.All(vol.Coerce(int), vol.Range(min=1, max=14)),
+                vol.Required(
+                    CONF_INTRADAY_FETCH,
+                    default=self.config_entry.options.get(CONF_INTRADAY_FETCH, DEFAULT_INTRADAY_FETCH),
+                ): bool,
+                vol.Required(
+                    CONF_OFFLOAD_THRESHOLD,
+                    default=self.config_entry.options.get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                vol.Required(
+                    CONF_DIAGNOSTIC_SENSORS,
+                    default=self.config_entry.options.get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS),
+                ): bool,
+                vol.Required(
+                    CONF_DEDICATED_SESSION,
+                    default=self.config_entry.options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION),
+                ): bool,
+                vol.Required(
+                    CONF_HEDGE_REQUESTS,
+                    default=self.config_entry.options.get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS),
+                ): bool,
+                vol.Optional(
+                    CONF_TARIFF_LOW_WINDOWS,
+                    default=self.config_entry.options.get(CONF_TARIFF_LOW_WINDOWS, DEFAULT_TARIFF_LOW_WINDOWS),
+                ): str,
+                vol.Required(
+                    CONF_PRICE_LOW,
+                    default=self.config_entry.options.get(CONF_PRICE_LOW, DEFAULT_PRICE_LOW),
+                ): vol.Coerce(float),
+                vol.Required(
+                    CONF_PRICE_HIGH,
+                    default=self.config_entry.options.get(CONF_PRICE_HIGH, DEFAULT_PRICE_HIGH),
+                ): vol.Coerce(float),
+                vol.Optional(
+                    CONF_PRICE_ENTITY,
+                    description={"suggested_value": self.config_entry.options.get(CONF_PRICE_ENTITY)},
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
             }
         )
+        if user_input is not None:
+            schema = self.add_suggested_values_to_schema(schema, user_input)
+
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
+    async def _async_profile_map(self, selected_profiles: list[str]) -> dict[str, str]:
+        """Return stored profile names extended with profiles the API offers now."""
+        profile_map: dict[str, str] = dict(self.config_entry.data.get(CONF_PROFILE_MAP, {}))
+        if not profile_map:
+            # Backward compatibility for entries created before profile map existed.
+            profile_map = {code: code for code in selected_profiles}
 
-        return self.async_show_form(step_id="init", data_schema=schema)
+        runtime = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        client = runtime["coordinator"].client if runtime else _build_client(self.hass, self.config_entry.data)
+        try:
+            profiles = await _async_catalog_profiles(self.hass, self.config_entry.data, client)
+        except EGDAPIError:
+            return profile_map
+        profile_map.update((profile.code, profile.name) for profile in profiles)
+        return profile_map
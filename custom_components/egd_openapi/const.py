@@ -19,12 +19,22 @@ CONF_INCLUDE_SERIES_ATTRIBUTE = "include_series_attribute"
 CONF_FETCH_HOUR = "fetch_hour"
 CONF_FETCH_MINUTE = "fetch_minute"
 CONF_DAYS_BACK_FETCH = "days_back_fetch"
+CONF_INTRADAY_FETCH = "intraday_fetch"
+CONF_OFFLOAD_THRESHOLD = "offload_threshold"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_TARIFF_LOW_WINDOWS = "tariff_low_windows"
+CONF_PRICE_LOW = "price_low"
+CONF_PRICE_HIGH = "price_high"
+CONF_PRICE_ENTITY = "price_entity"
 
 ENV_PRODUCTION = "production"
 ENV_TEST = "test"
 
 MEASUREMENT_AB = "A/B"
 MEASUREMENT_C1 = "C1"
+MEASUREMENT_AUTO = "auto"
 
 ZDROJ_ELEKTROMER = "ELEKTROMER"
 ZDROJ_ODBERNE_MISTO = "ODBERNE_MISTO"
@@ -33,6 +43,15 @@ DEFAULT_DAYS_TO_KEEP_SERIES = 7
 DEFAULT_INCLUDE_SERIES_ATTRIBUTE = True
 DEFAULT_FETCH_HOUR = 16
 DEFAULT_DAYS_BACK_FETCH = 1
+DEFAULT_INTRADAY_FETCH = False
+DEFAULT_OFFLOAD_THRESHOLD = 1000
+OFFLOAD_BYTES_PER_ROW = 200
+DEFAULT_DIAGNOSTIC_SENSORS = False
+DEFAULT_DEDICATED_SESSION = False
+DEFAULT_HEDGE_REQUESTS = False
+DEFAULT_TARIFF_LOW_WINDOWS = ""
+DEFAULT_PRICE_LOW = 0.0
+DEFAULT_PRICE_HIGH = 0.0
 
 VALID_STATUS_AB = "IU012"
 VALID_STATUS_C1 = "W"
@@ -50,4 +69,83 @@ TEST_TOKEN_URL = "https://test.distribuce24.cz/idm/oauth/token"
 TEST_DATA_BASE = "https://test.distribuce24.cz/openApi"
 
 COORDINATOR = "coordinator"
-UNSUB_SCHEDULE = "unsub_schedule"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_TOKEN_CACHES = f"{DOMAIN}_token_caches"
+DATA_CIRCUIT_BREAKERS = f"{DOMAIN}_circuit_breakers"
+DATA_SESSIONS = f"{DOMAIN}_sessions"
+DATA_PROFILE_BATCHING = f"{DOMAIN}_profile_batching"
+DATA_PROFILE_CATALOG = f"{DOMAIN}_profile_catalog"
+SIGNAL_PROFILES_UPDATED = f"{DOMAIN}_profiles_updated_{{}}"
+PROFILE_REPORT = "profile_report"
+DERIVED_NET = "net"
+COST = "cost"
+
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+ATTR_TOP = "top"
+ATTR_WRITE_FILE = "write_file"
+SERVICE_DERIVED_RANGE = "derived_range"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_INCLUDE_SERIES = "include_series"
+SERVICE_EXPORT = "export"
+ATTR_PROFILES = "profiles"
+ATTR_FORMAT = "format"
+ATTR_GZIP = "gzip"
+ATTR_FETCH_MISSING = "fetch_missing"
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+# Consecutive failed writes after which a profile's block archive is set aside.
+ARCHIVE_FAILURE_LIMIT = 3
+
+PROFILE_CATALOG_TTL_HOURS = 24
+DETECTION_WINDOW_MINUTES = 60
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_CHUNK_DAYS = 31
+EXPORT_MAX_FETCH_DAYS = 62
+
+SLOT_VALID = "v"
+SLOT_ESTIMATED = "e"
+SLOT_MISSING = "-"
+
+CORRECTION_CHECK_HOURS = 72
+PLANNER_MAX_RANGES = 4
+
+METRICS_MAX_SAMPLES = 500
+METRICS_MAX_REFRESHES = 48
+METRICS_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+TRACE_BUFFER_SIZE = 10
+TRACE_MAX_SPANS = 2000
+
+SCHEDULER_MAX_CONCURRENT = 4
+SCHEDULER_WINDOW_SECONDS = 3600
+
+SESSION_LIMIT = 10
+SESSION_LIMIT_PER_HOST = 4
+SESSION_KEEPALIVE_SECONDS = 75
+SESSION_DNS_TTL_SECONDS = 600
+SESSION_TIMEOUT_SECONDS = 120
+SESSION_CONNECT_TIMEOUT_SECONDS = 15
+SESSION_READ_TIMEOUT_SECONDS = 60
+
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY_SECONDS = 0.5
+HEDGE_BUDGET = 0.05
+
+BATCH_REPEATED = "repeated"
+BATCH_COMMA = "comma"
+BATCH_PROBE_ATTEMPTS = 3
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 300
+CIRCUIT_MAX_OPEN_SECONDS = 3600
+
+PIECE_BACKOFF_MINUTES = 30
+PIECE_BACKOFF_MAX_MINUTES = 12 * 60
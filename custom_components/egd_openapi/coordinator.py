@@ -2,39 +2,81 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import UTC, datetime, time, timedelta
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
+import hashlib
+import json
+from functools import partial
 import logging
-from typing import Any
+import math
+import time
+from typing import Any, TypeVar
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import STORAGE_DIR
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
-from .api import EGDAPIAuthError, EGDAPIError, EGDOpenAPIClient
+from . import tracing
+from .api import EGDAPIAuthError, EGDAPICircuitOpenError, EGDAPIError, EGDOpenAPIClient
 from .const import (
     ATTR_INTERVAL_MINUTES,
+    COST,
     CONF_DAYS_BACK_FETCH,
     CONF_DAYS_TO_KEEP_SERIES,
+    CONF_DIAGNOSTIC_SENSORS,
     CONF_EAN,
+    CONF_HEDGE_REQUESTS,
     CONF_INCLUDE_SERIES_ATTRIBUTE,
+    CONF_INTRADAY_FETCH,
     CONF_MEASUREMENT_TYPE,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PRICE_ENTITY,
+    CONF_PRICE_HIGH,
+    CONF_PRICE_LOW,
     CONF_PROFILE_MAP,
     CONF_SELECTED_PROFILES,
+    CONF_TARIFF_LOW_WINDOWS,
     CONF_ZDROJ_DAT,
     DEFAULT_DAYS_BACK_FETCH,
     DEFAULT_DAYS_TO_KEEP_SERIES,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_HEDGE_REQUESTS,
     DEFAULT_INCLUDE_SERIES_ATTRIBUTE,
+    DEFAULT_INTRADAY_FETCH,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_PRICE_HIGH,
+    DEFAULT_PRICE_LOW,
+    DEFAULT_TARIFF_LOW_WINDOWS,
+    DERIVED_NET,
     DOMAIN,
     MEASUREMENT_C1,
+    OFFLOAD_BYTES_PER_ROW,
+    PIECE_BACKOFF_MAX_MINUTES,
+    PIECE_BACKOFF_MINUTES,
     POINTS_PER_DAY,
+    SLOT_VALID,
+    TRACE_BUFFER_SIZE,
     VALID_STATUS_AB,
     VALID_STATUS_C1,
 )
+from .batch import aggregate_days, build_columns, numpy_available
+from .blockstore import EntryArchive
+from .derived import DerivedDay, DerivedEngine, import_export_profiles
+from .planner import plan_refetch
+from .storage import SLOT_MS, DayRecord, EGDDataStore, day_bounds
+from .tariff import DayCost, TariffConfig, TariffEngine, parse_windows, price_points_from_attributes
+from .tracing import RefreshTrace
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
 
 @dataclass(slots=True)
 class ProfileDayData:
@@ -48,6 +90,7 @@ class ProfileDayData:
     rows_total: int
     points_without_timestamp: int
     series_points: list[list[int | float | None]]
+    missing_points: int = 0
 
 
 @dataclass(slots=True)
@@ -56,12 +99,32 @@ class CoordinatorPayload:
 
     by_profile: dict[str, ProfileDayData]
     last_success_utc: datetime | None
+    today_by_profile: dict[str, ProfileDayData] = field(default_factory=dict)
+    last_success_by_profile: dict[str, datetime] = field(default_factory=dict)
+    failed_profiles: frozenset[str] = frozenset()
+    stale: bool = False
+
+
+@dataclass(slots=True)
+class RefreshOutcome:
+    """Bookkeeping of one refresh across profile/day pieces."""
+
+    attempted: int = 0
+    errors: list[EGDAPIError] = field(default_factory=list)
+    changed_profiles: set[str] = field(default_factory=set)
+    failed_profiles: set[str] = field(default_factory=set)
 
 
 class EGDOpenAPICoordinator(DataUpdateCoordinator[CoordinatorPayload]):
     """Coordinator fetching once per day and on manual refresh."""
 
-    def __init__(self, hass: HomeAssistant, client: EGDOpenAPIClient, entry_data: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: EGDOpenAPIClient,
+        entry_data: dict[str, Any],
+        store: EGDDataStore,
+    ) -> None:
         super().__init__(
             hass,
             _LOGGER,
@@ -70,89 +133,833 @@ class EGDOpenAPICoordinator(DataUpdateCoordinator[CoordinatorPayload]):
         )
         self.client = client
         self.entry_data = entry_data
+        self.store = store
+        self.archive = EntryArchive(hass.config.path(STORAGE_DIR), store.entry_id)
         self.series_history: dict[str, list[list[int | float | None]]] = {}
+        self._profile_revisions: dict[str, int] = {}
+        self.derived = DerivedEngine()
+        self.derived_series: list[list[int | float | None]] = []
+        self.derived_day: date | None = None
+        self.tariff = TariffEngine(dt_util.get_time_zone("Europe/Prague"))
+        self.tariff.load(store.costs)
+        self.cost_day: date | None = None
+        self._unsub_prices: Callable[[], None] | None = None
+        self._day_data_cache: dict[tuple[str, date], tuple[int, ProfileDayData]] = {}
+        self._piece_failures: dict[tuple[str, date], tuple[int, datetime]] = {}
+        self._stage_timings: defaultdict[str, float] = defaultdict(float)
+        self.last_stage_timings: dict[str, float] = {}
+        # Set while profiling a refresh, so CPU stages stay on the profiled event loop.
+        self.inline_stages = False
+        self.traces: deque[RefreshTrace] = deque(maxlen=TRACE_BUFFER_SIZE)
 
     async def _async_update_data(self) -> CoordinatorPayload:
+        self.client.stage_timings.clear()
+        self._stage_timings.clear()
+        self.client.metrics.begin_refresh()
+        trace = RefreshTrace()
+        trace_token = tracing.activate(trace)
+        outcome = "error"
         try:
-            return await self._async_fetch()
+            payload = await self._async_fetch()
+            if payload.stale:
+                outcome = "stale"
+            else:
+                outcome = "partial" if payload.failed_profiles else "success"
+            return payload
         except EGDAPIAuthError as err:
             raise UpdateFailed(f"Authentication failed: {err}") from err
         except EGDAPIError as err:
             raise UpdateFailed(f"API error: {err}") from err
+        except UpdateFailed:
+            raise
         except Exception as err:  # noqa: BLE001
             raise UpdateFailed(f"Unexpected error: {err}") from err
+        finally:
+            tracing.deactivate(trace_token)
+            trace.finish(outcome)
+            self.traces.append(trace)
+            self.client.metrics.end_refresh()
+            self.last_stage_timings = {
+                stage: round(seconds, 6)
+                for stage, seconds in {**self.client.stage_timings, **self._stage_timings}.items()
+            }
 
     async def _async_fetch(self) -> CoordinatorPayload:
-        config = self.entry_data
         options = self.entry_data.get("options", {})
 
-        ean = config[CONF_EAN]
-        measurement_type = config[CONF_MEASUREMENT_TYPE]
-        zdroj_dat = config.get(CONF_ZDROJ_DAT)
-        selected_profiles = options.get(CONF_SELECTED_PROFILES, config.get(CONF_SELECTED_PROFILES, []))
+        selected_profiles = self.selected_profiles()
         days_back = int(options.get(CONF_DAYS_BACK_FETCH, DEFAULT_DAYS_BACK_FETCH))
 
         if not selected_profiles:
             raise UpdateFailed("No profiles are selected.")
 
         local_tz = dt_util.get_time_zone("Europe/Prague")
-        now_local = dt_util.now().astimezone(local_tz)
+        now_utc = dt_util.utcnow()
+        now_local = now_utc.astimezone(local_tz)
 
         yesterday = now_local.date() - timedelta(days=1)
         day_list = [yesterday - timedelta(days=offset) for offset in reversed(range(days_back))]
 
+        outcome = RefreshOutcome()
         profile_latest: dict[str, ProfileDayData] = {}
+        # Profiles needing the same window share one request when the API allows it.
+        batchable = len(selected_profiles) > 1 and self.client.profile_batching.possible(
+            self.client.consumption_endpoint(self.entry_data[CONF_MEASUREMENT_TYPE])
+        )
+
+        backfilled: set[tuple[str, date]] = set()
+        if days_back > 1:
+            runs: dict[tuple[Any, ...], list[tuple[str, list[DayRecord]]]] = {}
+            for profile_code in selected_profiles:
+                for run in self._backfill_runs(outcome, profile_code, day_list, now_utc):
+                    days = tuple(record.day for record in run)
+                    runs.setdefault(days if batchable else (profile_code, days), []).append((profile_code, run))
+                    backfilled.update((profile_code, day) for day in days)
+            for group in runs.values():
+                await self._async_fetch_day_run(outcome, group, now_utc)
 
         for day in day_list:
-            start_local = datetime.combine(day, time.min, tzinfo=local_tz)
-            end_local = datetime.combine(day, time.max, tzinfo=local_tz)
+            pieces: list[tuple[str, DayRecord, list[tuple[int, int]]]] = []
+            for profile_code in selected_profiles:
+                record = self.store.get_record(profile_code, day)
+                ranges = [] if (profile_code, day) in backfilled else plan_refetch(record, now_utc)
+                pieces.append((profile_code, record, ranges))
+            await self._async_fetch_pieces(outcome, pieces, now_utc, batchable)
 
-            if measurement_type == MEASUREMENT_C1:
-                from_param = start_local.replace(microsecond=0).isoformat()
-                to_param = end_local.replace(microsecond=0).isoformat()
-            else:
-                from_param = start_local.astimezone(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
-                to_param = end_local.astimezone(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+            for profile_code, record, _ in pieces:
+                if record.is_complete and record.fetched_at == now_utc:
+                    record.checked_at = now_utc
 
+                if day == yesterday:
+                    profile_latest[profile_code] = self._day_data(profile_code, record)
+
+        profile_today: dict[str, ProfileDayData] = {}
+        if self.intraday_enabled():
+            pieces = []
             for profile_code in selected_profiles:
-                rows = await self.client.async_get_consumption(
-                    ean=ean,
-                    measurement_type=measurement_type,
-                    profile=profile_code,
-                    time_from=from_param,
-                    time_to=to_param,
-                    zdroj_dat=zdroj_dat,
+                record = self.store.get_record(profile_code, now_local.date())
+                watermark_ms = self.store.watermarks.get(profile_code, record.start_ms)
+                slot_from = max(0, min(record.valid_prefix, (watermark_ms - record.start_ms) // SLOT_MS))
+                slot_to = min(record.slot_count, (int(now_utc.timestamp() * 1000) - record.start_ms) // SLOT_MS)
+                pieces.append((profile_code, record, [(slot_from, slot_to)] if slot_from < slot_to else []))
+            await self._async_fetch_pieces(outcome, pieces, now_utc, batchable)
+
+            for profile_code, record, _ in pieces:
+                # Watermark points at the first slot after the leading run of valid slots.
+                self.store.watermarks[profile_code] = record.start_ms + record.valid_prefix * SLOT_MS
+                profile_today[profile_code] = self._day_data(profile_code, record)
+
+        if outcome.attempted and len(outcome.errors) == outcome.attempted:
+            self.store.async_schedule_save()
+            if self.data is None:
+                raise UpdateFailed(
+                    f"All {outcome.attempted} requests failed, last error: {outcome.errors[-1]}"
                 )
+            return self._stale_payload(selected_profiles, outcome)
 
-                computed = self._compute_profile_day(
-                    rows=rows,
-                    measurement_type=measurement_type,
-                    window_start=start_local.astimezone(UTC),
-                    window_end=end_local.astimezone(UTC),
+        oldest_day = yesterday - timedelta(days=max(days_back, self._keep_days()) - 1)
+        archive_errors: dict[str, Exception] = {}
+        if expired := self.store.expired(oldest_day):
+            # Days leaving the slot store move to the compact per-profile block archive.
+            expired_days = sum(len(records) for records in expired.values())
+            with tracing.span("archive", days=expired_days):
+                archive_errors = await self.hass.async_add_executor_job(self.archive.write, expired)
+            for profile_code, err in archive_errors.items():
+                # Expired days of the profile stay in the slot store until a later refresh archives them.
+                _LOGGER.warning(
+                    "Archiving %s expired days of profile %s failed: %s",
+                    len(expired[profile_code]),
+                    profile_code,
+                    err,
                 )
+        self.store.prune(oldest_day, keep=archive_errors)
+        self._day_data_cache = {
+            key: cached for key, cached in self._day_data_cache.items() if key[1] >= oldest_day
+        }
+        self._piece_failures = {
+            key: failure for key, failure in self._piece_failures.items() if key[1] >= oldest_day
+        }
+        with tracing.span("series"):
+            for profile_code in selected_profiles:
+                if profile_code in outcome.changed_profiles or profile_code not in self.series_history:
+                    self._rebuild_series(profile_code)
+        with tracing.span("derived"):
+            self._update_derived(yesterday)
+        with tracing.span("costs"):
+            self._update_costs(yesterday)
 
-                self._append_series(profile_code, computed.series_points)
-                if day == yesterday:
-                    profile_latest[profile_code] = computed
+        previous = self.data
+        last_success_by_profile = dict(previous.last_success_by_profile) if previous else {}
+        for profile_code in selected_profiles:
+            if profile_code not in outcome.failed_profiles:
+                last_success_by_profile[profile_code] = now_utc
+            if (
+                previous is None
+                or previous.by_profile.get(profile_code) is not profile_latest.get(profile_code)
+                or previous.today_by_profile.get(profile_code) is not profile_today.get(profile_code)
+                or (profile_code in previous.failed_profiles) != (profile_code in outcome.failed_profiles)
+            ):
+                # Day rollover swaps the published day even when no record changed.
+                outcome.changed_profiles.add(profile_code)
+        if previous is not None and previous.stale:
+            # Clears the stale flag of net and cost sensors whose data did not change.
+            outcome.changed_profiles.update((DERIVED_NET, COST))
+        for profile_code in outcome.changed_profiles:
+            self._profile_revisions[profile_code] = self._profile_revisions.get(profile_code, 0) + 1
+        last_success_utc = datetime.now(tz=UTC)
+        self.store.meta = {
+            "last_success": last_success_utc.isoformat(),
+            "profiles_last_success": {
+                code: value.isoformat() for code, value in last_success_by_profile.items()
+            },
+        }
+        self.store.async_schedule_save()
 
         return CoordinatorPayload(
             by_profile=profile_latest,
-            last_success_utc=datetime.now(tz=UTC),
+            last_success_utc=last_success_utc,
+            today_by_profile=profile_today,
+            last_success_by_profile=last_success_by_profile,
+            failed_profiles=frozenset(outcome.failed_profiles),
         )
 
-    def _append_series(self, profile_code: str, points: list[list[int | float | None]]) -> None:
-        keep_days = int(
-            self.entry_data.get("options", {}).get(
-                CONF_DAYS_TO_KEEP_SERIES,
-                DEFAULT_DAYS_TO_KEEP_SERIES,
+    def async_apply_options(self, options: dict[str, Any]) -> list[str]:
+        """Apply changed options in place and return newly selected profiles.
+
+        Data of deselected profiles is dropped; retention and attribute
+        changes only rebuild the series from stored days.
+        """
+        previous = set(self.selected_profiles())
+        self.entry_data["options"] = dict(options)
+        self.client.offload_bytes = self.offload_threshold() * OFFLOAD_BYTES_PER_ROW
+        self.client.hedge_requests = self.hedge_requests_enabled()
+        selected = self.selected_profiles()
+
+        removed = previous - set(selected)
+        for profile_code in removed:
+            self.store.records.pop(profile_code, None)
+            self.store.watermarks.pop(profile_code, None)
+            self.series_history.pop(profile_code, None)
+            self._profile_revisions.pop(profile_code, None)
+        self._day_data_cache = {
+            key: cached for key, cached in self._day_data_cache.items() if key[0] not in removed
+        }
+        self._piece_failures = {
+            key: failure for key, failure in self._piece_failures.items() if key[0] not in removed
+        }
+
+        for profile_code in selected:
+            self._rebuild_series(profile_code)
+            self._profile_revisions[profile_code] = self._profile_revisions.get(profile_code, 0) + 1
+        if self.derived_day is not None:
+            self._update_derived(self.derived_day, rebuild_series=True)
+        self.async_track_prices()
+        if self.cost_day is not None:
+            self._update_costs(self.cost_day)
+        self.store.async_schedule_save()
+        return [profile_code for profile_code in selected if profile_code not in previous]
+
+    def restore_payload(self) -> CoordinatorPayload | None:
+        """Rebuild the last published payload from storage without network access."""
+        last_success = self.store.meta.get("last_success")
+        if not last_success:
+            return None
+
+        selected_profiles = self.selected_profiles()
+        today = dt_util.now().astimezone(dt_util.get_time_zone("Europe/Prague")).date()
+
+        profile_latest: dict[str, ProfileDayData] = {}
+        profile_today: dict[str, ProfileDayData] = {}
+        for profile_code in selected_profiles:
+            past_days = [r for r in self.store.profile_days(profile_code) if r.day < today]
+            if past_days:
+                profile_latest[profile_code] = self._day_data(profile_code, past_days[-1])
+            if self.intraday_enabled() and today in self.store.records.get(profile_code, {}):
+                profile_today[profile_code] = self._day_data(
+                    profile_code, self.store.records[profile_code][today]
+                )
+            self._rebuild_series(profile_code)
+        self._update_derived(today - timedelta(days=1))
+        self._update_costs(today - timedelta(days=1))
+
+        return CoordinatorPayload(
+            by_profile=profile_latest,
+            last_success_utc=dt_util.parse_datetime(last_success),
+            today_by_profile=profile_today,
+            last_success_by_profile={
+                code: parsed
+                for code, value in self.store.meta.get("profiles_last_success", {}).items()
+                if (parsed := dt_util.parse_datetime(value)) is not None
+            },
+        )
+
+    def _stale_payload(self, selected_profiles: list[str], outcome: RefreshOutcome) -> CoordinatorPayload:
+        """Keep serving the last good payload, marked stale, while the API fails."""
+        if not self.data.stale:
+            _LOGGER.warning(
+                "All %s requests failed, serving last data as stale: %s",
+                outcome.attempted,
+                outcome.errors[-1],
             )
+            # Net and cost sensors carry the stale flag too.
+            for key in (*selected_profiles, DERIVED_NET, COST):
+                self._profile_revisions[key] = self._profile_revisions.get(key, 0) + 1
+        else:
+            _LOGGER.debug("API still failing, keeping stale data: %s", outcome.errors[-1])
+        return replace(self.data, failed_profiles=frozenset(selected_profiles), stale=True)
+
+    def _piece_due(self, outcome: RefreshOutcome, profile_code: str, day: date, now_utc: datetime) -> bool:
+        """Return False while a failed profile/day piece is backing off."""
+        failure = self._piece_failures.get((profile_code, day))
+        if failure is not None and now_utc < failure[1]:
+            outcome.failed_profiles.add(profile_code)
+            return False
+        return True
+
+    def _record_piece_failure(
+        self,
+        outcome: RefreshOutcome,
+        profile_code: str,
+        day: date,
+        now_utc: datetime,
+        err: EGDAPIError,
+    ) -> None:
+        """Schedule exponential backoff for a failed profile/day piece."""
+        key = (profile_code, day)
+        failure = self._piece_failures.get(key)
+        failures = failure[0] + 1 if failure else 1
+        backoff = min(PIECE_BACKOFF_MAX_MINUTES, PIECE_BACKOFF_MINUTES * 2 ** (failures - 1))
+        self._piece_failures[key] = (failures, now_utc + timedelta(minutes=backoff))
+        outcome.failed_profiles.add(profile_code)
+        _LOGGER.warning(
+            "Fetching profile %s for %s failed (%s in a row), retrying in %s minutes: %s",
+            profile_code,
+            day.isoformat(),
+            failures,
+            backoff,
+            err,
         )
-        keep_points = max(1, keep_days) * POINTS_PER_DAY
 
-        hist = self.series_history.setdefault(profile_code, [])
-        hist.extend(points)
-        if len(hist) > keep_points:
-            self.series_history[profile_code] = hist[-keep_points:]
+    async def _async_fetch_pieces(
+        self,
+        outcome: RefreshOutcome,
+        pieces: list[tuple[str, DayRecord, list[tuple[int, int]]]],
+        now_utc: datetime,
+        batchable: bool,
+    ) -> None:
+        """Fetch due pieces of one day, grouping profiles with equal ranges when batchable."""
+        groups: dict[tuple[Any, ...], list[tuple[str, DayRecord]]] = {}
+        group_ranges: dict[tuple[Any, ...], list[tuple[int, int]]] = {}
+        for profile_code, record, ranges in pieces:
+            if ranges and self._piece_due(outcome, profile_code, record.day, now_utc):
+                # Batched profiles share one request window, which depends on the stamping side.
+                key = (record.end_aligned, *ranges) if batchable else (profile_code, *ranges)
+                groups.setdefault(key, []).append((profile_code, record))
+                group_ranges[key] = ranges
+        for key, group in groups.items():
+            await self._async_fetch_piece(outcome, group, group_ranges[key], now_utc)
+
+    async def _async_fetch_piece(
+        self,
+        outcome: RefreshOutcome,
+        group: list[tuple[str, DayRecord]],
+        ranges: list[tuple[int, int]],
+        now_utc: datetime,
+    ) -> None:
+        """Fetch planned ranges of one day for a group of profiles, isolating its failures.
+
+        A failing piece is retried with its own exponential backoff while the
+        rest of the refresh proceeds; authentication errors still abort.
+        """
+        profile_codes = [profile_code for profile_code, _ in group]
+        day = group[0][1].day
+        outcome.attempted += len(group)
+        try:
+            with tracing.span("piece", profile=",".join(profile_codes), day=day.isoformat(), ranges=len(ranges)):
+                for slot_from, slot_to in ranges:
+                    window_start, window_end = group[0][1].request_window(slot_from, slot_to)
+                    rows_by_profile = await self._async_request_rows_by_profile(
+                        profile_codes, window_start, window_end
+                    )
+                    for profile_code, record in group:
+                        if await self._async_merge_slots(
+                            record, profile_code, slot_from, slot_to, rows_by_profile.get(profile_code, [])
+                        ):
+                            outcome.changed_profiles.add(profile_code)
+                        record.fetched_at = now_utc
+        except EGDAPIAuthError:
+            raise
+        except EGDAPICircuitOpenError as err:
+            # Not the piece's fault; it is retried as soon as the circuit closes.
+            outcome.errors.extend([err] * len(group))
+            outcome.failed_profiles.update(profile_codes)
+        except EGDAPIError as err:
+            for profile_code, _ in group:
+                outcome.errors.append(err)
+                self._record_piece_failure(outcome, profile_code, day, now_utc, err)
+        else:
+            for profile_code, _ in group:
+                self._piece_failures.pop((profile_code, day), None)
+
+    def _backfill_runs(
+        self,
+        outcome: RefreshOutcome,
+        profile_code: str,
+        day_list: list[date],
+        now_utc: datetime,
+    ) -> list[list[DayRecord]]:
+        """Group consecutive never-fetched days of a profile into multi-day runs."""
+        runs: list[list[DayRecord]] = []
+        current: list[DayRecord] = []
+        for day in day_list:
+            record = self.store.get_record(profile_code, day)
+            if record.fetched_at is None and self._piece_due(outcome, profile_code, day, now_utc):
+                current.append(record)
+                continue
+            if len(current) > 1:
+                runs.append(current)
+            current = []
+        if len(current) > 1:
+            runs.append(current)
+        return runs
+
+    async def _async_fetch_day_run(
+        self,
+        outcome: RefreshOutcome,
+        runs: list[tuple[str, list[DayRecord]]],
+        now_utc: datetime,
+    ) -> None:
+        """Backfill the same consecutive days of one or more profiles with one request."""
+        profile_codes = [profile_code for profile_code, _ in runs]
+        first_records = runs[0][1]
+        outcome.attempted += len(runs)
+        try:
+            with tracing.span(
+                "backfill",
+                profile=",".join(profile_codes),
+                first_day=first_records[0].day.isoformat(),
+                days=len(first_records),
+            ):
+                # Both run boundaries are asked for: the first interval is stamped on the start by
+                # start-stamping APIs, the last one on the end by end-stamping ones. The row on the
+                # other boundary belongs to a neighbouring day and is dropped when splitting.
+                rows_by_profile = await self._async_request_rows_by_profile(
+                    profile_codes,
+                    first_records[0].slot_start(0),
+                    first_records[-1].slot_start(first_records[-1].slot_count),
+                )
+        except EGDAPIAuthError:
+            raise
+        except EGDAPICircuitOpenError as err:
+            outcome.errors.extend([err] * len(runs))
+            outcome.failed_profiles.update(profile_codes)
+            return
+        except EGDAPIError as err:
+            for profile_code, records in runs:
+                outcome.errors.append(err)
+                for record in records:
+                    self._record_piece_failure(outcome, profile_code, record.day, now_utc, err)
+            return
+
+        for profile_code, records in runs:
+            rows = rows_by_profile.get(profile_code, [])
+            if not records[0].end_aligned and await self._async_run_stage(
+                "detect", partial(self._run_end_stamped, rows, records), len(rows)
+            ):
+                # Days are split by the stamping side, so it must be known before computing.
+                for record in records:
+                    record.end_aligned = True
+            computed_days = await self._async_run_stage(
+                "compute",
+                partial(self._compute_days, rows, self.entry_data[CONF_MEASUREMENT_TYPE], records),
+                len(rows),
+            )
+            started = time.perf_counter()
+            for record, computed in zip(records, computed_days):
+                if record.merge_points(computed.series_points, slot_from=0, slot_to=record.slot_count):
+                    outcome.changed_profiles.add(profile_code)
+                record.fetched_at = now_utc
+                self._piece_failures.pop((profile_code, record.day), None)
+            self._record_stage("merge", started)
+            _LOGGER.debug(
+                "Backfilled %s days of profile %s from %s rows in one request",
+                len(records),
+                profile_code,
+                len(rows),
+            )
+
+    async def async_fetch_detached_record(self, profile_code: str, day: date) -> DayRecord:
+        """Fetch one whole day into a record that is not stored, e.g. for exports past the retention."""
+        record = DayRecord.empty(day)
+        record.end_aligned = any(other.end_aligned for other in self.store.profile_days(profile_code))
+        rows = await self._async_request_rows(profile_code, *record.request_window(0, record.slot_count))
+        await self._async_merge_slots(record, profile_code, 0, record.slot_count, rows)
+        return record
+
+    async def _async_request_rows(
+        self,
+        profile_code: str,
+        window_start: datetime,
+        window_end: datetime,
+    ) -> list[dict[str, Any]]:
+        """Request rows of one profile for a UTC window."""
+        measurement_type = self.entry_data[CONF_MEASUREMENT_TYPE]
+        from_param, to_param = self.format_window(window_start, window_end, measurement_type)
+        return await self.client.async_get_consumption(
+            ean=self.entry_data[CONF_EAN],
+            measurement_type=measurement_type,
+            profile=profile_code,
+            time_from=from_param,
+            time_to=to_param,
+            zdroj_dat=self.entry_data.get(CONF_ZDROJ_DAT),
+        )
+
+    async def _async_request_rows_by_profile(
+        self,
+        profile_codes: list[str],
+        window_start: datetime,
+        window_end: datetime,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Request rows of several profiles, in one call when the API accepts it."""
+        if len(profile_codes) > 1:
+            measurement_type = self.entry_data[CONF_MEASUREMENT_TYPE]
+            from_param, to_param = self.format_window(window_start, window_end, measurement_type)
+            rows_by_profile = await self.client.async_get_consumption_batch(
+                ean=self.entry_data[CONF_EAN],
+                measurement_type=measurement_type,
+                profiles=profile_codes,
+                time_from=from_param,
+                time_to=to_param,
+                zdroj_dat=self.entry_data.get(CONF_ZDROJ_DAT),
+            )
+            if rows_by_profile is not None:
+                # A profile left out of the batched answer is not known to be empty.
+                for profile_code in profile_codes:
+                    if profile_code not in rows_by_profile:
+                        rows_by_profile[profile_code] = await self._async_request_rows(
+                            profile_code, window_start, window_end
+                        )
+                return rows_by_profile
+        return {
+            profile_code: await self._async_request_rows(profile_code, window_start, window_end)
+            for profile_code in profile_codes
+        }
+
+    async def _async_merge_slots(
+        self,
+        record: DayRecord,
+        profile_code: str,
+        slot_from: int,
+        slot_to: int,
+        rows: list[dict[str, Any]],
+    ) -> bool:
+        """Merge rows of one slot range of a day into the record.
+
+        Returns True when the record changed. A response identical to the
+        one merged last time for the same range is not parsed again.
+        """
+        measurement_type = self.entry_data[CONF_MEASUREMENT_TYPE]
+        window_start, window_end = record.request_window(slot_from, slot_to)
+
+        fingerprint = await self._async_run_stage("fingerprint", partial(self._fingerprint, rows), len(rows))
+        if record.fingerprint_matches(slot_from, slot_to, fingerprint):
+            _LOGGER.debug(
+                "Unchanged response for profile %s on %s slots %s-%s",
+                profile_code,
+                record.day.isoformat(),
+                slot_from,
+                slot_to,
+            )
+            return False
+
+        computed = await self._async_run_stage(
+            "compute",
+            partial(
+                self._compute_profile_day,
+                rows=rows,
+                measurement_type=measurement_type,
+                window_start=window_start,
+                window_end=window_end,
+            ),
+            len(rows),
+        )
+        started = time.perf_counter()
+        changed = record.merge_points(
+            computed.series_points,
+            slot_from=slot_from,
+            slot_to=slot_to,
+            points_without_timestamp=computed.points_without_timestamp,
+        )
+        self._record_stage("merge", started)
+        _LOGGER.debug(
+            "Merged %s rows for profile %s on %s slots %s-%s (%s valid, %s estimated, %s missing)",
+            computed.rows_total,
+            profile_code,
+            record.day.isoformat(),
+            slot_from,
+            slot_to,
+            record.valid_slots,
+            record.estimated_slots,
+            record.missing_slots,
+        )
+        record.remember_fingerprint(slot_from, slot_to, fingerprint)
+        return changed
+
+    async def _async_run_stage(self, stage: str, job: Callable[[], _T], rows: int) -> _T:
+        """Run a CPU stage, in the executor when the batch exceeds the threshold."""
+        started = time.perf_counter()
+        if rows >= self.offload_threshold() and not self.inline_stages:
+            result = await self.hass.async_add_executor_job(job)
+            stage = f"{stage}_offloaded"
+        else:
+            result = job()
+        self._record_stage(stage, started, rows=rows)
+        return result
+
+    def _record_stage(self, stage: str, started: float, **attributes: Any) -> None:
+        """Add stage time to the refresh totals and the current trace."""
+        duration = time.perf_counter() - started
+        self._stage_timings[stage] += duration
+        tracing.record_span(stage, started, duration, **attributes)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify entities, timing state writes into the latest trace."""
+        started = time.perf_counter()
+        super().async_update_listeners()
+        if self.traces:
+            self.traces[-1].add_span(
+                "state_writes",
+                started,
+                time.perf_counter() - started,
+                {"listeners": len(self._listeners)},
+            )
+
+    @staticmethod
+    def _fingerprint(rows: list[dict[str, Any]]) -> str:
+        """Return content hash of a response."""
+        encoded = json.dumps(rows, sort_keys=True, separators=(",", ":"), default=str).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    @staticmethod
+    def format_window(window_start: datetime, window_end: datetime, measurement_type: str) -> tuple[str, str]:
+        """Format request window; C1 expects local time, A/B expects UTC."""
+        if measurement_type == MEASUREMENT_C1:
+            local_tz = dt_util.get_time_zone("Europe/Prague")
+            return (
+                window_start.astimezone(local_tz).replace(microsecond=0).isoformat(),
+                window_end.astimezone(local_tz).replace(microsecond=0).isoformat(),
+            )
+        return (
+            window_start.astimezone(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+            window_end.astimezone(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        )
+
+    def _day_data(self, profile_code: str, record: DayRecord) -> ProfileDayData:
+        """Return day data, rebuilding it only when the record changed."""
+        key = (profile_code, record.day)
+        cached = self._day_data_cache.get(key)
+        if cached is not None and cached[0] == record.revision:
+            return cached[1]
+        data = self._profile_day_from_record(record)
+        self._day_data_cache[key] = (record.revision, data)
+        return data
+
+    @staticmethod
+    def _profile_day_from_record(record: DayRecord) -> ProfileDayData:
+        """Build day data from slot-level record."""
+        valid_values = [
+            value
+            for value, state in zip(record.values, record.states)
+            if state == SLOT_VALID and value is not None
+        ]
+        return ProfileDayData(
+            total_kwh=math.fsum(valid_values),
+            window_start=record.slot_start(0),
+            window_end=record.slot_start(record.slot_count) - timedelta(microseconds=1),
+            valid_points=record.valid_slots,
+            invalid_points=record.estimated_slots,
+            rows_total=record.valid_slots + record.estimated_slots + record.points_without_timestamp,
+            points_without_timestamp=record.points_without_timestamp,
+            series_points=record.series_points(),
+            missing_points=record.missing_slots,
+        )
+
+    def _keep_days(self) -> int:
+        return max(
+            1,
+            int(
+                self.entry_data.get("options", {}).get(
+                    CONF_DAYS_TO_KEEP_SERIES,
+                    DEFAULT_DAYS_TO_KEEP_SERIES,
+                )
+            ),
+        )
+
+    def _rebuild_series(self, profile_code: str) -> None:
+        """Rebuild attribute series from stored day records."""
+        keep_points = self._keep_days() * POINTS_PER_DAY
+
+        points: list[list[int | float | None]] = []
+        for record in self.store.profile_days(profile_code):
+            points.extend(record.series_points())
+        self.series_history[profile_code] = points[-keep_points:]
+
+    def _update_derived(self, day: date, rebuild_series: bool = False) -> None:
+        """Recompute derived days whose import or export record changed and publish `day`."""
+        previous = self.get_derived_day()
+        profiles = self.derived_profiles()
+        changed = self.derived.update(
+            profiles, {profile_code: self.store.profile_days(profile_code) for profile_code in profiles or ()}
+        )
+        self.derived_day = day
+        if changed or rebuild_series:
+            self.derived_series = self.derived.series(self._keep_days() * POINTS_PER_DAY)
+        if changed or rebuild_series or self.get_derived_day() is not previous:
+            self._profile_revisions[DERIVED_NET] = self._profile_revisions.get(DERIVED_NET, 0) + 1
+
+    def _update_costs(self, day: date) -> bool:
+        """Recost days whose record or recorded prices changed; keep this and the previous month."""
+        previous = self.get_cost_day()
+        keep_from = (day.replace(day=1) - timedelta(days=1)).replace(day=1)
+        config = self.tariff_config()
+        changed = self.tariff.update(
+            config,
+            self.store.profile_days(config.profile) if config else [],
+            self.store.prices,
+            keep_from,
+        )
+        self.store.prune_prices(int(day_bounds(keep_from)[0].timestamp() * 1000))
+        self.cost_day = day
+        if changed:
+            self.store.costs = self.tariff.as_dict()
+            self.store.async_schedule_save()
+        if changed or self.get_cost_day() is not previous:
+            self._profile_revisions[COST] = self._profile_revisions.get(COST, 0) + 1
+            return True
+        return False
+
+    @callback
+    def async_track_prices(self) -> None:
+        """Record price points of the configured price entity whenever its state changes.
+
+        Spot price entities only expose today and tomorrow, so prices of the
+        day being costed must be collected while they are current.
+        """
+        self.async_untrack_prices()
+        config = self.tariff_config()
+        if config is None or config.price_entity is None:
+            return
+        self._record_prices(self.hass.states.get(config.price_entity))
+        self._unsub_prices = async_track_state_change_event(
+            self.hass, [config.price_entity], self._async_price_changed
+        )
+
+    @callback
+    def async_untrack_prices(self) -> None:
+        if self._unsub_prices is not None:
+            self._unsub_prices()
+            self._unsub_prices = None
+
+    @callback
+    def _async_price_changed(self, event: Event[EventStateChangedData]) -> None:
+        if not self._record_prices(event.data["new_state"]) or self.cost_day is None:
+            return
+        if self._update_costs(self.cost_day):
+            self.async_update_listeners()
+
+    def _record_prices(self, state: State | None) -> bool:
+        if state is None:
+            return False
+        points = {
+            ts: price
+            for ts, price in price_points_from_attributes(state.attributes).items()
+            if self.store.prices.get(ts) != price
+        }
+        if not points:
+            return False
+        self.store.prices.update(points)
+        self.store.async_schedule_save()
+        return True
+
+    def _compute_days(
+        self,
+        rows: list[dict[str, Any]],
+        measurement_type: str,
+        records: list[DayRecord],
+    ) -> list[ProfileDayData]:
+        """Split a multi-day row set into per-day data.
+
+        Uses the columnar NumPy engine when available and exact, otherwise
+        groups rows by day and runs the scalar computation per day. Rows
+        without a timestamp cannot be assigned to a day and are dropped.
+        """
+        end_aligned = records[0].end_aligned
+        bounds = [record.start_ms for record in records]
+        bounds.append(records[-1].start_ms + records[-1].slot_count * SLOT_MS)
+
+        if numpy_available():
+            valid_status = VALID_STATUS_C1 if measurement_type == MEASUREMENT_C1 else VALID_STATUS_AB
+            columns = build_columns(
+                rows,
+                parse_timestamp=self._parse_timestamp,
+                extract_value=self._extract_value,
+                extract_status=self._extract_status,
+                extract_unit=self._extract_unit,
+                is_valid_status=partial(self._is_valid_status, expected_code=valid_status),
+            )
+            if columns is not None:
+                return [
+                    ProfileDayData(
+                        total_kwh=aggregate.total_kwh,
+                        window_start=record.slot_start(0),
+                        window_end=record.slot_start(record.slot_count) - timedelta(microseconds=1),
+                        valid_points=aggregate.valid_points,
+                        invalid_points=aggregate.invalid_points,
+                        rows_total=aggregate.rows_total,
+                        points_without_timestamp=0,
+                        series_points=aggregate.series_points,
+                    )
+                    for aggregate, record in zip(
+                        aggregate_days(columns, bounds, end_aligned=end_aligned), records
+                    )
+                ]
+
+        grouped: list[list[dict[str, Any]]] = [[] for _ in records]
+        find_day = bisect_left if end_aligned else bisect_right
+        for row in rows:
+            ts = self._parse_timestamp(row)
+            if ts is None:
+                continue
+            index = find_day(bounds, int(ts.astimezone(UTC).timestamp() * 1000)) - 1
+            if 0 <= index < len(records):
+                grouped[index].append(row)
+
+        return [
+            self._compute_profile_day(
+                rows=day_rows,
+                measurement_type=measurement_type,
+                window_start=record.slot_start(0),
+                window_end=record.slot_start(record.slot_count) - timedelta(microseconds=1),
+            )
+            for day_rows, record in zip(grouped, records)
+        ]
+
+    @classmethod
+    def _run_end_stamped(cls, rows: list[dict[str, Any]], records: list[DayRecord]) -> bool:
+        """Return True when rows of a multi-day run are stamped by interval end.
+
+        Such rows hold a stamp on the run end and none on the run start, where
+        start-stamped rows hold their first interval.
+        """
+        start_ms = records[0].start_ms
+        end_ms = records[-1].start_ms + records[-1].slot_count * SLOT_MS
+        stamps = {
+            int(ts.astimezone(UTC).timestamp() * 1000)
+            for ts in map(cls._parse_timestamp, rows)
+            if ts is not None
+        }
+        return end_ms in stamps and start_ms not in stamps
 
     def _compute_profile_day(
         self,
@@ -406,6 +1213,22 @@ class EGDOpenAPICoordinator(DataUpdateCoordinator[CoordinatorPayload]):
             return value * Decimal(str(ATTR_INTERVAL_MINUTES / 60))
         return value
 
+    def selected_profiles(self) -> list[str]:
+        options = self.entry_data.get("options", {})
+        return list(options.get(CONF_SELECTED_PROFILES, self.entry_data.get(CONF_SELECTED_PROFILES, [])))
+
+    def offload_threshold(self) -> int:
+        """Row count from which parsing and aggregation leave the event loop."""
+        return int(self.entry_data.get("options", {}).get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD))
+
+    def hedge_requests_enabled(self) -> bool:
+        return bool(self.entry_data.get("options", {}).get(CONF_HEDGE_REQUESTS, DEFAULT_HEDGE_REQUESTS))
+
+    def diagnostic_sensors_enabled(self) -> bool:
+        return bool(
+            self.entry_data.get("options", {}).get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS)
+        )
+
     def include_series_attribute(self) -> bool:
         return bool(
             self.entry_data.get("options", {}).get(
@@ -414,6 +1237,12 @@ class EGDOpenAPICoordinator(DataUpdateCoordinator[CoordinatorPayload]):
             )
         )
 
+    def intraday_enabled(self) -> bool:
+        """Intraday fetching is only offered for C1 meters."""
+        return self.entry_data[CONF_MEASUREMENT_TYPE] == MEASUREMENT_C1 and bool(
+            self.entry_data.get("options", {}).get(CONF_INTRADAY_FETCH, DEFAULT_INTRADAY_FETCH)
+        )
+
     def profile_name(self, profile_code: str) -> str:
         profile_map = self.entry_data.get(CONF_PROFILE_MAP, {})
         return str(profile_map.get(profile_code, profile_code))
@@ -423,5 +1252,74 @@ class EGDOpenAPICoordinator(DataUpdateCoordinator[CoordinatorPayload]):
             return None
         return self.data.by_profile.get(profile_code)
 
+    def profile_revision(self, profile_code: str) -> int:
+        """Return counter that changes whenever the profile's stored data changes."""
+        return self._profile_revisions.get(profile_code, 0)
+
+    def profile_fresh(self, profile_code: str) -> bool:
+        """Return False when the profile's pieces failed or are backing off."""
+        if not self.data:
+            return False
+        return profile_code not in self.data.failed_profiles
+
+    def is_stale(self) -> bool:
+        """Return True when the published data is the last good payload kept during an outage."""
+        return bool(self.data and self.data.stale)
+
+    def get_today_data(self, profile_code: str) -> ProfileDayData | None:
+        if not self.data:
+            return None
+        return self.data.today_by_profile.get(profile_code)
+
     def get_series(self, profile_code: str) -> list[list[int | float | None]]:
         return self.series_history.get(profile_code, [])
+
+    def derived_profiles(self) -> tuple[str, str] | None:
+        """Return the selected import and export profile when both are selected."""
+        import_code, export_code = import_export_profiles(self.selected_profiles())
+        if import_code is None or export_code is None or import_code == export_code:
+            return None
+        return import_code, export_code
+
+    def cost_profile(self) -> str | None:
+        """Return the profile whose consumption is costed: the import profile, else the first selected."""
+        selected = self.selected_profiles()
+        import_code, _ = import_export_profiles(selected)
+        return import_code or (selected[0] if selected else None)
+
+    def tariff_config(self) -> TariffConfig | None:
+        """Return cost settings, or None while no price is configured."""
+        options = self.entry_data.get("options", {})
+        price_low = float(options.get(CONF_PRICE_LOW, DEFAULT_PRICE_LOW))
+        price_high = float(options.get(CONF_PRICE_HIGH, DEFAULT_PRICE_HIGH))
+        price_entity = options.get(CONF_PRICE_ENTITY) or None
+        profile = self.cost_profile()
+        if profile is None or not (price_low or price_high or price_entity):
+            return None
+        try:
+            low_windows = parse_windows(options.get(CONF_TARIFF_LOW_WINDOWS, DEFAULT_TARIFF_LOW_WINDOWS))
+        except ValueError as err:
+            _LOGGER.warning("Ignoring invalid low tariff windows: %s", err)
+            low_windows = ()
+        return TariffConfig(
+            profile=profile,
+            low_windows=low_windows,
+            price_low=price_low,
+            price_high=price_high,
+            price_entity=price_entity,
+        )
+
+    def get_cost_day(self) -> DayCost | None:
+        if self.cost_day is None:
+            return None
+        return self.tariff.get(self.cost_day)
+
+    def get_cost_month(self) -> dict[str, Any]:
+        """Return cost totals of the current local month so far; empty on its first day."""
+        today = dt_util.now().astimezone(dt_util.get_time_zone("Europe/Prague")).date()
+        return self.tariff.month(today)
+
+    def get_derived_day(self) -> DerivedDay | None:
+        if self.derived_day is None:
+            return None
+        return self.derived.get(self.derived_day)
@@ -0,0 +1,211 @@
+"""Net import/export series derived from import and export profiles."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from .batch import np, numpy_available
+from .storage import SLOT_MS, DayRecord
+
+IMPORT_KEYS = ("ICQ", "IC")
+EXPORT_KEYS = ("ISQ", "IS")
+
+
+def import_export_profiles(codes: Iterable[str]) -> tuple[str | None, str | None]:
+    """Return the import and export profile among `codes`, preferring quarter-hour `Q2` ones."""
+    codes = list(codes)
+
+    def _pick(keys: tuple[str, ...], preferred: str) -> str | None:
+        candidates = [code for code in codes if any(key in code.upper() for key in keys)]
+        return next((code for code in candidates if preferred in code.upper()), candidates[0] if candidates else None)
+
+    return _pick(IMPORT_KEYS, "ICQ2"), _pick(EXPORT_KEYS, "ISQ2")
+
+
+@dataclass(slots=True)
+class DerivedDay:
+    """Slot-aligned combination of the import and export profile for one day.
+
+    `net` holds import minus export per slot, or None where either profile
+    has no valid value for the slot.
+    """
+
+    day: date
+    start_ms: int
+    shift: int
+    net: list[float | None]
+    import_kwh: float
+    export_kwh: float
+    net_import_kwh: float
+    net_export_kwh: float
+    peak_net_import_kwh: float | None
+    peak_slot: int | None
+    aligned_slots: int
+    revisions: tuple[int, int]
+
+    @property
+    def export_ratio(self) -> float | None:
+        """Exported energy per imported energy over aligned slots."""
+        return round(self.export_kwh / self.import_kwh, 4) if self.import_kwh else None
+
+    def series_points(self) -> list[list[int | float | None]]:
+        return [
+            [self.start_ms + (slot + self.shift) * SLOT_MS, value]
+            for slot, value in enumerate(self.net)
+            if value is not None
+        ]
+
+    def as_dict(self, include_series: bool = False) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "day": self.day.isoformat(),
+            "import_kwh": self.import_kwh,
+            "export_kwh": self.export_kwh,
+            "net_import_kwh": self.net_import_kwh,
+            "net_export_kwh": self.net_export_kwh,
+            "peak_net_import_kwh": self.peak_net_import_kwh,
+            "peak_slot_start": (
+                self.start_ms + (self.peak_slot + self.shift) * SLOT_MS if self.peak_slot is not None else None
+            ),
+            "export_ratio": self.export_ratio,
+            "aligned_slots": self.aligned_slots,
+        }
+        if include_series:
+            data["series"] = self.series_points()
+        return data
+
+
+def compute_derived_day(import_record: DayRecord, export_record: DayRecord) -> DerivedDay:
+    """Combine two records of the same day slot by slot, vectorized when NumPy is available.
+
+    Records keep slot i as the i-th interval of the day whichever way the API
+    stamps it, so slots align by index. The stamping side only matters for the
+    output timestamps: intervals are stamped by their end when both records
+    are, by their start otherwise.
+    """
+    if numpy_available():
+        net, totals, peak_slot = _combine_numpy(import_record.values, export_record.values)
+    else:
+        net, totals, peak_slot = _combine_python(import_record.values, export_record.values)
+    import_kwh, export_kwh, net_import_kwh, net_export_kwh = (round(total, 6) for total in totals)
+    return DerivedDay(
+        day=import_record.day,
+        start_ms=import_record.start_ms,
+        shift=derived_shift(import_record, export_record),
+        net=net,
+        import_kwh=import_kwh,
+        export_kwh=export_kwh,
+        net_import_kwh=net_import_kwh,
+        net_export_kwh=net_export_kwh,
+        peak_net_import_kwh=net[peak_slot] if peak_slot is not None else None,
+        peak_slot=peak_slot,
+        aligned_slots=sum(1 for value in net if value is not None),
+        revisions=(import_record.revision, export_record.revision),
+    )
+
+
+def derived_shift(import_record: DayRecord, export_record: DayRecord) -> int:
+    """Return the slot offset of derived timestamps, 1 when both records are end-stamped."""
+    return 1 if import_record.end_aligned and export_record.end_aligned else 0
+
+
+def _combine_numpy(
+    import_values: list[float | None],
+    export_values: list[float | None],
+) -> tuple[list[float | None], tuple[float, float, float, float], int | None]:
+    imported = np.array(import_values, dtype=float)
+    exported = np.array(export_values, dtype=float)
+    net = imported - exported
+    aligned = ~np.isnan(net)
+    if not aligned.any():
+        return [None] * len(import_values), (0.0, 0.0, 0.0, 0.0), None
+
+    aligned_net = net[aligned]
+    totals = (
+        float(imported[aligned].sum()),
+        float(exported[aligned].sum()),
+        float(np.maximum(aligned_net, 0).sum()),
+        float(np.maximum(-aligned_net, 0).sum()),
+    )
+    peak_slot = int(np.argmax(np.where(aligned, net, -np.inf)))
+    rounded = np.round(net, 6).tolist()
+    return [value if is_aligned else None for value, is_aligned in zip(rounded, aligned.tolist())], totals, peak_slot
+
+
+def _combine_python(
+    import_values: list[float | None],
+    export_values: list[float | None],
+) -> tuple[list[float | None], tuple[float, float, float, float], int | None]:
+    net: list[float | None] = []
+    import_kwh = export_kwh = net_import_kwh = net_export_kwh = 0.0
+    peak_slot: int | None = None
+    for slot, (imported, exported) in enumerate(zip(import_values, export_values)):
+        if imported is None or exported is None:
+            net.append(None)
+            continue
+        value = imported - exported
+        import_kwh += imported
+        export_kwh += exported
+        if value > 0:
+            net_import_kwh += value
+        else:
+            net_export_kwh -= value
+        if peak_slot is None or value > net[peak_slot]:
+            peak_slot = slot
+        net.append(round(value, 6))
+    return net, (import_kwh, export_kwh, net_import_kwh, net_export_kwh), peak_slot
+
+
+class DerivedEngine:
+    """Derived days of one entry, recomputed only for days whose records changed."""
+
+    def __init__(self) -> None:
+        self.profiles: tuple[str, str] | None = None
+        self.days: dict[date, DerivedDay] = {}
+        self.recomputed_days = 0
+
+    def update(self, profiles: tuple[str, str] | None, records: dict[str, list[DayRecord]]) -> bool:
+        """Bring derived days in line with the stored records; return True when any changed."""
+        if profiles != self.profiles:
+            self.profiles = profiles
+            self.days = {}
+        if profiles is None:
+            return False
+
+        import_code, export_code = profiles
+        exports = {record.day: record for record in records.get(export_code, [])}
+        changed = False
+        days: dict[date, DerivedDay] = {}
+        for record in records.get(import_code, []):
+            other = exports.get(record.day)
+            if other is None or other.slot_count != record.slot_count:
+                continue
+            cached = self.days.get(record.day)
+            if (
+                cached is not None
+                and cached.revisions == (record.revision, other.revision)
+                and cached.shift == derived_shift(record, other)
+            ):
+                days[record.day] = cached
+                continue
+            days[record.day] = compute_derived_day(record, other)
+            self.recomputed_days += 1
+            changed = True
+        changed = changed or days.keys() != self.days.keys()
+        self.days = days
+        return changed
+
+    def get(self, day: date) -> DerivedDay | None:
+        return self.days.get(day)
+
+    def range(self, start: date, end: date) -> list[DerivedDay]:
+        """Return derived days within [start, end] in order."""
+        return [self.days[day] for day in sorted(self.days) if start <= day <= end]
+
+    def series(self, keep_points: int) -> list[list[int | float | None]]:
+        points: list[list[int | float | None]] = []
+        for day in sorted(self.days):
+            points.extend(self.days[day].series_points())
+        return points[-keep_points:]
@@ -7,9 +7,19 @@ from typing import Any
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import CONF_CLIENT_ID, CONF_CLIENT_SECRET, DOMAIN
+from .const import (
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_DEDICATED_SESSION,
+    DATA_SCHEDULER,
+    DEFAULT_DEDICATED_SESSION,
+    DOMAIN,
+    PROFILE_REPORT,
+)
+from .coordinator import EGDOpenAPICoordinator
+from .scheduler import EGDRefreshScheduler
+from .session import session_stats
 
 REDACT_KEYS = {CONF_CLIENT_ID, CONF_CLIENT_SECRET}
 
@@ -25,12 +35,24 @@ async def async_get_config_entry_diagnostics(
             data[key] = "***REDACTED***"
 
     runtime = hass.data.get(DOMAIN, {}).get(config_entry.entry_id, {})
-    coordinator: DataUpdateCoordinator | None = runtime.get("coordinator")
+    coordinator: EGDOpenAPICoordinator | None = runtime.get("coordinator")
+    scheduler: EGDRefreshScheduler | None = hass.data.get(DATA_SCHEDULER)
+    http_pool = None
+    if config_entry.options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION):
+        http_pool = session_stats(hass, config_entry.data["environment"])
 
     return {
         "entry": data,
         "options": dict(config_entry.options),
         "coordinator_last_update_success": coordinator.last_update_success if coordinator else None,
+        "last_refresh_stage_seconds": coordinator.last_stage_timings if coordinator else None,
+        "api_requests": coordinator.client.metrics.summary() if coordinator else None,
+        "api_circuit_breaker": coordinator.client.circuit_breaker.as_dict() if coordinator else None,
+        "api_profile_batching": coordinator.client.profile_batching.as_dict() if coordinator else None,
+        "http_pool": http_pool,
+        "refresh_traces": [trace.as_dict() for trace in coordinator.traces] if coordinator else [],
+        "profile_report": runtime.get(PROFILE_REPORT),
+        "refresh_schedule": scheduler.describe(config_entry.entry_id) if scheduler else None,
     }
 
 
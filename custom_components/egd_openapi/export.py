@@ -0,0 +1,260 @@
+"""Streaming export of stored interval data to CSV or Parquet."""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import gzip
+import logging
+import os
+from typing import IO, Any
+
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .api import EGDAPIError
+from .const import (
+    CONF_EAN,
+    DOMAIN,
+    EXPORT_CHUNK_DAYS,
+    EXPORT_FORMAT_PARQUET,
+    EXPORT_MAX_FETCH_DAYS,
+    SLOT_ESTIMATED,
+    SLOT_MISSING,
+)
+from .coordinator import EGDOpenAPICoordinator
+from .storage import SLOT_MS, DayRecord
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional, only needed for Parquet
+    pa = None
+    pq = None
+
+_LOGGER = logging.getLogger(__name__)
+
+COLUMNS = ("profile", "interval_start", "interval_end", "kwh", "status")
+
+# (profile, start_ms, states, values) copied on the event loop before writing.
+DaySnapshot = tuple[str, int, str, list[float | None]]
+
+
+def parquet_available() -> bool:
+    return pq is not None
+
+
+@dataclass(slots=True)
+class ExportResult:
+    """Summary of one export."""
+
+    path: str
+    rows: int = 0
+    days: int = 0
+    archived_days: int = 0
+    fetched_days: int = 0
+    missing_days: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "rows": self.rows,
+            "days": self.days,
+            "archived_days": self.archived_days,
+            "fetched_days": self.fetched_days,
+            "missing_days": self.missing_days,
+            "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+class ExportWriter:
+    """Append day snapshots to one CSV or Parquet file, one chunk at a time.
+
+    All methods block and run in the executor.
+    """
+
+    def __init__(self, path: str, export_format: str, compress: bool) -> None:
+        self.path = path
+        self.export_format = export_format
+        self.compress = compress
+        self._handle: IO[str] | None = None
+        self._csv: Any = None
+        self._parquet: Any = None
+        self._local_tz = dt_util.get_time_zone("Europe/Prague")
+
+    def open(self) -> None:
+        if self.export_format == EXPORT_FORMAT_PARQUET:
+            schema = pa.schema(
+                [
+                    ("profile", pa.string()),
+                    ("interval_start", pa.timestamp("ms", tz="UTC")),
+                    ("interval_end", pa.timestamp("ms", tz="UTC")),
+                    ("kwh", pa.float64()),
+                    ("status", pa.string()),
+                ]
+            )
+            self._parquet = pq.ParquetWriter(
+                self.path, schema, compression="gzip" if self.compress else "snappy"
+            )
+            return
+        if self.compress:
+            self._handle = gzip.open(self.path, "wt", encoding="utf-8", newline="")
+        else:
+            self._handle = open(self.path, "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._handle)
+        self._csv.writerow(COLUMNS)
+
+    def write_chunk(self, snapshots: list[DaySnapshot]) -> int:
+        """Write slots with a row (valid or estimated) and return their count."""
+        profiles: list[str] = []
+        starts: list[int] = []
+        values: list[float | None] = []
+        statuses: list[str] = []
+        for profile_code, start_ms, states, day_values in snapshots:
+            for slot, state in enumerate(states):
+                if state == SLOT_MISSING:
+                    continue
+                profiles.append(profile_code)
+                starts.append(start_ms + slot * SLOT_MS)
+                values.append(day_values[slot])
+                statuses.append("estimated" if state == SLOT_ESTIMATED else "valid")
+
+        if self._parquet is not None:
+            self._parquet.write_table(
+                pa.table(
+                    {
+                        "profile": profiles,
+                        "interval_start": pa.array(starts, pa.timestamp("ms", tz="UTC")),
+                        "interval_end": pa.array([ts + SLOT_MS for ts in starts], pa.timestamp("ms", tz="UTC")),
+                        "kwh": pa.array(values, pa.float64()),
+                        "status": statuses,
+                    },
+                    schema=self._parquet.schema,
+                )
+            )
+        else:
+            self._csv.writerows(
+                (
+                    profile_code,
+                    self._local_iso(start_ms),
+                    self._local_iso(start_ms + SLOT_MS),
+                    "" if value is None else value,
+                    status,
+                )
+                for profile_code, start_ms, value, status in zip(profiles, starts, values, statuses)
+            )
+        return len(starts)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _local_iso(self, timestamp_ms: int) -> str:
+        return datetime.fromtimestamp(timestamp_ms / 1000, tz=self._local_tz).isoformat()
+
+
+async def async_export(
+    coordinator: EGDOpenAPICoordinator,
+    *,
+    profiles: list[str],
+    start: date,
+    end: date,
+    export_format: str,
+    compress: bool,
+    fetch_missing: bool,
+) -> dict[str, Any]:
+    """Export stored slots of `profiles` for days in [start, end] to a file in the config directory.
+
+    Days are written in chunks of EXPORT_CHUNK_DAYS so only one chunk is
+    copied at a time. Days come from the slot store, then from the block
+    archive; neither hits the API. With `fetch_missing` the remaining days
+    are fetched into throwaway records.
+    """
+    if export_format == EXPORT_FORMAT_PARQUET and not parquet_available():
+        raise ServiceValidationError("Parquet export needs the pyarrow package; use CSV instead.")
+    hass = coordinator.hass
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    held = {profile_code: coordinator.store.records.get(profile_code, {}) for profile_code in profiles}
+    archived = {
+        profile_code: set(await hass.async_add_executor_job(coordinator.archive.days, profile_code))
+        for profile_code in profiles
+    }
+    # Days that have not started yet are never fetched.
+    today = dt_util.now().astimezone(dt_util.get_time_zone("Europe/Prague")).date()
+    fetchable = {day for day in days if day <= today} if fetch_missing else set()
+    to_fetch = sum(
+        1
+        for profile_code in profiles
+        for day in fetchable
+        if day not in held[profile_code] and day not in archived[profile_code]
+    )
+    if to_fetch > EXPORT_MAX_FETCH_DAYS:
+        raise ServiceValidationError(
+            f"Export would fetch {to_fetch} profile days, more than {EXPORT_MAX_FETCH_DAYS}; narrow the range."
+        )
+
+    suffix = "parquet" if export_format == EXPORT_FORMAT_PARQUET else "csv.gz" if compress else "csv"
+    path = hass.config.path(
+        f"{DOMAIN}_{coordinator.entry_data[CONF_EAN]}_{start.isoformat()}_{end.isoformat()}.{suffix}"
+    )
+    result = ExportResult(path=path)
+    writer = ExportWriter(path, export_format, compress)
+    await hass.async_add_executor_job(writer.open)
+    try:
+        for offset in range(0, len(days), EXPORT_CHUNK_DAYS):
+            chunk_days = days[offset : offset + EXPORT_CHUNK_DAYS]
+            known: dict[str, dict[date, DayRecord]] = {}
+            for profile_code in profiles:
+                # Only the chunk's archived days are decoded from the memory-mapped archive.
+                wanted = [
+                    day for day in chunk_days if day not in held[profile_code] and day in archived[profile_code]
+                ]
+                known[profile_code] = await hass.async_add_executor_job(
+                    coordinator.archive.read, profile_code, wanted
+                )
+                result.archived_days += len(known[profile_code])
+                known[profile_code].update(
+                    (day, held[profile_code][day]) for day in chunk_days if day in held[profile_code]
+                )
+            snapshots: list[DaySnapshot] = []
+            for day in chunk_days:
+                for profile_code in profiles:
+                    record = await _async_day_record(
+                        coordinator, profile_code, day, known[profile_code], day in fetchable, result
+                    )
+                    if record is None:
+                        result.missing_days.append(f"{profile_code}:{day.isoformat()}")
+                        continue
+                    snapshots.append((profile_code, record.start_ms, record.states, list(record.values)))
+                    result.days += 1
+            result.rows += await hass.async_add_executor_job(writer.write_chunk, snapshots)
+    finally:
+        await hass.async_add_executor_job(writer.close)
+
+    _LOGGER.info("Exported %s rows of %s profile days to %s", result.rows, result.days, path)
+    return await hass.async_add_executor_job(result.as_dict)
+
+
+async def _async_day_record(
+    coordinator: EGDOpenAPICoordinator,
+    profile_code: str,
+    day: date,
+    known: dict[date, DayRecord],
+    fetch: bool,
+    result: ExportResult,
+) -> DayRecord | None:
+    record = known.get(day)
+    if record is not None or not fetch:
+        return record
+    try:
+        record = await coordinator.async_fetch_detached_record(profile_code, day)
+    except EGDAPIError as err:
+        _LOGGER.warning("Export could not fetch %s on %s: %s", profile_code, day.isoformat(), err)
+        return None
+    result.fetched_days += 1
+    return record
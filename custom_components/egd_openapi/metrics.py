@@ -0,0 +1,164 @@
+"""Request metrics for the EG.D OpenAPI client."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+import statistics
+from typing import Any
+
+from .const import METRICS_LATENCY_BUCKETS, METRICS_MAX_REFRESHES, METRICS_MAX_SAMPLES
+
+# Error of a call cancelled by the client (a losing hedge, an unload); not an API failure.
+ERROR_CANCELLED = "cancelled"
+
+
+@dataclass(slots=True)
+class RequestMetric:
+    """One HTTP call made by the client."""
+
+    endpoint: str
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=UTC))
+    status: int | None = None
+    latency: float = 0.0
+    bytes: int = 0
+    retries: int = 0
+    page: int = 1
+    parse_seconds: float = 0.0
+    error: str | None = None
+    hedge: bool = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self.error == ERROR_CANCELLED
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None and not self.cancelled
+
+
+@dataclass(slots=True)
+class EndpointHistogram:
+    """Cumulative latency histogram and counters of one endpoint."""
+
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(METRICS_LATENCY_BUCKETS) + 1))
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes: int = 0
+    max_page: int = 0
+    hedges: int = 0
+
+
+class RequestMetrics:
+    """Bounded in-memory store of request samples and per-endpoint histograms."""
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES) -> None:
+        self.samples: deque[RequestMetric] = deque(maxlen=max_samples)
+        self.histograms: dict[str, EndpointHistogram] = {}
+        self.requests_per_refresh: deque[int] = deque(maxlen=METRICS_MAX_REFRESHES)
+        self._refresh_started: int | None = None
+        self._total_requests = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedge_gains: deque[float] = deque(maxlen=max_samples)
+
+    def record(self, metric: RequestMetric) -> None:
+        self.samples.append(metric)
+        self._total_requests += 1
+        histogram = self.histograms.setdefault(metric.endpoint, EndpointHistogram())
+        histogram.buckets[bisect_left(METRICS_LATENCY_BUCKETS, metric.latency)] += 1
+        histogram.requests += 1
+        histogram.retries += metric.retries
+        histogram.bytes += metric.bytes
+        histogram.max_page = max(histogram.max_page, metric.page)
+        if metric.hedge:
+            histogram.hedges += 1
+        if metric.failed:
+            histogram.errors += 1
+
+    def begin_refresh(self) -> None:
+        self._refresh_started = self._total_requests
+
+    def end_refresh(self) -> None:
+        if self._refresh_started is not None:
+            self.requests_per_refresh.append(self._total_requests - self._refresh_started)
+            self._refresh_started = None
+
+    def latency_percentile(
+        self,
+        percentile: float,
+        endpoint: str | None = None,
+        successful_only: bool = False,
+    ) -> float | None:
+        """Return latency percentile in seconds over retained samples."""
+        latencies = sorted(
+            sample.latency
+            for sample in self.samples
+            if (endpoint is None or sample.endpoint == endpoint)
+            and not (successful_only and sample.error is not None)
+        )
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def hedge_allowed(self, budget: float) -> bool:
+        """Return True while hedges stay within `budget` of all requests sent."""
+        return self.hedges_sent + 1 <= budget * self._total_requests
+
+    def record_hedge_sent(self) -> None:
+        self.hedges_sent += 1
+
+    def record_hedge_won(self, gained: float | None) -> None:
+        """Count a hedge that answered first; `gained` is None when the primary failed."""
+        self.hedges_won += 1
+        if gained is not None:
+            self.hedge_gains.append(gained)
+
+    def error_rate(self) -> float | None:
+        """Return share of failed requests among retained samples that were not cancelled."""
+        answered = [sample for sample in self.samples if not sample.cancelled]
+        if not answered:
+            return None
+        return sum(1 for sample in answered if sample.failed) / len(answered)
+
+    def last_requests_per_refresh(self) -> int | None:
+        return self.requests_per_refresh[-1] if self.requests_per_refresh else None
+
+    def summary(self) -> dict[str, Any]:
+        """Return diagnostics summary."""
+        return {
+            "samples": len(self.samples),
+            "latency_p50_ms": _ms(self.latency_percentile(50)),
+            "latency_p95_ms": _ms(self.latency_percentile(95)),
+            "error_rate": self.error_rate(),
+            "requests_per_refresh": list(self.requests_per_refresh),
+            "latency_buckets_s": list(METRICS_LATENCY_BUCKETS),
+            "hedging": {
+                "sent": self.hedges_sent,
+                "won": self.hedges_won,
+                "rate": self.hedges_sent / self._total_requests if self._total_requests else None,
+                "gained_p50_ms": _ms(statistics.median(self.hedge_gains)) if self.hedge_gains else None,
+                "gained_max_ms": _ms(max(self.hedge_gains)) if self.hedge_gains else None,
+                "gained_total_s": round(sum(self.hedge_gains), 3),
+            },
+            "endpoints": {
+                endpoint: {
+                    **asdict(histogram),
+                    "latency_p50_ms": _ms(self.latency_percentile(50, endpoint)),
+                    "latency_p95_ms": _ms(self.latency_percentile(95, endpoint)),
+                }
+                for endpoint, histogram in self.histograms.items()
+            },
+            "recent": [
+                {**asdict(sample), "started_at": sample.started_at.isoformat()}
+                for sample in list(self.samples)[-20:]
+            ],
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
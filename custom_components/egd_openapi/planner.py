@@ -0,0 +1,50 @@
+"""Refetch planning over stored day records."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from .const import CORRECTION_CHECK_HOURS, PLANNER_MAX_RANGES, SLOT_VALID
+from .storage import DayRecord
+
+
+def correction_check_due(record: DayRecord, now: datetime) -> bool:
+    """Return True when a complete day should be verified for corrections."""
+    if record.checked_at is None:
+        return True
+    return now - record.checked_at >= timedelta(hours=CORRECTION_CHECK_HOURS)
+
+
+def plan_refetch(
+    record: DayRecord,
+    now: datetime,
+    *,
+    max_ranges: int = PLANNER_MAX_RANGES,
+) -> list[tuple[int, int]]:
+    """Return slot ranges `[start, end)` that need to be requested.
+
+    Complete days are skipped until a correction check is due. Otherwise
+    every run of missing or non-final slots is covered; when there are more
+    runs than `max_ranges`, the runs separated by the smallest gaps are
+    joined so the request count stays bounded while the covered time stays
+    as small as possible.
+    """
+    if record.is_complete:
+        return [(0, record.slot_count)] if correction_check_due(record, now) else []
+
+    ranges: list[list[int]] = []
+    for slot, state in enumerate(record.states):
+        if state == SLOT_VALID:
+            continue
+        if ranges and ranges[-1][1] == slot:
+            ranges[-1][1] = slot + 1
+        else:
+            ranges.append([slot, slot + 1])
+
+    while len(ranges) > max(1, max_ranges):
+        gaps = [ranges[i + 1][0] - ranges[i][1] for i in range(len(ranges) - 1)]
+        join_at = gaps.index(min(gaps))
+        ranges[join_at][1] = ranges[join_at + 1][1]
+        del ranges[join_at + 1]
+
+    return [(start, end) for start, end in ranges]
@@ -0,0 +1,106 @@
+"""On-demand profiling of one coordinator refresh."""
+
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass
+from datetime import UTC, datetime
+import sys
+import time
+from typing import Any
+
+from .coordinator import EGDOpenAPICoordinator
+
+
+async def async_profile_refresh(coordinator: EGDOpenAPICoordinator, top: int) -> dict[str, Any]:
+    """Run one refresh under cProfile and tracemalloc and return a report.
+
+    The profiler sees everything the event loop runs while the refresh is in
+    flight, including other integrations. Payload decoding, parsing and
+    aggregation, which large refreshes normally hand to the executor, run
+    inline for the profiled refresh so they show up; archive and store file
+    I/O stays in the executor and is not profiled. Snapshots are taken and
+    compared in the executor. Profiling modules are imported here so nothing
+    is paid until requested.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    hass = coordinator.hass
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(10)
+    before = await hass.async_add_executor_job(tracemalloc.take_snapshot)
+
+    profiler = cProfile.Profile()
+    offload_bytes = coordinator.client.offload_bytes
+    coordinator.inline_stages = True
+    coordinator.client.offload_bytes = sys.maxsize
+    started_at = datetime.now(tz=UTC)
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        await coordinator.async_refresh()
+    finally:
+        profiler.disable()
+        duration = time.perf_counter() - started
+        coordinator.inline_stages = False
+        coordinator.client.offload_bytes = offload_bytes
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        try:
+            after = await hass.async_add_executor_job(tracemalloc.take_snapshot)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+    stats = pstats.Stats(profiler)
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    allocations = (await hass.async_add_executor_job(after.compare_to, before, "lineno"))[:top]
+
+    return {
+        "started_at": started_at.isoformat(),
+        "refresh_seconds": round(duration, 6),
+        "last_update_success": coordinator.last_update_success,
+        "top_functions_by_cumulative_time": [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": primitive_calls if primitive_calls == total_calls else f"{total_calls}/{primitive_calls}",
+                "total_s": round(total_time, 6),
+                "cumulative_s": round(cumulative_time, 6),
+            }
+            for (filename, line, name), (primitive_calls, total_calls, total_time, cumulative_time, _) in functions
+        ],
+        "top_allocation_sites": [
+            {
+                "site": str(stat.traceback[0]) if stat.traceback else "?",
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size_bytes": stat.size,
+            }
+            for stat in allocations
+        ],
+        "traced_memory_bytes": {"current": traced_current, "peak": traced_peak},
+        "structure_sizes_bytes": {
+            "series_history": deep_sizeof(coordinator.series_history),
+            "series_points": sum(len(points) for points in coordinator.series_history.values()),
+            "last_payload": deep_sizeof(coordinator.data),
+            "day_store": deep_sizeof(coordinator.store.records),
+        },
+    }
+
+
+def deep_sizeof(obj: Any, _seen: set[int] | None = None) -> int:
+    """Approximate retained size of containers, dataclasses and scalars."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        size += sum(deep_sizeof(getattr(obj, item.name), seen) for item in fields(obj))
+    return size
@@ -0,0 +1,174 @@
+"""Domain-wide hourly refresh scheduler for EG.D OpenAPI."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Any, TypeVar
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SCHEDULER_MAX_CONCURRENT, SCHEDULER_WINDOW_SECONDS
+from .coordinator import EGDOpenAPICoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def plan_offsets(
+    preferred_minutes: dict[str, int],
+    window_seconds: int = SCHEDULER_WINDOW_SECONDS,
+) -> dict[str, float]:
+    """Return refresh offset within the hour (seconds) for every entry.
+
+    Entries keep the order of their preferred fetch minutes but are spread
+    evenly over the window, starting at the earliest preferred minute. A
+    single entry therefore runs exactly at its own minute.
+    """
+    ordered = sorted(preferred_minutes, key=lambda entry_id: (preferred_minutes[entry_id], entry_id))
+    if not ordered:
+        return {}
+    anchor = preferred_minutes[ordered[0]] * 60
+    spacing = window_seconds / len(ordered)
+    return {entry_id: (anchor + index * spacing) % 3600 for index, entry_id in enumerate(ordered)}
+
+
+def next_run(offset: float, after: datetime) -> datetime:
+    """Return first run at `offset` seconds past an hour strictly after `after`.
+
+    Runs are derived from hour boundaries rather than from the previous run,
+    so late timers never accumulate drift.
+    """
+    run = after.replace(minute=0, second=0, microsecond=0) + timedelta(seconds=offset)
+    while run <= after:
+        run += timedelta(hours=1)
+    return run
+
+
+@dataclass(slots=True)
+class ScheduledRefresh:
+    """Hourly refresh job of one config entry."""
+
+    entry: ConfigEntry
+    coordinator: EGDOpenAPICoordinator
+    minute: int
+    offset: float = 0.0
+    due: datetime | None = None
+    running: bool = False
+
+
+class EGDRefreshScheduler:
+    """Own the hourly refresh of all entries with one timer and a concurrency cap."""
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = SCHEDULER_MAX_CONCURRENT) -> None:
+        self._hass = hass
+        self._jobs: dict[str, ScheduledRefresh] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._max_concurrent = max_concurrent
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, entry: ConfigEntry, coordinator: EGDOpenAPICoordinator, minute: int) -> None:
+        """Add or replace the job of an entry and replan the hour."""
+        self._jobs[entry.entry_id] = ScheduledRefresh(entry=entry, coordinator=coordinator, minute=minute)
+        self._async_replan()
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        if self._jobs.pop(entry_id, None) is not None:
+            self._async_replan()
+
+    def describe(self, entry_id: str) -> dict[str, Any] | None:
+        """Return schedule of one entry for diagnostics."""
+        job = self._jobs.get(entry_id)
+        if job is None:
+            return None
+        return {
+            "preferred_minute": job.minute,
+            "offset_seconds": round(job.offset, 1),
+            "next_run": job.due.isoformat() if job.due else None,
+            "running": job.running,
+            "scheduled_entries": len(self._jobs),
+            "max_concurrent": self._max_concurrent,
+        }
+
+    @callback
+    def _async_replan(self) -> None:
+        now = dt_util.utcnow()
+        offsets = plan_offsets({entry_id: job.minute for entry_id, job in self._jobs.items()})
+        for entry_id, job in self._jobs.items():
+            job.offset = offsets[entry_id]
+            job.due = next_run(job.offset, now)
+            _LOGGER.debug(
+                "Scheduling EG.D hourly refresh of %s at %s past the hour, next %s",
+                entry_id,
+                timedelta(seconds=round(job.offset)),
+                job.due.isoformat(),
+            )
+        self._async_arm()
+
+    @callback
+    def _async_arm(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        due = [job.due for job in self._jobs.values() if job.due is not None]
+        if due:
+            self._unsub_timer = async_track_point_in_utc_time(self._hass, self._async_fire, min(due))
+
+    @callback
+    def _async_fire(self, point_in_time: datetime) -> None:
+        self._unsub_timer = None
+        now = max(point_in_time, dt_util.utcnow())
+        for entry_id, job in self._jobs.items():
+            if job.due is None or job.due > now:
+                continue
+            # Hours missed while the loop was blocked or suspended are not replayed.
+            job.due = next_run(job.offset, max(job.due, now))
+            if job.running:
+                _LOGGER.debug("Skipping EG.D refresh of %s, previous one still running", entry_id)
+                continue
+            job.running = True
+            job.entry.async_create_background_task(
+                self._hass,
+                self._async_run(job),
+                f"{DOMAIN} scheduled refresh {entry_id}",
+            )
+        self._async_arm()
+
+    async def _async_run(self, job: ScheduledRefresh) -> None:
+        try:
+            async with self._semaphore:
+                _LOGGER.debug("Scheduled EG.D hourly refresh of %s triggered", job.entry.entry_id)
+                await job.coordinator.async_refresh()
+        finally:
+            job.running = False
+
+    async def async_run_now(self, entry_id: str, refresh: Callable[[], Awaitable[_T]]) -> _T:
+        """Run an out-of-schedule refresh of an entry under the same concurrency cap.
+
+        The entry's hourly refresh is skipped while this one runs.
+        """
+        job = self._jobs.get(entry_id)
+        claimed = job is not None and not job.running
+        if claimed:
+            job.running = True
+        try:
+            async with self._semaphore:
+                return await refresh()
+        finally:
+            if claimed:
+                job.running = False
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop all jobs and cancel the timer."""
+        self._jobs.clear()
+        self._async_arm()
@@ -11,12 +11,13 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfEnergy, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import CONF_EAN, CONF_SELECTED_PROFILES, DOMAIN
+from .const import CONF_EAN, COST, DERIVED_NET, DOMAIN, SIGNAL_PROFILES_UPDATED
 from .coordinator import EGDOpenAPICoordinator
 
 
@@ -28,15 +29,46 @@ async def async_setup_entry(
     runtime = hass.data[DOMAIN][entry.entry_id]
     coordinator: EGDOpenAPICoordinator = runtime["coordinator"]
 
-    selected_profiles = entry.options.get(CONF_SELECTED_PROFILES, entry.data.get(CONF_SELECTED_PROFILES, []))
     ean = entry.data[CONF_EAN]
-
+    added: set[str] = set()
+
+    @callback
+    def _async_add_new_entities() -> None:
+        """Add entities for profiles or modes enabled since the last call."""
+        entities = build_entities(coordinator, ean)
+        added.intersection_update(entity.unique_id for entity in entities)
+        new_entities = [entity for entity in entities if entity.unique_id not in added]
+        added.update(entity.unique_id for entity in new_entities)
+        async_add_entities(new_entities)
+
+    _async_add_new_entities()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_PROFILES_UPDATED.format(entry.entry_id),
+            _async_add_new_entities,
+        )
+    )
+
+
+def build_entities(coordinator: EGDOpenAPICoordinator, ean: str) -> list[SensorEntity]:
+    """Return all entities the entry should currently have."""
     entities: list[SensorEntity] = [EGDLastUpdateSensor(coordinator, ean)]
-    for profile in selected_profiles:
+    for profile in coordinator.selected_profiles():
         entities.append(EGDDailyEnergySensor(coordinator, ean, profile))
         entities.append(EGDSeriesSensor(coordinator, ean, profile))
-
-    async_add_entities(entities)
+        if coordinator.intraday_enabled():
+            entities.append(EGDTodayEnergySensor(coordinator, ean, profile))
+    if coordinator.derived_profiles() is not None:
+        entities.append(EGDNetEnergySensor(coordinator, ean, "import"))
+        entities.append(EGDNetEnergySensor(coordinator, ean, "export"))
+        entities.append(EGDNetSeriesSensor(coordinator, ean))
+    if coordinator.tariff_config() is not None:
+        entities.append(EGDCostSensor(coordinator, ean, "daily"))
+        entities.append(EGDCostSensor(coordinator, ean, "monthly"))
+    if coordinator.diagnostic_sensors_enabled():
+        entities.extend(EGDApiMetricSensor(coordinator, ean, key) for key in API_METRIC_SENSORS)
+    return entities
 
 
 class EGDBaseSensor(CoordinatorEntity[EGDOpenAPICoordinator], SensorEntity):
@@ -50,6 +82,16 @@ class EGDBaseSensor(CoordinatorEntity[EGDOpenAPICoordinator], SensorEntity):
         self._profile_code = profile_code
         self._kind = kind
         self._attr_unique_id = f"{ean}_{profile_code}_{kind}"
+        self._written: tuple[int, bool] | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this profile's data or availability changed."""
+        written = (self.coordinator.profile_revision(self._profile_code), self.available)
+        if written == self._written:
+            return
+        self._written = written
+        super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> dict[str, Any]:
@@ -103,6 +145,46 @@ class EGDDailyEnergySensor(EGDBaseSensor):
             "valid_points": data.valid_points,
             "invalid_points": data.invalid_points,
             "points_without_timestamp": data.points_without_timestamp,
+            "missing_points": data.missing_points,
+            "fresh": self.coordinator.profile_fresh(self._profile_code),
+            "stale": self.coordinator.is_stale(),
+        }
+
+
+class EGDTodayEnergySensor(EGDBaseSensor):
+    """Today's energy so far from intraday C1 data."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+
+    def __init__(self, coordinator: EGDOpenAPICoordinator, ean: str, profile_code: str) -> None:
+        super().__init__(coordinator, ean, profile_code, "today_energy")
+        self._attr_name = f"{self._profile_label()} - Energy today"
+        self._attr_suggested_object_id = f"{self._profile_code.lower()}_today_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        data = self.coordinator.get_today_data(self._profile_code)
+        if not data:
+            return None
+        return round(data.total_kwh, 6)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        data = self.coordinator.get_today_data(self._profile_code)
+        if not data:
+            return {"ean": self._ean, "profile_code": self._profile_code}
+
+        return {
+            "ean": self._ean,
+            "profile_code": self._profile_code,
+            "profile_name": self.coordinator.profile_name(self._profile_code),
+            "valid_points": data.valid_points,
+            "invalid_points": data.invalid_points,
+            "missing_points": data.missing_points,
+            "fresh": self.coordinator.profile_fresh(self._profile_code),
+            "stale": self.coordinator.is_stale(),
         }
 
 
@@ -137,6 +219,112 @@ class EGDSeriesSensor(EGDBaseSensor):
         return attrs
 
 
+class EGDNetEnergySensor(EGDBaseSensor):
+    """Yesterday's net import or export from the slot-aligned import and export profiles."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+
+    def __init__(self, coordinator: EGDOpenAPICoordinator, ean: str, direction: str) -> None:
+        super().__init__(coordinator, ean, DERIVED_NET, f"{direction}_energy")
+        self._direction = direction
+        self._attr_name = f"Net {direction} (yesterday)"
+        self._attr_suggested_object_id = f"net_{direction}_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        derived = self.coordinator.get_derived_day()
+        if not derived:
+            return None
+        return derived.net_import_kwh if self._direction == "import" else derived.net_export_kwh
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        profiles = self.coordinator.derived_profiles() or (None, None)
+        attrs: dict[str, Any] = {
+            "ean": self._ean,
+            "import_profile": profiles[0],
+            "export_profile": profiles[1],
+        }
+        derived = self.coordinator.get_derived_day()
+        if derived:
+            attrs.update(derived.as_dict())
+            attrs["stale"] = self.coordinator.is_stale()
+        return attrs
+
+
+class EGDNetSeriesSensor(EGDBaseSensor):
+    """Net import minus export per 15-minute slot in attributes."""
+
+    def __init__(self, coordinator: EGDOpenAPICoordinator, ean: str) -> None:
+        super().__init__(coordinator, ean, DERIVED_NET, "series")
+        self._attr_name = "Net 15-minute series"
+        self._attr_suggested_object_id = "net_series"
+
+    @property
+    def native_value(self) -> str | None:
+        derived = self.coordinator.get_derived_day()
+        if not derived:
+            return None
+        return derived.day.isoformat()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        profiles = self.coordinator.derived_profiles() or (None, None)
+        attrs: dict[str, Any] = {
+            "ean": self._ean,
+            "import_profile": profiles[0],
+            "export_profile": profiles[1],
+        }
+
+        if self.coordinator.include_series_attribute():
+            attrs["series"] = self.coordinator.derived_series
+            attrs["unit"] = UnitOfEnergy.KILO_WATT_HOUR
+            attrs["interval_minutes"] = 15
+
+        return attrs
+
+
+class EGDCostSensor(EGDBaseSensor):
+    """Cost of yesterday or of the month so far under the configured tariff."""
+
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: EGDOpenAPICoordinator, ean: str, period: str) -> None:
+        super().__init__(coordinator, ean, COST, period)
+        self._period = period
+        self._attr_name = "Cost (yesterday)" if period == "daily" else "Cost (this month)"
+        self._attr_suggested_object_id = f"{period}_cost"
+        self._attr_native_unit_of_measurement = coordinator.hass.config.currency
+
+    @property
+    def native_value(self) -> float | None:
+        day_cost = self.coordinator.get_cost_day()
+        if self._period == "daily":
+            return round(day_cost.cost, 2) if day_cost else None
+        if self.coordinator.cost_day is None:
+            return None
+        return round(self.coordinator.get_cost_month()["cost"], 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        config = self.coordinator.tariff_config()
+        attrs: dict[str, Any] = {
+            "ean": self._ean,
+            "profile_code": config.profile if config else None,
+            "price_entity": config.price_entity if config else None,
+        }
+        if self._period == "daily":
+            day_cost = self.coordinator.get_cost_day()
+            if day_cost:
+                attrs.update(day_cost.as_dict())
+        elif self.coordinator.cost_day is not None:
+            attrs.update(self.coordinator.get_cost_month())
+        attrs["stale"] = self.coordinator.is_stale()
+        return attrs
+
+
 class EGDLastUpdateSensor(CoordinatorEntity[EGDOpenAPICoordinator], SensorEntity):
     """Last successful update timestamp sensor."""
 
@@ -164,3 +352,64 @@ class EGDLastUpdateSensor(CoordinatorEntity[EGDOpenAPICoordinator], SensorEntity
         if not self.coordinator.data:
             return None
         return self.coordinator.data.last_success_utc
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        if not self.coordinator.data:
+            return {}
+        return {
+            "profiles_last_success": {
+                code: value.isoformat()
+                for code, value in self.coordinator.data.last_success_by_profile.items()
+            },
+            "failed_profiles": sorted(self.coordinator.data.failed_profiles),
+            "stale": self.coordinator.data.stale,
+            "api_circuit": self.coordinator.client.circuit_breaker.state,
+        }
+
+
+API_METRIC_SENSORS: dict[str, tuple[str, str | None]] = {
+    "api_latency_p50": ("API latency p50", UnitOfTime.MILLISECONDS),
+    "api_latency_p95": ("API latency p95", UnitOfTime.MILLISECONDS),
+    "api_requests_per_refresh": ("API requests per refresh", None),
+    "api_error_rate": ("API error rate", PERCENTAGE),
+}
+
+
+class EGDApiMetricSensor(CoordinatorEntity[EGDOpenAPICoordinator], SensorEntity):
+    """Diagnostic sensor summarizing client request metrics."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: EGDOpenAPICoordinator, ean: str, key: str) -> None:
+        super().__init__(coordinator)
+        self._ean = ean
+        self._key = key
+        self._attr_name, self._attr_native_unit_of_measurement = API_METRIC_SENSORS[key]
+        self._attr_suggested_object_id = key
+        self._attr_unique_id = f"{ean}_{key}"
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        return {
+            "identifiers": {(DOMAIN, self._ean)},
+            "name": f"EG.D {self._ean}",
+            "manufacturer": "EG.D / Distribuce24",
+            "model": "OpenAPI",
+        }
+
+    @property
+    def native_value(self) -> float | int | None:
+        metrics = self.coordinator.client.metrics
+        if self._key == "api_latency_p50":
+            value = metrics.latency_percentile(50)
+            return None if value is None else round(value * 1000, 1)
+        if self._key == "api_latency_p95":
+            value = metrics.latency_percentile(95)
+            return None if value is None else round(value * 1000, 1)
+        if self._key == "api_requests_per_refresh":
+            return metrics.last_requests_per_refresh()
+        rate = metrics.error_rate()
+        return None if rate is None else round(rate * 100, 1)
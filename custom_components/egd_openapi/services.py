@@ -0,0 +1,176 @@
+"""Services for EG.D OpenAPI."""
+
+from __future__ import annotations
+
+from functools import partial
+import json
+import logging
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_END,
+    ATTR_FETCH_MISSING,
+    ATTR_FORMAT,
+    ATTR_GZIP,
+    ATTR_INCLUDE_SERIES,
+    ATTR_PROFILES,
+    ATTR_START,
+    ATTR_TOP,
+    ATTR_WRITE_FILE,
+    DATA_SCHEDULER,
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    PROFILE_REPORT,
+    SERVICE_DERIVED_RANGE,
+    SERVICE_EXPORT,
+    SERVICE_PROFILE_REFRESH,
+)
+from .coordinator import EGDOpenAPICoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TOP, default=30): vol.All(vol.Coerce(int), vol.Range(min=1, max=200)),
+        vol.Optional(ATTR_WRITE_FILE, default=True): cv.boolean,
+    }
+)
+
+DERIVED_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.date,
+        vol.Required(ATTR_END): cv.date,
+        vol.Optional(ATTR_INCLUDE_SERIES, default=False): cv.boolean,
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PROFILES): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_START): cv.date,
+        vol.Required(ATTR_END): cv.date,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In([EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET]),
+        vol.Optional(ATTR_GZIP, default=False): cv.boolean,
+        vol.Optional(ATTR_FETCH_MISSING, default=False): cv.boolean,
+    }
+)
+
+
+def _runtime(hass: HomeAssistant, entry_id: str) -> dict:
+    runtime = hass.data.get(DOMAIN, {}).get(entry_id)
+    if runtime is None:
+        raise ServiceValidationError(f"EG.D config entry {entry_id} is not loaded.")
+    return runtime
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration services."""
+
+    async def _async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+        from .profiling import async_profile_refresh
+
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        runtime = _runtime(hass, entry_id)
+        coordinator: EGDOpenAPICoordinator = runtime["coordinator"]
+
+        # Profiled refreshes wait for a free slot like scheduled ones.
+        report = await hass.data[DATA_SCHEDULER].async_run_now(
+            entry_id, partial(async_profile_refresh, coordinator, call.data[ATTR_TOP])
+        )
+        runtime[PROFILE_REPORT] = report
+
+        if call.data[ATTR_WRITE_FILE]:
+            stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%SZ")
+            path = hass.config.path(f"{DOMAIN}_profile_{entry_id}_{stamp}.json")
+
+            def _write() -> None:
+                with open(path, "w", encoding="utf-8") as handle:
+                    json.dump(report, handle, indent=2, default=str)
+
+            await hass.async_add_executor_job(_write)
+            report["file"] = path
+            _LOGGER.info("EG.D refresh profile written to %s", path)
+
+        return report if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_derived_range(call: ServiceCall) -> ServiceResponse:
+        coordinator: EGDOpenAPICoordinator = _runtime(hass, call.data[ATTR_CONFIG_ENTRY_ID])["coordinator"]
+        profiles = coordinator.derived_profiles()
+        if profiles is None:
+            raise ServiceValidationError("Derived data needs both an import and an export profile selected.")
+        start, end = call.data[ATTR_START], call.data[ATTR_END]
+        if end < start:
+            raise ServiceValidationError("End date is before start date.")
+
+        return {
+            "import_profile": profiles[0],
+            "export_profile": profiles[1],
+            "days": [
+                derived.as_dict(include_series=call.data[ATTR_INCLUDE_SERIES])
+                for derived in coordinator.derived.range(start, end)
+            ],
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DERIVED_RANGE,
+        _async_derived_range,
+        schema=DERIVED_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_export(call: ServiceCall) -> ServiceResponse:
+        from .export import async_export
+
+        coordinator: EGDOpenAPICoordinator = _runtime(hass, call.data[ATTR_CONFIG_ENTRY_ID])["coordinator"]
+        profiles = call.data.get(ATTR_PROFILES) or coordinator.selected_profiles()
+        if unknown := [code for code in profiles if code not in coordinator.selected_profiles()]:
+            raise ServiceValidationError(f"Profiles not selected in this entry: {', '.join(unknown)}.")
+        start, end = call.data[ATTR_START], call.data[ATTR_END]
+        if end < start:
+            raise ServiceValidationError("End date is before start date.")
+
+        result = await async_export(
+            coordinator,
+            profiles=profiles,
+            start=start,
+            end=end,
+            export_format=call.data[ATTR_FORMAT],
+            compress=call.data[ATTR_GZIP],
+            fetch_missing=call.data[ATTR_FETCH_MISSING],
+        )
+        return result if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        _async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
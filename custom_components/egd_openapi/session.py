@@ -0,0 +1,159 @@
+"""Dedicated HTTP connection pool for the Distribuce24 hosts."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionReuseconnParams,
+    TraceDnsCacheHitParams,
+    TraceDnsCacheMissParams,
+)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import get_default_context
+
+from .const import (
+    DATA_SESSIONS,
+    SESSION_CONNECT_TIMEOUT_SECONDS,
+    SESSION_DNS_TTL_SECONDS,
+    SESSION_KEEPALIVE_SECONDS,
+    SESSION_LIMIT,
+    SESSION_LIMIT_PER_HOST,
+    SESSION_READ_TIMEOUT_SECONDS,
+    SESSION_TIMEOUT_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Connection and DNS cache counters collected from aiohttp tracing."""
+
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+
+@dataclass(slots=True)
+class SharedSession:
+    """Session of one environment and the entries using it."""
+
+    session: ClientSession
+    connector: TCPConnector
+    stats: PoolStats
+    unsub_close: CALLBACK_TYPE
+    users: set[str] = field(default_factory=set)
+
+    def as_dict(self) -> dict[str, Any]:
+        stats = self.stats
+        opened = stats.connections_created + stats.connections_reused
+        return {
+            "entries": len(self.users),
+            "limit": self.connector.limit,
+            "limit_per_host": self.connector.limit_per_host,
+            "keepalive_seconds": SESSION_KEEPALIVE_SECONDS,
+            "dns_ttl_seconds": SESSION_DNS_TTL_SECONDS,
+            "timeout_seconds": SESSION_TIMEOUT_SECONDS,
+            "connect_timeout_seconds": SESSION_CONNECT_TIMEOUT_SECONDS,
+            "read_timeout_seconds": SESSION_READ_TIMEOUT_SECONDS,
+            "connections_created": stats.connections_created,
+            "connections_reused": stats.connections_reused,
+            "reuse_ratio": round(stats.connections_reused / opened, 3) if opened else None,
+            "dns_cache_hits": stats.dns_cache_hits,
+            "dns_cache_misses": stats.dns_cache_misses,
+        }
+
+
+def _trace_config(stats: PoolStats) -> TraceConfig:
+    trace_config = TraceConfig()
+
+    async def _created(_: ClientSession, __: SimpleNamespace, ___: TraceConnectionCreateEndParams) -> None:
+        stats.connections_created += 1
+
+    async def _reused(_: ClientSession, __: SimpleNamespace, ___: TraceConnectionReuseconnParams) -> None:
+        stats.connections_reused += 1
+
+    async def _dns_hit(_: ClientSession, __: SimpleNamespace, ___: TraceDnsCacheHitParams) -> None:
+        stats.dns_cache_hits += 1
+
+    async def _dns_miss(_: ClientSession, __: SimpleNamespace, ___: TraceDnsCacheMissParams) -> None:
+        stats.dns_cache_misses += 1
+
+    trace_config.on_connection_create_end.append(_created)
+    trace_config.on_connection_reuseconn.append(_reused)
+    trace_config.on_dns_cache_hit.append(_dns_hit)
+    trace_config.on_dns_cache_miss.append(_dns_miss)
+    return trace_config
+
+
+def async_acquire_session(hass: HomeAssistant, environment: str, entry_id: str) -> ClientSession:
+    """Return the dedicated session of an environment, creating it for the first entry.
+
+    The session owns its connector, tuned for the IDM and data hosts, with
+    Home Assistant's SSL context and user agent. Both are closed after the
+    last entry releases the session or when Home Assistant closes.
+    """
+    sessions: dict[str, SharedSession] = hass.data.setdefault(DATA_SESSIONS, {})
+    shared = sessions.get(environment)
+    if shared is None or shared.session.closed:
+        stats = PoolStats()
+        connector = TCPConnector(
+            limit=SESSION_LIMIT,
+            limit_per_host=SESSION_LIMIT_PER_HOST,
+            keepalive_timeout=SESSION_KEEPALIVE_SECONDS,
+            ttl_dns_cache=SESSION_DNS_TTL_SECONDS,
+            ssl=get_default_context(),
+        )
+        session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(
+                total=SESSION_TIMEOUT_SECONDS,
+                connect=SESSION_CONNECT_TIMEOUT_SECONDS,
+                sock_read=SESSION_READ_TIMEOUT_SECONDS,
+            ),
+            headers={"User-Agent": SERVER_SOFTWARE},
+            trace_configs=[_trace_config(stats)],
+        )
+
+        async def _async_close(_: Event) -> None:
+            await session.close()
+
+        unsub_close = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+        shared = SharedSession(session=session, connector=connector, stats=stats, unsub_close=unsub_close)
+        sessions[environment] = shared
+        _LOGGER.debug("Created dedicated Distribuce24 session for %s", environment)
+    shared.users.add(entry_id)
+    return shared.session
+
+
+async def async_release_session(hass: HomeAssistant, environment: str, entry_id: str) -> None:
+    """Drop an entry from the environment's session and close it after the last one."""
+    sessions: dict[str, SharedSession] = hass.data.get(DATA_SESSIONS, {})
+    shared = sessions.get(environment)
+    if shared is None:
+        return
+    shared.users.discard(entry_id)
+    if not shared.users:
+        sessions.pop(environment)
+        shared.unsub_close()
+        # The session owns its connector, so closing it closes the pool too.
+        await shared.session.close()
+        _LOGGER.debug("Closed dedicated Distribuce24 session for %s", environment)
+
+
+def session_stats(hass: HomeAssistant, environment: str) -> dict[str, Any] | None:
+    shared = hass.data.get(DATA_SESSIONS, {}).get(environment)
+    return shared.as_dict() if shared else None
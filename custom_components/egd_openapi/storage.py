@@ -0,0 +1,293 @@
+"""Persistent per-day slot storage for EG.D OpenAPI."""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_INTERVAL_MINUTES,
+    DOMAIN,
+    SLOT_ESTIMATED,
+    SLOT_MISSING,
+    SLOT_VALID,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+SLOT_MS = ATTR_INTERVAL_MINUTES * 60 * 1000
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    """Return UTC start of day and UTC start of next day in Europe/Prague."""
+    local_tz = dt_util.get_time_zone("Europe/Prague")
+    start_local = datetime.combine(day, time.min, tzinfo=local_tz)
+    next_local = datetime.combine(day + timedelta(days=1), time.min, tzinfo=local_tz)
+    return start_local.astimezone(UTC), next_local.astimezone(UTC)
+
+
+@dataclass(slots=True)
+class DayRecord:
+    """Slot-level state of one profile and one local day.
+
+    `states` holds one character per 15-minute slot: valid, estimated
+    (row present but not final) or missing (no row returned yet).
+    """
+
+    day: date
+    start_ms: int
+    slot_count: int
+    states: str
+    values: list[float | None]
+    end_aligned: bool = False
+    points_without_timestamp: int = 0
+    fetched_at: datetime | None = None
+    checked_at: datetime | None = None
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    revision: int = 0
+
+    @classmethod
+    def empty(cls, day: date) -> DayRecord:
+        """Create a record with all slots missing."""
+        start_utc, next_utc = day_bounds(day)
+        slot_count = int((next_utc - start_utc).total_seconds() // (ATTR_INTERVAL_MINUTES * 60))
+        return cls(
+            day=day,
+            start_ms=int(start_utc.timestamp() * 1000),
+            slot_count=slot_count,
+            states=SLOT_MISSING * slot_count,
+            values=[None] * slot_count,
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        return SLOT_VALID * self.slot_count == self.states
+
+    @property
+    def valid_slots(self) -> int:
+        return self.states.count(SLOT_VALID)
+
+    @property
+    def estimated_slots(self) -> int:
+        return self.states.count(SLOT_ESTIMATED)
+
+    @property
+    def missing_slots(self) -> int:
+        return self.states.count(SLOT_MISSING)
+
+    @property
+    def valid_prefix(self) -> int:
+        """Return number of leading slots that are already valid."""
+        return len(self.states) - len(self.states.lstrip(SLOT_VALID))
+
+    def slot_start(self, slot: int) -> datetime:
+        """Return UTC start of slot."""
+        return datetime.fromtimestamp((self.start_ms + slot * SLOT_MS) / 1000, tz=UTC)
+
+    def request_window(self, slot_from: int, slot_to: int) -> tuple[datetime, datetime]:
+        """Return the UTC request window of slots [slot_from, slot_to).
+
+        End-stamped records are asked one second later, so the window holds
+        the stamp of the range's last slot (the range end) but not the stamp
+        that closes the slot before the range.
+        """
+        offset = timedelta(seconds=1 if self.end_aligned else 0)
+        return (
+            self.slot_start(slot_from) + offset,
+            self.slot_start(slot_to) - timedelta(seconds=1) + offset,
+        )
+
+    def merge_points(
+        self,
+        points: list[list[int | float | None]],
+        *,
+        slot_from: int,
+        slot_to: int,
+        points_without_timestamp: int = 0,
+    ) -> bool:
+        """Merge freshly fetched points into slots [slot_from, slot_to).
+
+        Points carry `[timestamp_ms, kWh or None]`; `None` marks a row whose
+        status is not final. Slots the response covers take its value; slots
+        it does not cover become missing again unless they are already valid,
+        so an empty or partial response never wipes final data. A point
+        stamped at the end of the range means the API stamps intervals by
+        their end, which is remembered for later merges.
+        Returns True when any slot changed.
+        """
+        located = [((int(ts) - self.start_ms) // SLOT_MS, value) for ts, value in points if ts is not None]
+        if not self.end_aligned and any(index == slot_to for index, _ in located):
+            self.end_aligned = True
+        shift = 1 if self.end_aligned else 0
+
+        fresh: dict[int, float | None] = {}
+        for index, value in located:
+            slot = index - shift
+            if not slot_from <= slot < slot_to:
+                continue
+            # A final value wins over a non-final row for the same slot.
+            if value is not None or fresh.get(slot) is None:
+                fresh[slot] = None if value is None else float(value)
+
+        previous_states = self.states
+        previous_values = self.values[slot_from:slot_to]
+        states = list(self.states)
+        for slot in range(slot_from, slot_to):
+            if slot in fresh:
+                states[slot] = SLOT_ESTIMATED if fresh[slot] is None else SLOT_VALID
+                self.values[slot] = fresh[slot]
+            elif states[slot] != SLOT_VALID:
+                states[slot] = SLOT_MISSING
+                self.values[slot] = None
+
+        self.states = "".join(states)
+        if slot_from == 0 and slot_to == self.slot_count:
+            self.points_without_timestamp = points_without_timestamp
+        else:
+            self.points_without_timestamp += points_without_timestamp
+
+        changed = self.states != previous_states or self.values[slot_from:slot_to] != previous_values
+        if changed:
+            self.revision += 1
+        return changed
+
+    def fingerprint_matches(self, slot_from: int, slot_to: int, fingerprint: str) -> bool:
+        """Return True when the same response was already merged for this range."""
+        return self.fingerprints.get(f"{slot_from}-{slot_to}") == fingerprint
+
+    def remember_fingerprint(self, slot_from: int, slot_to: int, fingerprint: str) -> None:
+        """Store response fingerprint for a range, forgetting overlapping ranges."""
+        for key in list(self.fingerprints):
+            start, end = (int(part) for part in key.split("-"))
+            if start < slot_to and slot_from < end:
+                del self.fingerprints[key]
+        self.fingerprints[f"{slot_from}-{slot_to}"] = fingerprint
+
+    def series_points(self) -> list[list[int | float | None]]:
+        """Return `[timestamp_ms, kWh or None]` for every slot with a row."""
+        shift = 1 if self.end_aligned else 0
+        return [
+            [self.start_ms + (slot + shift) * SLOT_MS, self.values[slot]]
+            for slot, state in enumerate(self.states)
+            if state != SLOT_MISSING
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "start": self.start_ms,
+            "slots": self.slot_count,
+            "states": self.states,
+            "values": self.values,
+            "end_aligned": self.end_aligned,
+            "no_ts": self.points_without_timestamp,
+            "fetched": self.fetched_at.isoformat() if self.fetched_at else None,
+            "checked": self.checked_at.isoformat() if self.checked_at else None,
+            "fingerprints": self.fingerprints,
+        }
+
+    @classmethod
+    def from_dict(cls, day: date, raw: dict[str, Any]) -> DayRecord:
+        return cls(
+            day=day,
+            start_ms=int(raw["start"]),
+            slot_count=int(raw["slots"]),
+            states=str(raw["states"]),
+            values=list(raw["values"]),
+            end_aligned=bool(raw.get("end_aligned", False)),
+            points_without_timestamp=int(raw.get("no_ts", 0)),
+            fetched_at=dt_util.parse_datetime(raw["fetched"]) if raw.get("fetched") else None,
+            checked_at=dt_util.parse_datetime(raw["checked"]) if raw.get("checked") else None,
+            fingerprints=dict(raw.get("fingerprints", {})),
+        )
+
+
+class EGDDataStore:
+    """Day records of one config entry, persisted in `.storage`."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self.entry_id = entry_id
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.records: dict[str, dict[date, DayRecord]] = {}
+        self.watermarks: dict[str, int] = {}
+        self.meta: dict[str, Any] = {}
+        self.prices: dict[int, float] = {}
+        self.costs: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        raw = await self._store.async_load() or {}
+        self.records = {
+            profile_code: {
+                date.fromisoformat(day_iso): DayRecord.from_dict(date.fromisoformat(day_iso), record)
+                for day_iso, record in days.items()
+            }
+            for profile_code, days in raw.get("profiles", {}).items()
+        }
+        self.watermarks = {code: int(ms) for code, ms in raw.get("watermarks", {}).items()}
+        self.meta = dict(raw.get("meta", {}))
+        self.prices = {int(ts): float(price) for ts, price in raw.get("prices", [])}
+        self.costs = dict(raw.get("costs", {}))
+
+    def get_record(self, profile_code: str, day: date) -> DayRecord:
+        """Return stored record for profile/day, creating an empty one if needed."""
+        days = self.records.setdefault(profile_code, {})
+        record = days.get(day)
+        if record is None:
+            record = DayRecord.empty(day)
+            record.end_aligned = any(other.end_aligned for other in days.values())
+            days[day] = record
+        return record
+
+    def profile_days(self, profile_code: str) -> list[DayRecord]:
+        """Return records of one profile ordered by day."""
+        days = self.records.get(profile_code, {})
+        return [days[day] for day in sorted(days)]
+
+    def expired(self, oldest_day: date) -> dict[str, list[DayRecord]]:
+        """Return records older than oldest_day that hold any slot, ordered by day."""
+        expired: dict[str, list[DayRecord]] = {}
+        for profile_code, days in self.records.items():
+            for day in sorted(d for d in days if d < oldest_day):
+                record = days[day]
+                if record.missing_slots < record.slot_count:
+                    expired.setdefault(profile_code, []).append(record)
+        return expired
+
+    def prune(self, oldest_day: date, keep: Collection[str] = ()) -> None:
+        """Drop records older than oldest_day, except those of the profiles in keep."""
+        for profile_code, days in self.records.items():
+            if profile_code in keep:
+                continue
+            for day in [d for d in days if d < oldest_day]:
+                del days[day]
+
+    def prune_prices(self, oldest_ms: int) -> None:
+        """Drop recorded price points older than oldest_ms."""
+        for ts in [ts for ts in self.prices if ts < oldest_ms]:
+            del self.prices[ts]
+
+    def async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._as_dict, STORAGE_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._as_dict())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    def _as_dict(self) -> dict[str, Any]:
+        return {
+            "profiles": {
+                profile_code: {day.isoformat(): record.as_dict() for day, record in days.items()}
+                for profile_code, days in self.records.items()
+            },
+            "watermarks": self.watermarks,
+            "meta": self.meta,
+            "prices": [[ts, self.prices[ts]] for ts in sorted(self.prices)],
+            "costs": self.costs,
+        }
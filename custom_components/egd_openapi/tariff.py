@@ -0,0 +1,370 @@
+"""Slot costs of stored consumption under HDO tariff windows and spot prices."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, tzinfo
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .batch import np, numpy_available
+from .storage import SLOT_MS, DayRecord
+
+PRICE_POINT_MAX_MS = 3600 * 1000
+PRICE_LIST_ATTRIBUTES = ("series", "prices", "raw_today", "raw_tomorrow", "today", "tomorrow")
+
+
+def parse_windows(text: str) -> tuple[tuple[int, int], ...]:
+    """Parse comma separated `HH:MM-HH:MM` windows into minutes of day.
+
+    A window may wrap past midnight (`22:00-06:00`). Raises ValueError on
+    malformed input.
+    """
+    windows: list[tuple[int, int]] = []
+    for part in text.replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_raw, sep, end_raw = part.partition("-")
+        if not sep:
+            raise ValueError(f"Window {part!r} is not HH:MM-HH:MM")
+        start, end = _parse_minute(start_raw), _parse_minute(end_raw)
+        if start == end:
+            raise ValueError(f"Window {part!r} is empty")
+        windows.append((start, end))
+    return tuple(windows)
+
+
+def _parse_minute(raw: str) -> int:
+    hour_raw, _, minute_raw = raw.strip().partition(":")
+    hour, minute = int(hour_raw), int(minute_raw or 0)
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or hour * 60 + minute > 24 * 60:
+        raise ValueError(f"Time {raw!r} is out of range")
+    return hour * 60 + minute
+
+
+def low_tariff_mask(
+    start_ms: int, slot_count: int, windows: tuple[tuple[int, int], ...], local_tz: tzinfo
+) -> list[bool]:
+    """Return for every slot of a day whether it starts inside a low-tariff window."""
+    mask: list[bool] = []
+    for slot in range(slot_count):
+        local = datetime.fromtimestamp((start_ms + slot * SLOT_MS) / 1000, tz=local_tz)
+        minute = local.hour * 60 + local.minute
+        mask.append(
+            any(start <= minute < end if start < end else minute >= start or minute < end for start, end in windows)
+        )
+    return mask
+
+
+def price_points_from_attributes(attributes: Mapping[str, Any]) -> dict[int, float]:
+    """Collect `{timestamp_ms: price per kWh}` from a price entity's attributes.
+
+    Understands `[timestamp, price]` pairs (like this integration's own
+    `series`), lists of `{"start": ..., "value"/"price": ...}` and
+    attributes keyed by ISO timestamps. Prices per MWh are scaled to kWh.
+    """
+    points: dict[int, float] = {}
+    for key in PRICE_LIST_ATTRIBUTES:
+        items = attributes.get(key)
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if isinstance(item, (list, tuple)) and len(item) == 2:
+                _add_point(points, item[0], item[1])
+            elif isinstance(item, Mapping):
+                _add_point(
+                    points,
+                    item.get("start", item.get("time")),
+                    item.get("value", item.get("price")),
+                )
+    for key, value in attributes.items():
+        if isinstance(key, str) and key[:1].isdigit():
+            _add_point(points, key, value)
+
+    unit = str(attributes.get("unit_of_measurement", ""))
+    if "mwh" in unit.lower():
+        points = {ts: price / 1000 for ts, price in points.items()}
+    return points
+
+
+def _add_point(points: dict[int, float], moment: Any, price: Any) -> None:
+    if isinstance(moment, (int, float)) and not isinstance(moment, bool):
+        timestamp_ms = int(moment)
+    elif isinstance(moment, datetime):
+        timestamp_ms = int(moment.timestamp() * 1000)
+    elif isinstance(moment, str) and (parsed := dt_util.parse_datetime(moment)) is not None:
+        if parsed.tzinfo is None:
+            return
+        timestamp_ms = int(parsed.timestamp() * 1000)
+    else:
+        return
+    try:
+        points[timestamp_ms] = float(price)
+    except (TypeError, ValueError):
+        return
+
+
+@dataclass(slots=True)
+class TariffConfig:
+    """Cost settings of one entry."""
+
+    profile: str
+    low_windows: tuple[tuple[int, int], ...]
+    price_low: float
+    price_high: float
+    price_entity: str | None = None
+
+
+@dataclass(slots=True)
+class DayCost:
+    """Cost of one profile and day.
+
+    Slot price is the spot price (when one is known) plus the low or high
+    tariff price of the slot's window.
+    """
+
+    day: date
+    kwh: float
+    cost: float
+    low_kwh: float
+    low_cost: float
+    priced_slots: int
+    spot_slots: int
+    key: tuple[int, tuple[tuple[int, float], ...]] | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "day": self.day.isoformat(),
+            "kwh": self.kwh,
+            "cost": self.cost,
+            "low_tariff_kwh": self.low_kwh,
+            "high_tariff_kwh": round(self.kwh - self.low_kwh, 6),
+            "low_tariff_cost": self.low_cost,
+            "high_tariff_cost": round(self.cost - self.low_cost, 6),
+            "priced_slots": self.priced_slots,
+            "spot_priced_slots": self.spot_slots,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> DayCost:
+        return cls(
+            day=date.fromisoformat(raw["day"]),
+            kwh=float(raw["kwh"]),
+            cost=float(raw["cost"]),
+            low_kwh=float(raw["low_tariff_kwh"]),
+            low_cost=float(raw["low_tariff_cost"]),
+            priced_slots=int(raw["priced_slots"]),
+            spot_slots=int(raw["spot_priced_slots"]),
+        )
+
+
+class TariffEngine:
+    """Daily costs of one entry, recomputed only for days whose record or prices changed.
+
+    Costs outlive the day records: days pruned from the slot store keep the
+    cost computed while they were stored, so monthly sums cover the month.
+    """
+
+    def __init__(self, local_tz: tzinfo) -> None:
+        self.local_tz = local_tz
+        self.config: TariffConfig | None = None
+        self.profile: str | None = None
+        self.days: dict[date, DayCost] = {}
+        self.recomputed_days = 0
+        self._masks: dict[tuple[int, int], list[bool]] = {}
+
+    def load(self, raw: dict[str, Any]) -> None:
+        self.days = {}
+        for item in raw.get("days", []):
+            try:
+                cost = DayCost.from_dict(item)
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.days[cost.day] = cost
+        self.profile = raw.get("profile")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "days": [self.days[day].as_dict() for day in sorted(self.days)],
+        }
+
+    def update(
+        self,
+        config: TariffConfig | None,
+        records: list[DayRecord],
+        prices: dict[int, float],
+        keep_from: date,
+    ) -> bool:
+        """Bring day costs in line with records and prices; return True when any changed."""
+        changed = False
+        profile = config.profile if config else None
+        if profile != self.profile:
+            changed = bool(self.days)
+            self.days = {}
+            self.profile = profile
+        if config != self.config:
+            # Stored days of the same profile are recosted under the new settings.
+            for cost in self.days.values():
+                cost.key = None
+            self.config = config
+            self._masks = {}
+        if config is None:
+            return changed
+
+        price_times = sorted(prices)
+        pending: list[tuple[DayRecord, tuple[int, tuple[tuple[int, float], ...]]]] = []
+        for record in records:
+            if record.day < keep_from:
+                continue
+            end_ms = record.start_ms + record.slot_count * SLOT_MS
+            first = max(0, bisect_right(price_times, record.start_ms) - 1)
+            signature = tuple((ts, prices[ts]) for ts in price_times[first : bisect_left(price_times, end_ms)])
+            key = (record.revision, signature)
+            cached = self.days.get(record.day)
+            if cached is not None and cached.key == key:
+                continue
+            pending.append((record, key))
+
+        if pending:
+            for cost in self._compute(config, pending, price_times, prices):
+                self.days[cost.day] = cost
+            self.recomputed_days += len(pending)
+            changed = True
+
+        for day in [day for day in self.days if day < keep_from]:
+            del self.days[day]
+            changed = True
+        return changed
+
+    def get(self, day: date) -> DayCost | None:
+        return self.days.get(day)
+
+    def month(self, day: date) -> dict[str, Any]:
+        """Return totals of the month of `day` up to and including it."""
+        days = [cost for cost in self.days.values() if cost.day.replace(day=1) == day.replace(day=1) and cost.day <= day]
+        return {
+            "month": day.strftime("%Y-%m"),
+            "days": len(days),
+            "kwh": round(sum(cost.kwh for cost in days), 6),
+            "cost": round(sum(cost.cost for cost in days), 6),
+            "low_tariff_kwh": round(sum(cost.low_kwh for cost in days), 6),
+            "low_tariff_cost": round(sum(cost.low_cost for cost in days), 6),
+        }
+
+    def _mask(self, config: TariffConfig, record: DayRecord) -> list[bool]:
+        key = (record.start_ms, record.slot_count)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._masks[key] = low_tariff_mask(
+                record.start_ms, record.slot_count, config.low_windows, self.local_tz
+            )
+        return mask
+
+    @staticmethod
+    def _spot_prices(record: DayRecord, price_times: list[int], prices: dict[int, float]) -> list[float | None]:
+        """Return the spot price in force at each slot start; a point holds until the next, at most an hour."""
+        spot: list[float | None] = []
+        for slot in range(record.slot_count):
+            slot_ms = record.start_ms + slot * SLOT_MS
+            index = bisect_right(price_times, slot_ms) - 1
+            if index < 0:
+                spot.append(None)
+                continue
+            ts = price_times[index]
+            until = ts + PRICE_POINT_MAX_MS
+            if index + 1 < len(price_times):
+                until = min(until, price_times[index + 1])
+            spot.append(prices[ts] if slot_ms < until else None)
+        return spot
+
+    def _compute(
+        self,
+        config: TariffConfig,
+        pending: list[tuple[DayRecord, tuple[int, tuple[tuple[int, float], ...]]]],
+        price_times: list[int],
+        prices: dict[int, float],
+    ) -> list[DayCost]:
+        """Cost all pending days in one pass over their concatenated slots."""
+        values: list[float | None] = []
+        masks: list[bool] = []
+        spots: list[float | None] = []
+        offsets: list[int] = []
+        for record, _ in pending:
+            offsets.append(len(values))
+            values.extend(record.values)
+            masks.extend(self._mask(config, record))
+            spots.extend(self._spot_prices(record, price_times, prices) if price_times else [None] * record.slot_count)
+
+        if numpy_available():
+            sums = self._sum_numpy(config, values, masks, spots, offsets)
+        else:
+            sums = self._sum_python(config, values, masks, spots, offsets)
+        return [
+            DayCost(
+                day=record.day,
+                kwh=round(kwh, 6),
+                cost=round(cost, 6),
+                low_kwh=round(low_kwh, 6),
+                low_cost=round(low_cost, 6),
+                priced_slots=int(priced),
+                spot_slots=int(spot),
+                key=key,
+            )
+            for (record, key), (kwh, cost, low_kwh, low_cost, priced, spot) in zip(pending, sums)
+        ]
+
+    @staticmethod
+    def _sum_numpy(
+        config: TariffConfig,
+        values: list[float | None],
+        masks: list[bool],
+        spots: list[float | None],
+        offsets: list[int],
+    ) -> list[tuple[float, ...]]:
+        energy = np.array(values, dtype=float)
+        valid = ~np.isnan(energy)
+        energy = np.where(valid, energy, 0.0)
+        low = np.array(masks, dtype=bool)
+        spot = np.array(spots, dtype=float)
+        has_spot = ~np.isnan(spot)
+        prices = np.where(has_spot, spot, 0.0) + np.where(low, config.price_low, config.price_high)
+        cost = energy * prices
+        columns = np.add.reduceat(
+            np.stack([energy, cost, energy * low, cost * low, valid, valid & has_spot]).astype(float),
+            offsets,
+            axis=1,
+        )
+        return [tuple(column) for column in columns.T.tolist()]
+
+    @staticmethod
+    def _sum_python(
+        config: TariffConfig,
+        values: list[float | None],
+        masks: list[bool],
+        spots: list[float | None],
+        offsets: list[int],
+    ) -> list[tuple[float, ...]]:
+        sums: list[tuple[float, ...]] = []
+        bounds = [*offsets, len(values)]
+        for start, end in zip(bounds, bounds[1:]):
+            kwh = cost = low_kwh = low_cost = 0.0
+            priced = spot_priced = 0
+            for value, low, spot in zip(values[start:end], masks[start:end], spots[start:end]):
+                if value is None:
+                    continue
+                price = (spot or 0.0) + (config.price_low if low else config.price_high)
+                kwh += value
+                cost += value * price
+                priced += 1
+                if spot is not None:
+                    spot_priced += 1
+                if low:
+                    low_kwh += value
+                    low_cost += value * price
+            sums.append((kwh, cost, low_kwh, low_cost, priced, spot_priced))
+        return sums
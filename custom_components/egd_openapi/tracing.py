@@ -0,0 +1,106 @@
+"""Refresh-cycle tracing for EG.D OpenAPI."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import time
+from typing import Any
+
+from .const import TRACE_MAX_SPANS
+
+_CURRENT_TRACE: ContextVar[RefreshTrace | None] = ContextVar("egd_openapi_trace", default=None)
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage inside a refresh trace."""
+
+    name: str
+    offset: float
+    duration: float
+    attributes: dict[str, Any]
+
+
+@dataclass(slots=True)
+class RefreshTrace:
+    """Spans of one coordinator refresh."""
+
+    started_at: datetime = field(default_factory=lambda: datetime.now(tz=UTC))
+    spans: list[Span] = field(default_factory=list)
+    duration: float | None = None
+    outcome: str | None = None
+    dropped_spans: int = 0
+    _started: float = field(default_factory=time.perf_counter)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block; the yielded dict can collect attributes."""
+        started = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.add_span(name, started, time.perf_counter() - started, attributes)
+
+    def add_span(self, name: str, started: float, duration: float, attributes: dict[str, Any]) -> None:
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped_spans += 1
+            return
+        self.spans.append(
+            Span(name=name, offset=started - self._started, duration=duration, attributes=attributes)
+        )
+
+    def finish(self, outcome: str) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.outcome = outcome
+
+    def as_dict(self) -> dict[str, Any]:
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_s": None if self.duration is None else round(self.duration, 6),
+            "outcome": self.outcome,
+            "stage_totals_s": {name: round(total, 6) for name, total in totals.items()},
+            "dropped_spans": self.dropped_spans,
+            "spans": [
+                {
+                    "name": span.name,
+                    "offset_s": round(span.offset, 6),
+                    "duration_s": round(span.duration, 6),
+                    **span.attributes,
+                }
+                for span in self.spans
+            ],
+        }
+
+
+def activate(trace: RefreshTrace) -> Token[RefreshTrace | None]:
+    """Make trace current for the running task and tasks it creates."""
+    return _CURRENT_TRACE.set(trace)
+
+
+def deactivate(token: Token[RefreshTrace | None]) -> None:
+    _CURRENT_TRACE.reset(token)
+
+
+def record_span(name: str, started: float, duration: float, **attributes: Any) -> None:
+    """Record an already measured span on the current trace, if any."""
+    trace = _CURRENT_TRACE.get()
+    if trace is not None:
+        trace.add_span(name, started, duration, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """Record a span on the current trace; does nothing outside a refresh."""
+    trace = _CURRENT_TRACE.get()
+    if trace is None:
+        yield attributes
+        return
+    with trace.span(name, **attributes) as span_attributes:
+        yield span_attributes
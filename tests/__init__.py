@@ -0,0 +1 @@
+"""Tests for the EG.D OpenAPI integration."""
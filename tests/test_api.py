@@ -0,0 +1,415 @@
+"""Tests for the API client's circuit breaker, hedging and profile batching."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+import json
+from typing import Any
+
+import pytest
+
+from custom_components.egd_openapi import api
+from custom_components.egd_openapi.api import (
+    CircuitBreaker,
+    EGDAPICircuitOpenError,
+    EGDAPIError,
+    EGDOpenAPIClient,
+    EGDTokenCache,
+)
+from custom_components.egd_openapi.metrics import RequestMetric
+from custom_components.egd_openapi.const import (
+    BATCH_COMMA,
+    BATCH_PROBE_ATTEMPTS,
+    BATCH_REPEATED,
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(api.time, "monotonic", fake)
+    return fake
+
+
+def _open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_request()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=300)
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+    breaker.before_request()
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    with pytest.raises(EGDAPICircuitOpenError):
+        breaker.before_request()
+    assert breaker.rejected == 1
+
+
+def test_success_resets_the_failure_count(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_half_open_lets_a_single_probe_through(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=300)
+    _open_breaker(breaker)
+
+    clock.now += 300
+    breaker.before_request()
+
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    with pytest.raises(EGDAPICircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.open_for == 300
+
+
+def test_failed_probe_doubles_the_open_period_up_to_the_cap(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=300, max_open_seconds=1000)
+    _open_breaker(breaker)
+
+    periods = []
+    for _ in range(3):
+        clock.now += breaker.open_for
+        breaker.before_request()
+        breaker.record_failure()
+        assert breaker.state == CIRCUIT_OPEN
+        periods.append(breaker.open_for)
+
+    assert periods == [600, 1000, 1000]
+    clock.now += 999
+    with pytest.raises(EGDAPICircuitOpenError):
+        breaker.before_request()
+
+
+def test_released_probe_lets_the_next_one_through(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=300)
+    _open_breaker(breaker)
+    clock.now += 300
+    breaker.before_request()
+
+    breaker.release_probe()
+    breaker.before_request()
+
+    assert breaker.state == CIRCUIT_HALF_OPEN
+
+
+class HangingSession:
+    """Session whose requests never answer."""
+
+    def request(self, *args: Any, **kwargs: Any) -> HangingSession:
+        return self
+
+    async def __aenter__(self) -> Any:
+        await asyncio.Event().wait()
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
+def test_cancelled_probe_is_released(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=300)
+    _open_breaker(breaker)
+    clock.now += 300
+    token_cache = EGDTokenCache()
+    token_cache.token = "token"
+    token_cache.token_day = datetime.now(tz=UTC).date().isoformat()
+    client = EGDOpenAPIClient(
+        session=HangingSession(),
+        environment="test",
+        client_id="id",
+        client_secret="secret",
+        token_cache=token_cache,
+        circuit_breaker=breaker,
+    )
+
+    async def _cancel_probe() -> None:
+        task = asyncio.ensure_future(client._request("GET", "spotreby"))
+        await asyncio.sleep(0)
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_cancel_probe())
+
+    # The cancelled probe is neither a failure nor a success.
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    breaker.before_request()
+
+
+class ScriptedResponse:
+    """Answer with status 200 after `delay` seconds."""
+
+    status = 200
+
+    def __init__(self, delay: float, call: int) -> None:
+        self.delay = delay
+        self.call = call
+
+    async def __aenter__(self) -> ScriptedResponse:
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+    async def read(self) -> bytes:
+        return json.dumps({"call": self.call}).encode()
+
+
+class ScriptedSession:
+    """Session answering its n-th request after the n-th delay."""
+
+    def __init__(self, *delays: float) -> None:
+        self.delays = list(delays)
+        self.calls = 0
+
+    def request(self, *args: Any, **kwargs: Any) -> ScriptedResponse:
+        self.calls += 1
+        return ScriptedResponse(self.delays[self.calls - 1], self.calls)
+
+
+def _hedging_client(monkeypatch: pytest.MonkeyPatch, session: ScriptedSession) -> EGDOpenAPIClient:
+    monkeypatch.setattr(api, "HEDGE_MIN_DELAY_SECONDS", 0.02)
+    token_cache = EGDTokenCache()
+    token_cache.token = "token"
+    token_cache.token_day = datetime.now(tz=UTC).date().isoformat()
+    client = EGDOpenAPIClient(
+        session=session,
+        environment="test",
+        client_id="id",
+        client_secret="secret",
+        token_cache=token_cache,
+        hedge_requests=True,
+    )
+    # Twenty fast answers make the endpoint eligible; they also allow one hedge within the 5 % budget.
+    for _ in range(api.HEDGE_MIN_SAMPLES):
+        client.metrics.record(RequestMetric(endpoint="spotreby", status=200, latency=0.001))
+    return client
+
+
+def test_hedge_that_answers_first_wins_and_records_the_gain(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = ScriptedSession(0.3, 0.0)
+    client = _hedging_client(monkeypatch, session)
+
+    async def _run() -> Any:
+        result = await client._request("GET", "spotreby")
+        assert client.metrics.hedges_won == 0
+        # The gain is known once the losing primary has finished.
+        await asyncio.sleep(0.4)
+        return result
+
+    assert asyncio.run(_run()) == {"call": 2}
+    metrics = client.metrics
+    assert (metrics.hedges_sent, metrics.hedges_won) == (1, 1)
+    assert 0.1 < metrics.hedge_gains[0] < 0.4
+    assert metrics.error_rate() == 0
+    assert metrics.histograms["spotreby"].hedges == 1
+
+
+def test_losing_hedge_is_cancelled_without_counting_as_an_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = ScriptedSession(0.1, 5.0)
+    client = _hedging_client(monkeypatch, session)
+
+    assert asyncio.run(client._request("GET", "spotreby")) == {"call": 1}
+    metrics = client.metrics
+    assert (metrics.hedges_sent, metrics.hedges_won) == (1, 0)
+    assert [(sample.hedge, sample.cancelled) for sample in metrics.samples][-2:] == [(False, False), (True, True)]
+    assert metrics.error_rate() == 0
+    assert metrics.histograms["spotreby"].errors == 0
+    assert client.circuit_breaker.state == CIRCUIT_CLOSED
+
+
+def test_hedges_stay_within_the_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = ScriptedSession(0.1, 5.0, 0.1)
+    client = _hedging_client(monkeypatch, session)
+
+    async def _run() -> None:
+        await client._request("GET", "spotreby")
+        await client._request("GET", "spotreby")
+
+    asyncio.run(_run())
+    assert client.metrics.hedges_sent == 1
+    assert session.calls == 3
+
+
+def _batch_client(answers: dict[str, Any]) -> EGDOpenAPIClient:
+    client = EGDOpenAPIClient(session=None, environment="test", client_id="id", client_secret="secret")
+
+    async def _fetch_batch(endpoint: str, style: str, *args: Any) -> Any:
+        if isinstance(answers[style], Exception):
+            raise answers[style]
+        return answers[style]
+
+    client._async_fetch_batch = _fetch_batch
+    return client
+
+
+def _get_batch(client: EGDOpenAPIClient) -> Any:
+    return asyncio.run(
+        client.async_get_consumption_batch(
+            ean="859182400000000000",
+            measurement_type="A/B",
+            profiles=["ICQ2", "ISQ2"],
+            time_from="2026-03-10T00:00:00Z",
+            time_to="2026-03-10T23:59:59Z",
+            zdroj_dat=None,
+        )
+    )
+
+
+def test_probe_accepts_a_batch_with_an_empty_profile() -> None:
+    client = _batch_client({BATCH_REPEATED: {"ICQ2": [{"hodnota": 1}], "ISQ2": []}})
+
+    assert _get_batch(client) == {"ICQ2": [{"hodnota": 1}], "ISQ2": []}
+    assert client.profile_batching.styles == {"spotreby": BATCH_REPEATED}
+
+
+def test_probe_with_a_missing_profile_decides_later() -> None:
+    client = _batch_client({BATCH_REPEATED: {"ICQ2": [{"hodnota": 1}]}})
+
+    assert _get_batch(client) == {"ICQ2": [{"hodnota": 1}]}
+    assert client.profile_batching.styles == {}
+    assert client.profile_batching.possible("spotreby")
+
+
+def test_inconclusive_probe_retries_only_its_form_up_to_the_limit() -> None:
+    client = _batch_client(
+        {BATCH_REPEATED: {"ICQ2": [{"hodnota": 1}]}, BATCH_COMMA: EGDAPIError("comma form must not be probed")}
+    )
+
+    for attempt in range(1, BATCH_PROBE_ATTEMPTS):
+        assert _get_batch(client) == {"ICQ2": [{"hodnota": 1}]}
+        assert client.profile_batching.pending == {"spotreby": (BATCH_REPEATED, attempt)}
+    assert client.profile_batching.as_dict() == {"spotreby": f"probing {BATCH_REPEATED}"}
+
+    assert _get_batch(client) == {"ICQ2": [{"hodnota": 1}]}
+    assert client.profile_batching.styles == {"spotreby": BATCH_REPEATED}
+    assert client.profile_batching.pending == {}
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_rate_limits_and_outages_do_not_disable_batching(status: int) -> None:
+    client = _batch_client({BATCH_REPEATED: EGDAPIError(f"Distribuce24 API request failed: {status} (busy)")})
+
+    with pytest.raises(EGDAPIError):
+        _get_batch(client)
+    assert client.profile_batching.styles == {}
+
+    client.profile_batching.styles["spotreby"] = BATCH_REPEATED
+    with pytest.raises(EGDAPIError):
+        _get_batch(client)
+    assert client.profile_batching.possible("spotreby")
+
+
+def test_rejected_form_falls_through_to_the_next_one() -> None:
+    client = _batch_client(
+        {
+            BATCH_REPEATED: EGDAPIError("Distribuce24 API request failed: 400 (bad profile)"),
+            BATCH_COMMA: {"ICQ2": [], "ISQ2": []},
+        }
+    )
+
+    assert _get_batch(client) == {"ICQ2": [], "ISQ2": []}
+    assert client.profile_batching.styles == {"spotreby": BATCH_COMMA}
+
+
+def _paging_client(pages: list[Any]) -> tuple[EGDOpenAPIClient, list[Any]]:
+    client = EGDOpenAPIClient(session=None, environment="test", client_id="id", client_secret="secret")
+    calls: list[Any] = []
+
+    async def _request(method: str, endpoint: str, *, params: Any, parse: Any, **kwargs: Any) -> Any:
+        calls.append(params)
+        answer = pages[len(calls) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return parse(answer)
+
+    client._request = _request
+    return client, calls
+
+
+def test_paging_counts_rows_the_server_returned() -> None:
+    """A full page mostly of other profiles' rows or nested groups still asks for the next page."""
+    full_page = [{"profil": "ICQ2", "hodnota": 1}] + [{"profil": "OTHER", "hodnota": 0}] * 2998
+    full_page.append({"profil": "ISQ2", "data": [{"hodnota": 2}]})
+    nested_page = [{"profil": "ISQ2", "data": [{"hodnota": 3}] * 3000}]
+    client, calls = _paging_client([full_page, nested_page, [{"profil": "ICQ2", "hodnota": 4}]])
+
+    rows = asyncio.run(
+        client._async_fetch_batch(
+            "spotreby", BATCH_REPEATED, "859182400000000000", ["ICQ2", "ISQ2"], "from", "to", None
+        )
+    )
+
+    assert len(calls) == 3
+    assert [row["hodnota"] for row in rows["ICQ2"]] == [1, 4]
+    assert len(rows["ISQ2"]) == 3001
+
+
+def test_c1_batch_retries_without_the_data_source_before_blaming_the_form() -> None:
+    client, calls = _paging_client(
+        [EGDAPIError("Distribuce24 API request failed: 400 (zdrojDat)"), [{"profil": "ICC1", "hodnota": 1}]]
+    )
+
+    rows = asyncio.run(
+        client._async_fetch_batch(
+            "c/spotreby",
+            BATCH_REPEATED,
+            "859182400000000000",
+            ["ICC1"],
+            "2026-03-10T00:00:00.000Z",
+            "2026-03-10T23:59:59.000Z",
+            "ELEKTROMER",
+        )
+    )
+
+    assert rows == {"ICC1": [{"profil": "ICC1", "hodnota": 1}]}
+    assert ("zdrojDat", "ELEKTROMER") in calls[0]
+    assert all(key != "zdrojDat" for key, _ in calls[1])
+
+
+def test_data_source_probe_does_not_fall_back() -> None:
+    client, calls = _paging_client([EGDAPIError("Distribuce24 API request failed: 400 (zdrojDat)"), []])
+
+    with pytest.raises(EGDAPIError):
+        asyncio.run(
+            client.async_get_consumption(
+                ean="859182400000000000",
+                measurement_type="C1",
+                profile="ICC1",
+                time_from="2026-03-10T00:00:00.000Z",
+                time_to="2026-03-10T00:59:59.000Z",
+                zdroj_dat="ODBERNE_MISTO",
+                source_fallback=False,
+            )
+        )
+    assert len(calls) == 1
@@ -0,0 +1,163 @@
+"""Tests for the columnar NumPy engine against the scalar fallback."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from datetime import UTC, date, datetime, timedelta
+import random
+from typing import Any
+
+import pytest
+
+from custom_components.egd_openapi import coordinator as coordinator_module
+from custom_components.egd_openapi.batch import build_columns, numpy_available
+from custom_components.egd_openapi.const import CONF_EAN, CONF_MEASUREMENT_TYPE, MEASUREMENT_AB, VALID_STATUS_AB
+from custom_components.egd_openapi.coordinator import EGDOpenAPICoordinator, RefreshOutcome
+from custom_components.egd_openapi.storage import SLOT_MS, DayRecord
+
+pytestmark = pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed")
+
+# Three days across the spring DST change (96, 92 and 96 slots).
+FIRST_DAY = date(2026, 3, 28)
+DAYS = 3
+
+
+def _records(end_aligned: bool) -> list[DayRecord]:
+    records = [DayRecord.empty(FIRST_DAY + timedelta(days=offset)) for offset in range(DAYS)]
+    for record in records:
+        record.end_aligned = end_aligned
+    return records
+
+
+def _rows(records: list[DayRecord], *, end_aligned: bool, seed: int = 7) -> list[dict[str, Any]]:
+    """Rows with valid, estimated, Wh-unit and timestamp-less entries; a few slots have no row."""
+    rng = random.Random(seed)
+    shift = 1 if end_aligned else 0
+    rows: list[dict[str, Any]] = []
+    for record in records:
+        for slot in range(record.slot_count):
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            stamp = datetime.fromtimestamp((record.start_ms + (slot + shift) * SLOT_MS) / 1000, tz=UTC)
+            row = {"cas": stamp.isoformat(), "hodnota": f"{rng.uniform(0, 2):.3f}", "status": VALID_STATUS_AB}
+            if roll < 0.1:
+                row["status"] = "IU020"
+            elif roll < 0.15:
+                row["hodnota"] = str(rng.randint(0, 2000))
+                row["jednotka"] = "Wh"
+            else:
+                row["jednotka"] = "kWh"
+            rows.append(row)
+    rows.append({"hodnota": "1.000", "status": VALID_STATUS_AB, "jednotka": "kWh"})
+    return rows
+
+
+def _columns(rows: list[dict[str, Any]]):
+    return build_columns(
+        rows,
+        parse_timestamp=EGDOpenAPICoordinator._parse_timestamp,
+        extract_value=EGDOpenAPICoordinator._extract_value,
+        extract_status=EGDOpenAPICoordinator._extract_status,
+        extract_unit=EGDOpenAPICoordinator._extract_unit,
+        is_valid_status=lambda status: status == VALID_STATUS_AB,
+    )
+
+
+def _compute(rows: list[dict[str, Any]], records: list[DayRecord], monkeypatch: pytest.MonkeyPatch, *, vectorized: bool):
+    coordinator = object.__new__(EGDOpenAPICoordinator)
+    monkeypatch.setattr(coordinator_module, "numpy_available", lambda: vectorized)
+    return coordinator._compute_days(rows, MEASUREMENT_AB, records)
+
+
+@pytest.mark.parametrize("end_aligned", [False, True])
+def test_numpy_path_matches_scalar_fallback(monkeypatch: pytest.MonkeyPatch, end_aligned: bool) -> None:
+    records = _records(end_aligned)
+    rows = _rows(records, end_aligned=end_aligned)
+    assert _columns(rows) is not None
+
+    vectorized = _compute(rows, records, monkeypatch, vectorized=True)
+    scalar = _compute(rows, records, monkeypatch, vectorized=False)
+
+    assert [day.total_kwh for day in vectorized] == [day.total_kwh for day in scalar]
+    assert [day.valid_points for day in vectorized] == [day.valid_points for day in scalar]
+    assert [day.invalid_points for day in vectorized] == [day.invalid_points for day in scalar]
+    assert [day.series_points for day in vectorized] == [day.series_points for day in scalar]
+    assert sum(day.valid_points + day.invalid_points for day in vectorized) == len(rows) - 1
+
+
+def test_each_row_lands_in_its_own_day() -> None:
+    records = _records(False)
+    rows = _rows(records, end_aligned=False)
+
+    results = object.__new__(EGDOpenAPICoordinator)._compute_days(rows, MEASUREMENT_AB, records)
+
+    for record, day in zip(records, results):
+        assert all(record.start_ms <= ts < record.start_ms + record.slot_count * SLOT_MS for ts, _ in day.series_points)
+
+
+def test_inexact_values_fall_back_to_the_scalar_path() -> None:
+    rows = [{"cas": "2026-03-28T00:00:00+01:00", "hodnota": "0.1234567", "status": VALID_STATUS_AB}]
+
+    assert _columns(rows) is None
+
+
+class RunClient:
+    """Answers every request with fixed rows and remembers the requested windows."""
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+        self.windows: list[tuple[str, str]] = []
+
+    async def async_get_consumption(self, *, time_from: str, time_to: str, **_: Any) -> list[dict[str, Any]]:
+        self.windows.append((time_from, time_to))
+        return self.rows
+
+
+def _backfill(rows: list[dict[str, Any]], records: list[DayRecord]) -> RunClient:
+    coordinator = object.__new__(EGDOpenAPICoordinator)
+    coordinator.entry_data = {CONF_EAN: "859182400000000000", CONF_MEASUREMENT_TYPE: MEASUREMENT_AB, "options": {}}
+    coordinator.client = RunClient(rows)
+    coordinator._piece_failures = {}
+    coordinator._stage_timings = defaultdict(float)
+    asyncio.run(coordinator._async_fetch_day_run(RefreshOutcome(), [("ICQ2-1", records)], datetime.now(tz=UTC)))
+    return coordinator.client
+
+
+def _stamped_rows(records: list[DayRecord], shift: int, extra_slots: range) -> list[dict[str, Any]]:
+    """One row per slot of the run, value = slot number across the run, plus rows at `extra_slots`."""
+    start_ms = records[0].start_ms
+    slots = sum(record.slot_count for record in records)
+    return [
+        {
+            "cas": datetime.fromtimestamp((start_ms + (slot + shift) * SLOT_MS) / 1000, tz=UTC).isoformat(),
+            "hodnota": str(slot),
+            "status": VALID_STATUS_AB,
+        }
+        for slot in [*range(slots), *extra_slots]
+    ]
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+@pytest.mark.parametrize("end_aligned", [False, True])
+def test_new_multi_day_backfill_detects_the_stamping_side(
+    monkeypatch: pytest.MonkeyPatch, vectorized: bool, end_aligned: bool
+) -> None:
+    records = _records(False)
+    slots = sum(record.slot_count for record in records)
+    shift = 1 if end_aligned else 0
+    # A start-stamping API also returns the first interval after the run on the run end.
+    rows = _stamped_rows(records, shift, range(slots, slots + 1) if not end_aligned else range(0))
+    monkeypatch.setattr(coordinator_module, "numpy_available", lambda: vectorized)
+
+    client = _backfill(rows, records)
+
+    run_end = datetime.fromtimestamp((records[-1].start_ms + records[-1].slot_count * SLOT_MS) / 1000, tz=UTC)
+    assert client.windows[0][1] == run_end.isoformat().replace("+00:00", "Z")
+    assert [record.end_aligned for record in records] == [end_aligned] * DAYS
+    assert all(record.is_complete for record in records)
+    first_slot = 0
+    for record in records:
+        assert record.values == [float(slot) for slot in range(first_slot, first_slot + record.slot_count)]
+        first_slot += record.slot_count
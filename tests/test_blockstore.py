@@ -0,0 +1,126 @@
+"""Tests for the binary block archive of expired day records."""
+
+from __future__ import annotations
+
+from datetime import date
+import os
+from pathlib import Path
+
+import pytest
+
+from custom_components.egd_openapi.blockstore import (
+    BLOCK_HEADER,
+    FILE_MAGIC,
+    BlockArchive,
+    EntryArchive,
+    decode_day,
+    encode_day,
+)
+from custom_components.egd_openapi.const import ARCHIVE_FAILURE_LIMIT, SLOT_ESTIMATED, SLOT_MISSING, SLOT_VALID
+from custom_components.egd_openapi.storage import DayRecord
+
+DAY = date(2026, 3, 10)
+
+
+def _record(day: date = DAY, *, values: list[float] | None = None, end_aligned: bool = False) -> DayRecord:
+    """A record with valid slots, two estimated slots and missing slots at the end."""
+    record = DayRecord.empty(day)
+    filled = values if values is not None else [round(0.125 * (slot % 17), 3) for slot in range(record.slot_count - 6)]
+    record.values = [*filled, None, None] + [None] * (record.slot_count - len(filled) - 2)
+    record.states = (
+        SLOT_VALID * len(filled) + SLOT_ESTIMATED * 2 + SLOT_MISSING * (record.slot_count - len(filled) - 2)
+    )
+    record.end_aligned = end_aligned
+    return record
+
+
+def _same(decoded: DayRecord, record: DayRecord) -> None:
+    assert (decoded.day, decoded.start_ms, decoded.slot_count) == (record.day, record.start_ms, record.slot_count)
+    assert decoded.states == record.states
+    assert decoded.values == record.values
+    assert decoded.end_aligned == record.end_aligned
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        _record(),
+        _record(date(2026, 3, 29), end_aligned=True),
+        _record(date(2026, 10, 25)),
+        _record(values=[0.1 / 3, 2.0, -1e-9]),
+        _record(values=[1e15, -1e15, 0.5]),
+        _record(values=[]),
+    ],
+    ids=["scaled", "spring-dst", "autumn-dst", "raw-float", "wide-deltas", "no-values"],
+)
+def test_encode_decode_round_trip(record: DayRecord) -> None:
+    block = encode_day(record)
+    _same(decode_day(b"xx" + block, 2), record)
+
+
+def test_archive_reads_back_rewritten_days_and_compacts(tmp_path: Path) -> None:
+    path = str(tmp_path / "profile.blocks")
+    first, second = _record(), _record(date(2026, 3, 11))
+    archive = BlockArchive(path)
+    archive.open()
+    archive.write([first, second])
+
+    rewritten = _record(values=[9.5])
+    archive.write([rewritten])
+    assert archive.days() == [first.day, second.day]
+    _same(archive.read([first.day])[first.day], rewritten)
+
+    # Rewriting both days leaves more dead bytes than live ones.
+    archive.write([_record(values=[1.25]), second])
+    compacted_size = len(FILE_MAGIC) + len(encode_day(_record(values=[1.25]))) + len(encode_day(second))
+    assert os.path.getsize(path) == compacted_size
+
+    reopened = BlockArchive(path)
+    reopened.open()
+    assert reopened.read([first.day, second.day, date(2026, 3, 12)]).keys() == {first.day, second.day}
+    _same(reopened.read([second.day])[second.day], second)
+    archive.close()
+    reopened.close()
+
+
+def test_torn_last_block_is_truncated_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "profile.blocks"
+    first, second = _record(), _record(date(2026, 3, 11))
+    archive = BlockArchive(str(path))
+    archive.open()
+    archive.write([first, second])
+    archive.close()
+    intact_size = len(FILE_MAGIC) + len(encode_day(first))
+    path.write_bytes(path.read_bytes()[: intact_size + BLOCK_HEADER.size + 3])
+
+    archive = BlockArchive(str(path))
+    archive.open()
+    assert archive.days() == [first.day]
+    assert path.stat().st_size == intact_size
+
+    archive.write([second])
+    _same(archive.read([second.day])[second.day], second)
+    archive.close()
+
+
+def test_entry_archive_isolates_and_sets_aside_a_failing_profile(tmp_path: Path) -> None:
+    entry_archive = EntryArchive(str(tmp_path), "entry")
+    path = Path(entry_archive.path("ICQ2/1"))
+    path.write_bytes(b"not an archive")
+
+    with pytest.raises(ValueError):
+        entry_archive.days("ICQ2/1")
+    for _ in range(ARCHIVE_FAILURE_LIMIT - 1):
+        errors = entry_archive.write({"ICQ2/1": [_record()], "ISQ2/1": [_record()]})
+        assert list(errors) == ["ICQ2/1"]
+        assert isinstance(errors["ICQ2/1"], ValueError)
+    assert entry_archive.days("ISQ2/1") == [DAY]
+
+    assert entry_archive.write({"ICQ2/1": [_record()]}) == {}
+    assert entry_archive.days("ICQ2/1") == [DAY]
+    corrupt = Path(f"{path}.corrupt")
+    assert corrupt.read_bytes() == b"not an archive"
+
+    entry_archive.remove()
+    assert not path.exists()
+    assert not corrupt.exists()
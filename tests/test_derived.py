@@ -0,0 +1,90 @@
+"""Tests for the net import/export derivation."""
+
+from __future__ import annotations
+
+from datetime import date
+import random
+
+import pytest
+
+from custom_components.egd_openapi import derived as derived_module
+from custom_components.egd_openapi.batch import numpy_available
+from custom_components.egd_openapi.derived import DerivedEngine, compute_derived_day, import_export_profiles
+from custom_components.egd_openapi.storage import SLOT_MS, DayRecord
+
+DAY = date(2026, 3, 29)
+IMPORT = "ICQ2-1234"
+EXPORT = "ISQ2-1234"
+
+
+def _record(values: list[float | None], *, end_aligned: bool = False, revision: int = 1) -> DayRecord:
+    record = DayRecord.empty(DAY)
+    record.values = list(values) + [None] * (record.slot_count - len(values))
+    record.end_aligned = end_aligned
+    record.revision = revision
+    return record
+
+
+def test_import_export_profiles_prefers_quarter_hour() -> None:
+    assert import_export_profiles(["ICC1-1", "ICQ2-1", "ISQ2-1", "ISC1-1"]) == ("ICQ2-1", "ISQ2-1")
+    assert import_export_profiles(["icq1-1", "isq1-1"]) == ("icq1-1", "isq1-1")
+    assert import_export_profiles(["ICQ2-1"]) == ("ICQ2-1", None)
+
+
+def test_compute_derived_day_totals_and_peak() -> None:
+    day = compute_derived_day(_record([1.0, 0.2, None, 0.5]), _record([0.25, 0.7, 0.1, None]))
+
+    assert day.net[:4] == [0.75, -0.5, None, None]
+    assert day.aligned_slots == 2
+    assert (day.import_kwh, day.export_kwh) == (1.2, 0.95)
+    assert (day.net_import_kwh, day.net_export_kwh) == (0.75, 0.5)
+    assert (day.peak_slot, day.peak_net_import_kwh) == (0, 0.75)
+    assert day.series_points() == [[day.start_ms, 0.75], [day.start_ms + SLOT_MS, -0.5]]
+
+
+@pytest.mark.parametrize(
+    ("import_end", "export_end", "shift"),
+    [(False, False, 0), (True, True, 1), (True, False, 0), (False, True, 0)],
+)
+def test_compute_derived_day_stamping(import_end: bool, export_end: bool, shift: int) -> None:
+    """Slots align by index; intervals are end-stamped only when both profiles are."""
+    day = compute_derived_day(_record([1.0], end_aligned=import_end), _record([0.5], end_aligned=export_end))
+
+    assert day.net[0] == 0.5
+    assert day.series_points() == [[day.start_ms + shift * SLOT_MS, 0.5]]
+
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed")
+def test_numpy_path_matches_python_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    rng = random.Random(3)
+    slots = DayRecord.empty(DAY).slot_count
+    imported = _record([None if rng.random() < 0.1 else round(rng.uniform(0, 2), 3) for _ in range(slots)])
+    exported = _record([None if rng.random() < 0.1 else round(rng.uniform(0, 2), 3) for _ in range(slots)])
+
+    vectorized = compute_derived_day(imported, exported)
+    monkeypatch.setattr(derived_module, "numpy_available", lambda: False)
+    scalar = compute_derived_day(imported, exported)
+
+    assert vectorized.as_dict(include_series=True) == scalar.as_dict(include_series=True)
+
+
+def test_engine_recomputes_only_changed_days() -> None:
+    engine = DerivedEngine()
+    imported, exported = _record([1.0]), _record([0.5])
+    records = {IMPORT: [imported], EXPORT: [exported]}
+
+    assert engine.update((IMPORT, EXPORT), records)
+    assert not engine.update((IMPORT, EXPORT), records)
+    assert engine.recomputed_days == 1
+
+    exported.values[0], exported.revision = 0.25, 2
+    assert engine.update((IMPORT, EXPORT), records)
+    assert engine.get(DAY).net[0] == 0.75
+
+    imported.end_aligned = exported.end_aligned = True
+    assert engine.update((IMPORT, EXPORT), records)
+    assert engine.get(DAY).shift == 1
+    assert engine.recomputed_days == 3
+
+    assert engine.update(None, records) is False
+    assert engine.get(DAY) is None
@@ -0,0 +1,49 @@
+"""Tests for refetch planning."""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime, timedelta
+
+from custom_components.egd_openapi.const import CORRECTION_CHECK_HOURS, SLOT_ESTIMATED, SLOT_MISSING, SLOT_VALID
+from custom_components.egd_openapi.planner import plan_refetch
+from custom_components.egd_openapi.storage import DayRecord
+
+NOW = datetime(2026, 3, 11, 8, 0, tzinfo=UTC)
+
+
+def _record(states: str) -> DayRecord:
+    record = DayRecord.empty(date(2026, 3, 10))
+    record.states = states
+    return record
+
+
+def test_empty_day_is_one_range() -> None:
+    assert plan_refetch(_record(SLOT_MISSING * 96), NOW) == [(0, 96)]
+
+
+def test_only_gaps_are_requested() -> None:
+    states = SLOT_VALID * 10 + SLOT_MISSING * 2 + SLOT_VALID * 50 + SLOT_ESTIMATED * 4 + SLOT_VALID * 30
+    assert plan_refetch(_record(states), NOW) == [(10, 12), (62, 66)]
+
+
+def test_runs_beyond_the_limit_join_across_the_smallest_gaps() -> None:
+    states = list(SLOT_VALID * 96)
+    for slot in (5, 7, 40, 90):
+        states[slot] = SLOT_MISSING
+    record = _record("".join(states))
+
+    assert plan_refetch(record, NOW, max_ranges=3) == [(5, 8), (40, 41), (90, 91)]
+    assert plan_refetch(record, NOW, max_ranges=1) == [(5, 91)]
+
+
+def test_complete_day_waits_for_the_correction_check() -> None:
+    record = _record(SLOT_VALID * 96)
+    record.checked_at = NOW - timedelta(hours=1)
+    assert plan_refetch(record, NOW) == []
+
+    record.checked_at = NOW - timedelta(hours=CORRECTION_CHECK_HOURS)
+    assert plan_refetch(record, NOW) == [(0, 96)]
+
+
+def test_never_checked_complete_day_is_verified() -> None:
+    assert plan_refetch(_record(SLOT_VALID * 96), NOW) == [(0, 96)]
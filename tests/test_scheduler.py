@@ -0,0 +1,130 @@
+"""Tests for the domain-wide refresh scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+
+from custom_components.egd_openapi import scheduler as scheduler_module
+from custom_components.egd_openapi.scheduler import EGDRefreshScheduler, next_run, plan_offsets
+
+NOW = datetime(2026, 10, 19, 9, 40, 0, tzinfo=UTC)
+
+
+def test_single_entry_runs_at_its_own_minute() -> None:
+    assert plan_offsets({"a": 17}, window_seconds=1200) == {"a": 17 * 60}
+
+
+def test_entries_are_spread_over_the_window_in_preferred_order() -> None:
+    offsets = plan_offsets({"late": 30, "early": 10, "tie-b": 20, "tie-a": 20}, window_seconds=1200)
+
+    assert offsets == {"early": 600, "tie-a": 900, "tie-b": 1200, "late": 1500}
+
+
+def test_spreading_wraps_past_the_hour() -> None:
+    assert plan_offsets({"a": 55, "b": 56}, window_seconds=1200) == {"a": 3300, "b": 300}
+    assert plan_offsets({}) == {}
+
+
+def test_next_run_is_strictly_after_and_anchored_to_the_hour() -> None:
+    assert next_run(600, NOW) == datetime(2026, 10, 19, 10, 10, tzinfo=UTC)
+    assert next_run(2400, NOW) == datetime(2026, 10, 19, 10, 40, tzinfo=UTC)
+    assert next_run(3000, NOW) == datetime(2026, 10, 19, 9, 50, tzinfo=UTC)
+
+
+def test_late_timers_do_not_drift() -> None:
+    late = NOW.replace(minute=50, second=7)
+
+    assert next_run(3000, late) == datetime(2026, 10, 19, 10, 50, tzinfo=UTC)
+    assert next_run(3000, late - timedelta(hours=5)) == datetime(2026, 10, 19, 5, 50, tzinfo=UTC)
+
+
+class FakeEntry:
+    def __init__(self, entry_id: str) -> None:
+        self.entry_id = entry_id
+        self.tasks: list[Coroutine[Any, Any, None]] = []
+
+    def async_create_background_task(self, hass: Any, target: Coroutine[Any, Any, None], name: str) -> None:
+        self.tasks.append(target)
+
+
+class FakeCoordinator:
+    def __init__(self) -> None:
+        self.refreshes = 0
+
+    async def async_refresh(self) -> None:
+        self.refreshes += 1
+
+
+@pytest.fixture
+def scheduler(monkeypatch: pytest.MonkeyPatch) -> EGDRefreshScheduler:
+    monkeypatch.setattr(scheduler_module.dt_util, "utcnow", lambda: NOW)
+    monkeypatch.setattr(scheduler_module, "async_track_point_in_utc_time", lambda hass, action, when: lambda: None)
+    return EGDRefreshScheduler(object(), max_concurrent=2)
+
+
+def test_fire_skips_an_entry_whose_refresh_is_still_running(scheduler: EGDRefreshScheduler) -> None:
+    entry, coordinator = FakeEntry("a"), FakeCoordinator()
+    scheduler.async_add(entry, coordinator, 45)
+    due = scheduler._jobs["a"].due
+    assert due == NOW.replace(minute=45)
+
+    scheduler._async_fire(due)
+    assert len(entry.tasks) == 1
+    assert scheduler._jobs["a"].running
+    assert scheduler._jobs["a"].due == due + timedelta(hours=1)
+
+    scheduler._async_fire(due + timedelta(hours=1))
+    assert len(entry.tasks) == 1
+
+    asyncio.run(entry.tasks[0])
+    assert coordinator.refreshes == 1
+    assert not scheduler._jobs["a"].running
+
+
+def test_missed_hours_are_not_replayed(scheduler: EGDRefreshScheduler) -> None:
+    entry = FakeEntry("a")
+    scheduler.async_add(entry, FakeCoordinator(), 45)
+    due = scheduler._jobs["a"].due
+
+    scheduler._async_fire(due + timedelta(hours=3, minutes=5))
+    assert len(entry.tasks) == 1
+    assert scheduler._jobs["a"].due == due + timedelta(hours=4)
+    entry.tasks[0].close()
+
+
+def test_run_now_respects_the_cap_and_skips_the_hourly_run(scheduler: EGDRefreshScheduler) -> None:
+    entry = FakeEntry("a")
+    scheduler.async_add(entry, FakeCoordinator(), 45)
+    active = peak = 0
+
+    async def _refresh() -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return "done"
+
+    async def _run() -> list[str]:
+        first = asyncio.ensure_future(scheduler.async_run_now("a", _refresh))
+        await asyncio.sleep(0)
+        assert scheduler._jobs["a"].running
+        scheduler._async_fire(scheduler._jobs["a"].due)
+        return [await first, *await asyncio.gather(*(scheduler.async_run_now("b", _refresh) for _ in range(4)))]
+
+    assert asyncio.run(_run()) == ["done"] * 5
+    assert peak == 2
+    assert entry.tasks == []
+    assert not scheduler._jobs["a"].running
+
+
+def test_shutdown_drops_all_jobs(scheduler: EGDRefreshScheduler) -> None:
+    scheduler.async_add(FakeEntry("a"), FakeCoordinator(), 5)
+    scheduler.async_shutdown()
+
+    assert scheduler.describe("a") is None
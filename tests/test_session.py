@@ -0,0 +1,62 @@
+"""Tests for the dedicated per-environment connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from custom_components.egd_openapi.session import async_acquire_session, async_release_session, session_stats
+
+
+class FakeBus:
+    def __init__(self) -> None:
+        self.listeners: list[Callable[[Any], Any]] = []
+
+    def async_listen_once(self, event_type: str, listener: Callable[[Any], Any]) -> Callable[[], None]:
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+
+class FakeHass:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+        self.bus = FakeBus()
+
+
+def test_entries_share_the_pool_until_the_last_one_releases_it() -> None:
+    async def _run() -> None:
+        hass = FakeHass()
+        session = async_acquire_session(hass, "prod", "a")
+        assert async_acquire_session(hass, "prod", "b") is session
+        assert async_acquire_session(hass, "test", "c") is not session
+
+        stats = session_stats(hass, "prod")
+        assert stats["entries"] == 2
+        assert (stats["limit_per_host"], stats["keepalive_seconds"], stats["dns_ttl_seconds"]) == (4, 75, 600)
+
+        connector = session.connector
+        await async_release_session(hass, "prod", "a")
+        assert not session.closed
+        await async_release_session(hass, "prod", "b")
+        assert session.closed
+        assert connector.closed
+        assert session_stats(hass, "prod") is None
+        assert len(hass.bus.listeners) == 1
+
+        await async_release_session(hass, "test", "c")
+
+    asyncio.run(_run())
+
+
+def test_pool_is_closed_when_home_assistant_closes() -> None:
+    async def _run() -> None:
+        hass = FakeHass()
+        session = async_acquire_session(hass, "prod", "a")
+        await hass.bus.listeners[0](None)
+        assert session.closed
+
+        assert async_acquire_session(hass, "prod", "a") is not session
+        await async_release_session(hass, "prod", "a")
+
+    asyncio.run(_run())
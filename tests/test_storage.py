@@ -0,0 +1,144 @@
+"""Tests for slot-level day records."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from custom_components.egd_openapi.const import SLOT_ESTIMATED, SLOT_MISSING, SLOT_VALID
+from custom_components.egd_openapi.storage import SLOT_MS, DayRecord, EGDDataStore
+
+DAY = date(2026, 3, 10)
+
+
+def _points(record: DayRecord, slots: range, *, shift: int = 0, value: float | None = 0.25) -> list[list]:
+    return [[record.start_ms + (slot + shift) * SLOT_MS, value] for slot in slots]
+
+
+def test_dst_days_have_their_own_slot_count() -> None:
+    assert DayRecord.empty(DAY).slot_count == 96
+    assert DayRecord.empty(date(2026, 3, 29)).slot_count == 92
+    assert DayRecord.empty(date(2026, 10, 25)).slot_count == 100
+
+
+def test_full_merge_marks_valid_estimated_and_missing_slots() -> None:
+    record = DayRecord.empty(DAY)
+    points = _points(record, range(0, 90)) + _points(record, range(90, 94), value=None)
+
+    assert record.merge_points(points, slot_from=0, slot_to=96)
+    assert record.states == SLOT_VALID * 90 + SLOT_ESTIMATED * 4 + SLOT_MISSING * 2
+    assert record.values[0] == 0.25
+    assert record.values[92] is None
+    assert record.revision == 1
+
+
+def test_merging_the_same_points_again_changes_nothing() -> None:
+    record = DayRecord.empty(DAY)
+    points = _points(record, range(0, 96))
+    record.merge_points(points, slot_from=0, slot_to=96)
+
+    assert not record.merge_points(points, slot_from=0, slot_to=96)
+    assert record.revision == 1
+
+
+def test_final_value_wins_over_non_final_row_for_the_same_slot() -> None:
+    record = DayRecord.empty(DAY)
+    points = _points(record, range(5, 6)) + _points(record, range(5, 6), value=None)
+
+    record.merge_points(points, slot_from=0, slot_to=96)
+
+    assert record.states[5] == SLOT_VALID
+    assert record.values[5] == 0.25
+
+
+def test_empty_ranged_response_keeps_valid_slots() -> None:
+    record = DayRecord.empty(DAY)
+    record.merge_points(_points(record, range(0, 40)), slot_from=0, slot_to=96)
+
+    assert not record.merge_points([], slot_from=20, slot_to=60)
+    assert record.states == SLOT_VALID * 40 + SLOT_MISSING * 56
+    assert record.values[39] == 0.25
+
+
+def test_partial_ranged_response_fills_covered_slots_only() -> None:
+    record = DayRecord.empty(DAY)
+    record.merge_points(_points(record, range(0, 40)), slot_from=0, slot_to=96)
+    record.merge_points(_points(record, range(40, 44), value=None), slot_from=0, slot_to=96)
+
+    record.merge_points(_points(record, range(30, 42), value=0.5), slot_from=30, slot_to=60)
+
+    assert record.states[:42] == SLOT_VALID * 42
+    # Non-final slots the response no longer covers go back to missing.
+    assert record.states[42:44] == SLOT_MISSING * 2
+    assert record.values[29] == 0.25
+    assert record.values[30] == 0.5
+
+
+def test_points_without_timestamp_do_not_shift_later_values() -> None:
+    record = DayRecord.empty(DAY)
+    points = [[None, 9.0], [record.start_ms, 1.0], [record.start_ms + SLOT_MS, 2.0]]
+
+    record.merge_points(points, slot_from=0, slot_to=96, points_without_timestamp=1)
+
+    assert record.values[:2] == [1.0, 2.0]
+    assert record.points_without_timestamp == 1
+
+
+def test_end_stamped_full_day_is_detected() -> None:
+    record = DayRecord.empty(DAY)
+
+    record.merge_points(_points(record, range(0, 96), shift=1), slot_from=0, slot_to=96)
+
+    assert record.end_aligned
+    assert record.is_complete
+    assert record.series_points()[-1][0] == record.start_ms + 96 * SLOT_MS
+
+
+def test_end_stamped_ranged_refetch_fills_the_last_slot() -> None:
+    record = DayRecord.empty(DAY)
+
+    record.merge_points(_points(record, range(10, 20), shift=1), slot_from=10, slot_to=20)
+
+    assert record.end_aligned
+    assert record.states[10:20] == SLOT_VALID * 10
+    assert record.states[20] == SLOT_MISSING
+
+
+def test_end_stamped_request_window_covers_the_range_end() -> None:
+    record = DayRecord.empty(DAY)
+    start, end = record.request_window(10, 20)
+    assert (start, end.timestamp() * 1000) == (record.slot_start(10), record.start_ms + 20 * SLOT_MS - 1000)
+
+    record.end_aligned = True
+    start, end = record.request_window(10, 20)
+    assert start.timestamp() * 1000 == record.start_ms + 10 * SLOT_MS + 1000
+    assert end == record.slot_start(20)
+
+
+def test_round_trip_through_dict() -> None:
+    record = DayRecord.empty(DAY)
+    record.merge_points(_points(record, range(0, 50)), slot_from=0, slot_to=96)
+    record.remember_fingerprint(0, 96, "abc")
+
+    restored = DayRecord.from_dict(DAY, record.as_dict())
+
+    assert (restored.states, restored.values, restored.fingerprints) == (
+        record.states,
+        record.values,
+        record.fingerprints,
+    )
+
+
+def test_expired_days_stay_until_pruned() -> None:
+    store = object.__new__(EGDDataStore)
+    old, empty, kept = DayRecord.empty(date(2026, 3, 1)), DayRecord.empty(date(2026, 3, 2)), DayRecord.empty(DAY)
+    old.merge_points(_points(old, range(0, 96)), slot_from=0, slot_to=96)
+    store.records = {"ICQ2-1": {record.day: record for record in (old, empty, kept)}}
+
+    assert store.expired(DAY) == {"ICQ2-1": [old]}
+    assert len(store.records["ICQ2-1"]) == 3
+
+    store.prune(DAY, keep={"ICQ2-1"})
+    assert len(store.records["ICQ2-1"]) == 3
+
+    store.prune(DAY)
+    assert list(store.records["ICQ2-1"]) == [DAY]
@@ -0,0 +1,120 @@
+"""Tests for HDO windows and the tariff cost engine."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+import random
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.egd_openapi import tariff as tariff_module
+from custom_components.egd_openapi.batch import numpy_available
+from custom_components.egd_openapi.storage import SLOT_MS, DayRecord
+from custom_components.egd_openapi.tariff import TariffConfig, TariffEngine, low_tariff_mask, parse_windows
+
+PRAGUE = ZoneInfo("Europe/Prague")
+
+
+def test_parse_windows() -> None:
+    assert parse_windows("22:00-06:00, 13:00-15:30;") == ((1320, 360), (780, 930))
+    assert parse_windows("0-24") == ((0, 1440),)
+    assert parse_windows(" ") == ()
+
+
+@pytest.mark.parametrize("text", ["22:00", "10:00-10:00", "25:00-01:00", "23:60-01:00", "24:30-01:00", "a-b"])
+def test_parse_windows_rejects_malformed(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_windows(text)
+
+
+def test_low_tariff_mask_wraps_midnight() -> None:
+    record = DayRecord.empty(date(2026, 6, 1))
+    mask = low_tariff_mask(record.start_ms, record.slot_count, parse_windows("22:00-06:00, 13:00-14:00"), PRAGUE)
+
+    low_slots = {slot for slot, low in enumerate(mask) if low}
+    assert low_slots == set(range(0, 24)) | set(range(52, 56)) | set(range(88, 96))
+
+
+@pytest.mark.parametrize(("day", "slots", "low"), [(date(2026, 3, 29), 92, 20), (date(2026, 10, 25), 100, 28)])
+def test_low_tariff_mask_follows_local_time_across_dst(day: date, slots: int, low: int) -> None:
+    """The night window 00:00-06:00 is an hour shorter or longer on DST change days."""
+    record = DayRecord.empty(day)
+    mask = low_tariff_mask(record.start_ms, record.slot_count, parse_windows("00:00-06:00"), PRAGUE)
+
+    assert record.slot_count == slots
+    assert sum(mask) == low
+    assert mask[:low] == [True] * low
+
+
+def _records(first: date, days: int, seed: int = 5) -> list[DayRecord]:
+    rng = random.Random(seed)
+    records = []
+    for offset in range(days):
+        record = DayRecord.empty(first + timedelta(days=offset))
+        record.values = [None if rng.random() < 0.1 else round(rng.uniform(0, 1), 3) for _ in range(record.slot_count)]
+        record.revision = 1
+        records.append(record)
+    return records
+
+
+def _config() -> TariffConfig:
+    return TariffConfig(profile="ICQ2-1", low_windows=parse_windows("22:00-06:00"), price_low=2.0, price_high=4.0)
+
+
+def _prices(records: list[DayRecord], seed: int = 9) -> dict[int, float]:
+    """Hourly spot prices covering all but the last day."""
+    rng = random.Random(seed)
+    start, end = records[0].start_ms, records[-1].start_ms
+    return {ts: round(rng.uniform(-0.5, 3), 3) for ts in range(start, end, 4 * SLOT_MS)}
+
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed")
+def test_numpy_path_matches_python_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    records = _records(date(2026, 10, 24), 3)
+    prices = _prices(records)
+
+    vectorized = TariffEngine(PRAGUE)
+    vectorized.update(_config(), records, prices, records[0].day)
+    monkeypatch.setattr(tariff_module, "numpy_available", lambda: False)
+    scalar = TariffEngine(PRAGUE)
+    scalar.update(_config(), records, prices, records[0].day)
+
+    assert vectorized.days.keys() == scalar.days.keys()
+    for day, cost in vectorized.days.items():
+        assert cost.as_dict() == pytest.approx(scalar.days[day].as_dict())
+    assert vectorized.days[records[0].day].spot_slots > 0
+    assert vectorized.days[records[-1].day].spot_slots == 0
+
+
+def test_engine_costs_slots_and_recomputes_only_changed_days() -> None:
+    records = _records(date(2026, 6, 1), 2)
+    for record in records:
+        record.values = [None] * record.slot_count
+    records[0].values[0] = 1.0
+    records[0].values[50] = 0.5
+    engine = TariffEngine(PRAGUE)
+
+    assert engine.update(_config(), records, {records[0].start_ms: 1.0}, records[0].day)
+    cost = engine.get(records[0].day)
+    assert (cost.kwh, cost.cost, cost.low_kwh, cost.low_cost) == (1.5, 5.0, 1.0, 3.0)
+    assert (cost.priced_slots, cost.spot_slots) == (2, 1)
+
+    assert not engine.update(_config(), records, {records[0].start_ms: 1.0}, records[0].day)
+    records[1].values[0], records[1].revision = 2.0, 2
+    assert engine.update(_config(), records, {records[0].start_ms: 1.0}, records[0].day)
+    assert engine.recomputed_days == 3
+
+
+def test_month_sums_days_of_the_month_up_to_the_day() -> None:
+    records = _records(date(2026, 5, 30), 3)
+    engine = TariffEngine(PRAGUE)
+    engine.update(_config(), records[:2], {}, records[0].day)
+
+    may = engine.month(date(2026, 5, 31))
+    assert may["month"] == "2026-05"
+    assert may["days"] == 2
+    assert may["cost"] == pytest.approx(sum(cost.cost for cost in engine.days.values()))
+
+    june = engine.month(date(2026, 6, 1))
+    assert (june["month"], june["days"], june["cost"]) == ("2026-06", 0, 0)